@@ -0,0 +1,53 @@
+"""
+JSON codec benchmark
+
+Decodes and encodes a synthetic board with every installed codec (or the
+ones given with ``--codec``) the way the client does for responses, request
+bodies and ``str(board)``.
+
+Usage::
+
+    python -m benchmarks.bench_codec [--issues 20000] [--codec orjson --codec json]
+"""
+import time
+import argparse
+from zenhub import ZenHub, Board
+from zenhub import codec as codecs
+from benchmarks.synthetic import board_data
+
+
+def best_of(func, repeat):
+    """ Returns the fastest of ``repeat`` runs in seconds """
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    """ Runs the benchmark """
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--issues', type=int, default=20000, help='issues on the board')
+    parser.add_argument('--codec', action='append', dest='codecs',
+                        help='codec to measure (repeatable, default: all installed)')
+    parser.add_argument('--repeat', type=int, default=5, help='the best of n runs is used')
+    args = parser.parse_args()
+
+    data = board_data(args.issues)
+    payload = codecs.JSONCodec().encode(data)
+    print(f'board with {args.issues} issues, {len(payload) / 1024:.0f} KB of JSON')
+    print(f'{"codec":10}{"decode ms":>12}{"encode ms":>12}{"str() ms":>12}')
+    for name in args.codecs or codecs.available():
+        zen = ZenHub('TOKEN', codec=name)
+        board = Board(data, zen.repository(1))
+        decode = best_of(lambda: zen.codec.loads(payload), args.repeat)
+        encode = best_of(lambda: zen.codec.encode(data), args.repeat)
+        pretty = best_of(lambda: str(board), args.repeat)
+        print(f'{name:10}{decode * 1000:12.1f}{encode * 1000:12.1f}{pretty * 1000:12.1f}')
+
+
+if __name__ == '__main__':
+    main()
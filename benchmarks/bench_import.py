@@ -0,0 +1,67 @@
+"""
+Import time benchmark
+
+Measures the cost of ``from zenhub import ZenHub`` with ``python -X importtime``
+in fresh interpreters and fails when it goes over budget, or when a heavy
+dependency such as ``requests`` is imported before the first request.
+
+Usage::
+
+    python -m benchmarks.bench_import [--budget-ms 25] [--runs 5]
+"""
+import re
+import sys
+import argparse
+import subprocess
+
+STATEMENT = 'from zenhub import ZenHub, Repository, Board, Pipeline, Epic, Issue, Workspace'
+FORBIDDEN = ('requests', 'urllib3')
+LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$')
+
+
+def measure(statement=STATEMENT):
+    """ Imports in a fresh interpreter and returns ({module: cumulative_us}, total_us) """
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement],
+                            stderr=subprocess.PIPE, universal_newlines=True, check=True)
+    modules = {}
+    total = 0
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if not match:
+            continue
+        cumulative, indent, name = int(match.group(2)), match.group(3), match.group(4)
+        modules[name] = cumulative
+        # only top level imports of the statement itself count towards the total
+        if not indent and (name == 'zenhub' or name.startswith('zenhub.')):
+            total += cumulative
+    return modules, total
+
+
+def main():
+    """ Runs the benchmark and exits with 1 if the budget is exceeded """
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--budget-ms', type=float, default=25.0,
+                        help='maximum import time of the zenhub package')
+    parser.add_argument('--runs', type=int, default=5, help='the best of n runs is used')
+    args = parser.parse_args()
+
+    best = None
+    for _ in range(args.runs):
+        modules, total = measure()
+        best = total if best is None else min(best, total)
+
+    failures = []
+    imported = [name for name in FORBIDDEN if name in modules]
+    if imported:
+        failures.append(f'imported eagerly: {", ".join(imported)}')
+    if best / 1000 > args.budget_ms:
+        failures.append(f'{best / 1000:.1f} ms is over the budget of {args.budget_ms:.1f} ms')
+
+    print(f'import zenhub: {best / 1000:.1f} ms (best of {args.runs}, budget {args.budget_ms:.1f} ms)')
+    for failure in failures:
+        print(f'FAIL: {failure}')
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
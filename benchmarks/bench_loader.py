@@ -0,0 +1,77 @@
+"""
+Board loader benchmark
+
+Loads a board and the details of all of its issues from a local stub server
+with some latency, one ``Issue.find`` after the other, with
+``Board.issue_details()`` and with a :class:`zenhub.loader.BoardLoader`, and
+reports the time to the first hydrated issue and the total load time.
+
+Usage::
+
+    python -m benchmarks.bench_loader [--issues 2000] [--latency 0.002]
+                                      [--workers 16] [--skip-sequential]
+"""
+import time
+import argparse
+from zenhub import ZenHub
+from zenhub.loader import BoardLoader
+from zenhub.transport import RequestsTransport
+from benchmarks.stub_server import StubServer
+from benchmarks.synthetic import board_data
+
+
+def sequential(zen, workers):
+    """ Returns (first issue, total) seconds of a board followed by one Issue.find per issue """
+    started = time.perf_counter()
+    first = None
+    repo = zen.repository(1)
+    board = repo.board()
+    for pipeline in board.data['pipelines']:
+        for issue_data in pipeline['issues']:
+            repo.issue(issue_data['issue_number'])
+            first = first or time.perf_counter() - started
+    return first, time.perf_counter() - started
+
+
+def issue_details(zen, workers):
+    """ Returns (first issue, total) seconds of a board followed by Board.issue_details() """
+    started = time.perf_counter()
+    zen.repository(1).board().issue_details(workers=workers)
+    # every issue is handed out at once
+    elapsed = time.perf_counter() - started
+    return elapsed, elapsed
+
+
+def loader(zen, workers):
+    """ Returns (first issue, total) seconds of a BoardLoader """
+    board_loader = BoardLoader(zen.repository(1), workers=workers)
+    board_loader.load()
+    return board_loader.first_issue, board_loader.elapsed
+
+
+def main():
+    """ Runs the benchmark """
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--issues', type=int, default=2000, help='issues on the board')
+    parser.add_argument('--latency', type=float, default=0.002, help='stub server latency')
+    parser.add_argument('--workers', type=int, default=16, help='requests sent at once')
+    parser.add_argument('--skip-sequential', action='store_true',
+                        help='do not run the one request at a time baseline')
+    args = parser.parse_args()
+
+    runs = [('issue_details', issue_details), ('BoardLoader', loader)]
+    if not args.skip_sequential:
+        runs.insert(0, ('sequential', sequential))
+    with StubServer({1: board_data(args.issues)}, latency=args.latency) as server:
+        print(f'{args.issues} issues, {args.latency * 1000:.1f} ms server latency, '
+              f'{args.workers} workers')
+        print(f'{"loader":>14}{"first issue ms":>16}{"total ms":>10}')
+        for name, run in runs:
+            zen = ZenHub('TOKEN', api_endpoint=server.url, transport=RequestsTransport.pooled())
+            first, total = run(zen, args.workers)
+            zen.transport.close()
+            print(f'{name:>14}{first * 1000:16.1f}{total * 1000:10.1f}')
+
+
+if __name__ == '__main__':
+    main()
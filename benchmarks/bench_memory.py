@@ -0,0 +1,185 @@
+"""
+Object model memory benchmark
+
+Builds Boards with their Pipelines and Issues, Epics with large issue lists
+and multi-repository workspaces from synthetic responses, and measures the
+construction time, the peak and retained memory and the number of live
+allocations per issue with ``tracemalloc``.
+
+The results are compared with the baselines stored in
+``benchmarks/baselines/memory.json`` and the run fails when the bytes or
+allocations per issue of a scenario grow by more than ``--threshold``.
+Run with ``--update`` to store new baselines after an intended change.
+
+Usage::
+
+    python -m benchmarks.bench_memory [--scenario board-10k] [--threshold 0.10]
+                                      [--update] [--repeat 3]
+"""
+import gc
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tracemalloc
+from zenhub import ZenHub
+from zenhub.transport import Transport, CassetteResponse
+from benchmarks.synthetic import board_data, epic_data, SyntheticTransport
+
+BASELINES = os.path.join(os.path.dirname(__file__), 'baselines', 'memory.json')
+
+# the metrics compared with the baselines
+CHECKED = ('bytes_per_issue', 'blocks_per_issue')
+
+
+class EncodedTransport(Transport):
+    """ Serves responses that were encoded before the measurement starts """
+
+    def __init__(self, source, urls):
+        self.responses = {url: source.request('GET', url, {}) for url in urls}
+
+    def request(self, method, url, headers, data=None, timeout=None):
+        response = self.responses[url]
+        return CassetteResponse(response.status_code, response.headers, response.content, url)
+
+
+def _board(zen, repo_id):
+    """ Loads a board and builds every Pipeline and Issue on it """
+    board = zen.repository(repo_id).board()
+    issues = [issue for pipeline in board.pipelines() for issue in pipeline.issues]
+    return board, issues
+
+
+def board_scenario(num_issues):
+    """ Returns (transport, run, issues) for a board with ``num_issues`` issues """
+    source = SyntheticTransport({1: board_data(num_issues)})
+    transport = EncodedTransport(source, ['https://api.zenhub.io/p1/repositories/1/board'])
+    return transport, lambda zen: _board(zen, 1), num_issues
+
+
+def epic_scenario(num_issues):
+    """ Returns (transport, run, issues) for an epic with ``num_issues`` issues """
+    source = SyntheticTransport({1: board_data(0)}, epics={1: {7: epic_data(1, num_issues)}})
+    transport = EncodedTransport(source, ['https://api.zenhub.io/p1/repositories/1/epics/7'])
+
+    def run(zen):
+        epic = zen.repository(1).epic(7)
+        return epic, epic.issues
+    return transport, run, num_issues
+
+
+def workspace_scenario(num_repos, per_repo):
+    """ Returns (transport, run, issues) for the boards of ``num_repos`` repositories """
+    repos = {repo_id: board_data(per_repo, seed=repo_id) for repo_id in range(1, num_repos + 1)}
+    source = SyntheticTransport(repos)
+    transport = EncodedTransport(source, [f'https://api.zenhub.io/p1/repositories/{repo_id}/board'
+                                          for repo_id in repos])
+    return transport, lambda zen: [_board(zen, repo_id) for repo_id in repos], num_repos * per_repo
+
+
+SCENARIOS = {
+    'board-1k': lambda: board_scenario(1000),
+    'board-10k': lambda: board_scenario(10000),
+    'board-100k': lambda: board_scenario(100000),
+    'epic-10k': lambda: epic_scenario(10000),
+    'epic-100k': lambda: epic_scenario(100000),
+    'workspace-20x5k': lambda: workspace_scenario(20, 5000),
+}
+
+
+def measure(transport, run, num_issues, repeat):
+    """ Returns the metrics of one scenario """
+    best = None
+    for _ in range(repeat):
+        zen = ZenHub('TOKEN', transport=transport, codec='json')
+        gc.collect()
+        started = time.perf_counter()
+        result = run(zen)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+        del result, zen
+
+    zen = ZenHub('TOKEN', transport=transport, codec='json')
+    gc.collect()
+    tracemalloc.start()
+    result = run(zen)
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics('filename'))
+    tracemalloc.stop()
+    del result
+    return {
+        'issues': num_issues,
+        'seconds': round(best, 4),
+        'us_per_issue': round(best / num_issues * 1e6, 3),
+        'peak_bytes': peak,
+        'retained_bytes': current,
+        'bytes_per_issue': round(current / num_issues, 1),
+        'blocks_per_issue': round(blocks / num_issues, 2),
+    }
+
+
+def compare(results, baselines, threshold):
+    """ Returns the failures of the results against the baselines """
+    failures = []
+    for name, metrics in results.items():
+        baseline = baselines.get(name)
+        if baseline is None:
+            continue
+        for key in CHECKED:
+            if metrics[key] > baseline[key] * (1 + threshold):
+                failures.append(f'{name}: {key} grew from {baseline[key]} to {metrics[key]}'
+                                f' (more than {threshold:.0%})')
+    return failures
+
+
+def main():
+    """ Runs the benchmark and exits with 1 if a scenario regressed """
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS),
+                        help='scenario to run (repeatable, default: all)')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='allowed growth of the per issue metrics (default: 0.10)')
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs, the best is kept')
+    parser.add_argument('--baselines', default=BASELINES, help='the baselines file')
+    parser.add_argument('--update', action='store_true', help='store the results as baselines')
+    args = parser.parse_args()
+
+    stored = {}
+    if os.path.exists(args.baselines):
+        with open(args.baselines) as baselines_file:
+            stored = json.load(baselines_file)
+    python = platform.python_version()
+    if stored.get('python') and stored['python'].rsplit('.', 1)[0] != python.rsplit('.', 1)[0]:
+        print(f'note: baselines were stored with Python {stored["python"]}, running {python}')
+
+    results = {}
+    print(f'{"scenario":18}{"issues":>9}{"ms":>9}{"µs/issue":>10}{"peak MB":>9}'
+          f'{"kept MB":>9}{"B/issue":>9}{"blocks":>8}')
+    for name in args.scenario or SCENARIOS:
+        transport, run, num_issues = SCENARIOS[name]()
+        metrics = results[name] = measure(transport, run, num_issues, args.repeat)
+        print(f'{name:18}{metrics["issues"]:9}{metrics["seconds"] * 1000:9.1f}'
+              f'{metrics["us_per_issue"]:10.2f}{metrics["peak_bytes"] / 2**20:9.1f}'
+              f'{metrics["retained_bytes"] / 2**20:9.1f}{metrics["bytes_per_issue"]:9.0f}'
+              f'{metrics["blocks_per_issue"]:8.1f}')
+
+    if args.update:
+        scenarios = dict(stored.get('scenarios', {}), **results)
+        with open(args.baselines, 'w') as baselines_file:
+            json.dump({'python': python, 'scenarios': scenarios}, baselines_file,
+                      indent=2, sort_keys=True)
+            baselines_file.write('\n')
+        print(f'baselines stored in {args.baselines}')
+        return
+
+    failures = compare(results, stored.get('scenarios', {}), args.threshold)
+    for failure in failures:
+        print(f'FAIL: {failure}')
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+Projection memory benchmark
+
+Loads a synthetic workspace (100k issues spread over several repositories by
+default) and keeps its Boards and the details of every issue, once with all
+fields and once with ``fields=[...]``, and reports the memory retained.
+
+Usage::
+
+    python -m benchmarks.bench_projection [--issues 100000] [--repos 20]
+                                          [--fields estimate]
+"""
+import gc
+import time
+import argparse
+import tracemalloc
+from zenhub import ZenHub
+from benchmarks.synthetic import board_data, SyntheticTransport
+
+
+def load(transport, repo_ids, fields):
+    """ Loads every board and the details of every issue, returns what is retained """
+    zen = ZenHub('TOKEN', transport=transport)
+    boards = [zen.repository(repo_id).board(fields=fields) for repo_id in repo_ids]
+    issues = [board.repo.issue(issue.number, fields=fields) for board in boards
+              for pipeline in board.pipelines() for issue in pipeline.issues]
+    return boards, issues
+
+
+def measure(transport, repo_ids, fields):
+    """ Returns (retained bytes, peak bytes, seconds, issue count) """
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    retained = load(transport, repo_ids, fields)
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current, peak, elapsed, len(retained[1])
+
+
+def main():
+    """ Runs the benchmark """
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--issues', type=int, default=100000, help='issues in the workspace')
+    parser.add_argument('--repos', type=int, default=20, help='repositories in the workspace')
+    parser.add_argument('--fields', action='append', default=None,
+                        help='issue field to keep (repeatable, default: estimate)')
+    args = parser.parse_args()
+
+    fields = args.fields or ['estimate']
+    per_repo = args.issues // args.repos
+    repos = {repo_id: board_data(per_repo, seed=repo_id) for repo_id in range(1, args.repos + 1)}
+    transport = SyntheticTransport(repos)
+
+    print(f'{per_repo * args.repos} issues in {args.repos} repositories')
+    print(f'{"fields":28}{"retained MB":>12}{"peak MB":>10}{"B/issue":>10}{"seconds":>10}')
+    for label, projection in (('all', None), (','.join(fields), fields)):
+        current, peak, elapsed, count = measure(transport, list(repos), projection)
+        print(f'{label:28}{current / 2**20:12.1f}{peak / 2**20:10.1f}'
+              f'{current / count:10.0f}{elapsed:10.2f}')
+
+
+if __name__ == '__main__':
+    main()
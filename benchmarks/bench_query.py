@@ -0,0 +1,57 @@
+"""
+Query benchmark
+
+Loads a synthetic workspace (100k issues spread over several repositories by
+default) and times typical queries, including the first query of each field
+that builds its index.
+
+Usage::
+
+    python -m benchmarks.bench_query [--issues 100000] [--repos 20] [--repeat 1000]
+"""
+import time
+import argparse
+from zenhub import ZenHub
+from zenhub.query import Query
+from benchmarks.synthetic import board_data, SyntheticTransport
+
+QUERIES = [
+    {'pipeline': 'In Progress', 'estimate_gte': 8, 'is_epic': True},
+    {'pipeline': 'Review/QA', 'estimate': 13, 'limit': 10},
+    {'is_epic': True, 'order_by': '-estimate', 'limit': 10},
+    {'repo_id': 3, 'position_lt': 5},
+    {'estimate_gte': 13, 'pipeline': 'Backlog', 'repo_id': 7},
+]
+
+
+def main():
+    """ Runs the benchmark """
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--issues', type=int, default=100000, help='issues in the workspace')
+    parser.add_argument('--repos', type=int, default=20, help='repositories in the workspace')
+    parser.add_argument('--repeat', type=int, default=1000, help='runs of each query')
+    args = parser.parse_args()
+
+    per_repo = args.issues // args.repos
+    repos = {repo_id: board_data(per_repo, seed=repo_id) for repo_id in range(1, args.repos + 1)}
+    zen = ZenHub('TOKEN', transport=SyntheticTransport(repos))
+    boards = [zen.repository(repo_id).board() for repo_id in repos]
+
+    started = time.perf_counter()
+    query = Query(boards)
+    print(f'{len(query)} issues, query built in {(time.perf_counter() - started) * 1000:.1f} ms')
+    print(f'{"query":64}{"first ms":>10}{"µs":>10}{"rows":>8}')
+    for conditions in QUERIES:
+        started = time.perf_counter()
+        rows = query.numbers(**conditions)
+        first = time.perf_counter() - started
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            query.numbers(**conditions)
+        elapsed = (time.perf_counter() - started) / args.repeat
+        label = ', '.join(f'{key}={value!r}' for key, value in conditions.items())
+        print(f'{label:64}{first * 1000:10.1f}{elapsed * 1e6:10.1f}{len(rows):8}')
+
+
+if __name__ == '__main__':
+    main()
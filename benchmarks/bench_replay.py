@@ -0,0 +1,84 @@
+"""
+Replay benchmark
+
+Replays a cassette (recorded with :class:`zenhub.transport.RecordingTransport`)
+and times how long it takes to load the boards and the details of every
+issue on them. Without a cassette, a synthetic one is recorded first.
+
+Usage::
+
+    python -m benchmarks.bench_replay [--cassette FILE] [--repos 5] [--issues 2000]
+                                      [--latency recorded] [--codec json]
+"""
+import os
+import time
+import argparse
+import tempfile
+from zenhub import ZenHub
+from zenhub.transport import RecordingTransport, ReplayTransport
+from benchmarks.synthetic import board_data, SyntheticTransport
+
+
+def record_synthetic(path, num_repos, num_issues):
+    """ Records a synthetic workspace to a cassette and returns the repo ids """
+    repos = {repo_id: board_data(num_issues, seed=repo_id) for repo_id in range(1, num_repos + 1)}
+    with RecordingTransport(path, SyntheticTransport(repos)) as recorder:
+        crawl(ZenHub('TOKEN', transport=recorder), repos)
+    return list(repos)
+
+
+def crawl(zen, repo_ids):
+    """ Loads the board and every issue of every repository """
+    count = 0
+    for repo_id in repo_ids:
+        repo = zen.repository(repo_id)
+        board = repo.board()
+        for pipeline in board.pipelines():
+            for issue in pipeline.issues:
+                repo.issue(issue.number)
+                count += 1
+    return count
+
+
+def main():
+    """ Runs the benchmark """
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--cassette', help='a recorded cassette to replay')
+    parser.add_argument('--repo', type=int, action='append', dest='repo_ids',
+                        help='repository id in the cassette (repeatable)')
+    parser.add_argument('--repos', type=int, default=5, help='synthetic repositories')
+    parser.add_argument('--issues', type=int, default=2000, help='synthetic issues per board')
+    parser.add_argument('--latency', default=None,
+                        help="seconds per response or 'recorded'")
+    parser.add_argument('--codec', default=None,
+                        help='JSON codec to decode with (default: fastest installed)')
+    args = parser.parse_args()
+
+    latency = args.latency
+    if latency not in (None, ReplayTransport.RECORDED):
+        latency = float(latency)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cassette = args.cassette
+        repo_ids = args.repo_ids
+        if not cassette:
+            cassette = os.path.join(tmpdir, 'synthetic.cassette')
+            repo_ids = record_synthetic(cassette, args.repos, args.issues)
+        started = time.perf_counter()
+        transport = ReplayTransport(cassette, latency=latency)
+        loaded = time.perf_counter() - started
+
+        started = time.perf_counter()
+        zen = ZenHub('TOKEN', transport=transport, codec=args.codec)
+        count = crawl(zen, repo_ids or [])
+        elapsed = time.perf_counter() - started
+
+    print(f'cassette:      {os.path.basename(cassette)} ({len(transport)} interactions)')
+    print(f'codec:         {zen.codec.name}')
+    print(f'load cassette: {loaded * 1000:.1f} ms')
+    print(f'crawl:         {elapsed * 1000:.1f} ms for {count} issues '
+          f'({count / elapsed if elapsed else 0:.0f} issues/s)')
+
+
+if __name__ == '__main__':
+    main()
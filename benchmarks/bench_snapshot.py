@@ -0,0 +1,76 @@
+"""
+Snapshot benchmark
+
+Compares saving a large board as JSON (as ``Board.__str__`` does) with a
+binary snapshot, and reopening it to look up a few issues.
+
+Usage::
+
+    python -m benchmarks.bench_snapshot [--issues 100000] [--lookups 1000]
+"""
+import os
+import json
+import time
+import random
+import argparse
+import tempfile
+from zenhub import ZenHub, Board
+from benchmarks.synthetic import board_data
+
+
+def timed(func):
+    """ Returns (result, seconds) """
+    started = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - started
+
+
+def main():
+    """ Runs the benchmark """
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--issues', type=int, default=100000, help='issues on the board')
+    parser.add_argument('--lookups', type=int, default=1000, help='issues to look up')
+    args = parser.parse_args()
+
+    repo = ZenHub('TOKEN').repository(1)
+    board = Board(board_data(args.issues), repo)
+    numbers = random.Random(0).sample(range(1, args.issues + 1), min(args.lookups, args.issues))
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        json_path = os.path.join(tmpdir, 'board.json')
+        snapshot_path = os.path.join(tmpdir, 'board.snapshot')
+
+        def save_json():
+            with open(json_path, 'w') as output:
+                json.dump(board.data, output, indent=4)
+
+        def open_json():
+            with open(json_path) as json_file:
+                return Board(json.load(json_file), repo)
+
+        def lookup_json():
+            loaded = open_json()
+            return [loaded.issue(number) for number in numbers]
+
+        def lookup_snapshot():
+            loaded = Board.load(snapshot_path, repo)
+            return [loaded.issue(number) for number in numbers]
+
+        _, json_save = timed(save_json)
+        _, snapshot_save = timed(lambda: board.save(snapshot_path))
+        _, json_open = timed(open_json)
+        _, snapshot_open = timed(lambda: Board.load(snapshot_path, repo))
+        _, json_lookup = timed(lookup_json)
+        _, snapshot_lookup = timed(lookup_snapshot)
+
+        print(f'{args.issues} issues, {len(numbers)} lookups')
+        print(f'{"":12}{"json":>12}{"snapshot":>12}')
+        print(f'{"size (KB)":12}{os.path.getsize(json_path) / 1024:12.0f}'
+              f'{os.path.getsize(snapshot_path) / 1024:12.0f}')
+        print(f'{"save (ms)":12}{json_save * 1000:12.1f}{snapshot_save * 1000:12.1f}')
+        print(f'{"open (ms)":12}{json_open * 1000:12.1f}{snapshot_open * 1000:12.1f}')
+        print(f'{"lookup (ms)":12}{json_lookup * 1000:12.1f}{snapshot_lookup * 1000:12.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+Thread contention benchmark
+
+Shares one ZenHub client (pooled transport, response cache and identity map)
+between 1 to 64 threads that look up issues on a local stub server, and
+reports how the throughput scales with the number of threads.
+
+Usage::
+
+    python -m benchmarks.bench_threads [--requests 2000] [--latency 0.005]
+                                       [--threads 1 --threads 8 ...]
+"""
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from zenhub import ZenHub
+from zenhub.cache import ResponseCache
+from zenhub.transport import RequestsTransport
+from benchmarks.stub_server import StubServer
+from benchmarks.synthetic import board_data
+
+THREADS = [1, 2, 4, 8, 16, 32, 64]
+
+
+def run(server, threads, requests, cache):
+    """ Returns the requests per second with ``threads`` threads """
+    zen = ZenHub('TOKEN', api_endpoint=server.url, transport=RequestsTransport.pooled(),
+                 cache=ResponseCache() if cache else None)
+    repo_ids = list(server.repos)
+    per_repo = len(server.repos[repo_ids[0]]['pipelines'][0]['issues']) or 1
+
+    def lookup(index):
+        repo = zen.repository(repo_ids[index % len(repo_ids)])
+        # with a cache, every issue is looked up twice
+        return repo.issue((index // 2 if cache else index) % per_repo + 1)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        for _ in executor.map(lookup, range(requests)):
+            pass
+    elapsed = time.perf_counter() - started
+    zen.transport.close()
+    return requests / elapsed
+
+
+def main():
+    """ Runs the benchmark """
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--requests', type=int, default=2000, help='lookups per run')
+    parser.add_argument('--latency', type=float, default=0.005, help='stub server latency')
+    parser.add_argument('--threads', type=int, action='append', help='thread counts to run')
+    parser.add_argument('--cache', action='store_true', help='share a response cache')
+    args = parser.parse_args()
+
+    repos = {repo_id: board_data(500, seed=repo_id) for repo_id in range(1, 5)}
+    with StubServer(repos, latency=args.latency) as server:
+        print(f'{args.requests} issue lookups, {args.latency * 1000:.1f} ms server latency')
+        print(f'{"threads":>8}{"req/s":>10}{"speedup":>10}')
+        baseline = None
+        for threads in args.threads or THREADS:
+            throughput = run(server, threads, args.requests, args.cache)
+            baseline = baseline or throughput
+            print(f'{threads:8}{throughput:10.0f}{throughput / baseline:10.1f}x')
+
+
+if __name__ == '__main__':
+    main()
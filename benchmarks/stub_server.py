@@ -0,0 +1,98 @@
+"""
+Local ZenHub stub server
+
+A threaded http server that answers board and issue requests for synthetic
+repositories (see :class:`benchmarks.synthetic.SyntheticTransport`) with an
+optional latency, so that benchmarks can measure real sockets and
+connection pools without touching the ZenHub API.
+
+Usage::
+
+    with StubServer(repos, latency=0.005) as server:
+        zen = ZenHub('TOKEN', api_endpoint=server.url)
+
+"""
+import time
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from benchmarks.synthetic import SyntheticTransport
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """ Serves every request from the server's synthetic transport """
+
+    protocol_version = 'HTTP/1.1'
+    # headers and body are written separately, don't let Nagle delay the body
+    disable_nagle_algorithm = True
+
+    def _respond(self):
+        server = self.server
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else None
+        status, headers, content = server.stub.respond(self.command, self.path, self.headers, body)
+        if server.stub.latency:
+            time.sleep(server.stub.latency)
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    do_GET = do_POST = do_PUT = do_PATCH = _respond
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+
+class StubServer:
+    """ Serves synthetic repositories on a free local port
+
+    :type repos: dict
+    :param repos: A map of repo_id to board data
+    :type latency: float
+    :param latency: Seconds to wait before every response
+    """
+
+    def __init__(self, repos, latency=0.0, host='127.0.0.1'):
+        self.repos = repos
+        self.latency = latency
+        self.requests = 0
+        self._transport = SyntheticTransport(repos, api_endpoint='')
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, 0), _Handler)
+        self._server.daemon_threads = True
+        self._server.stub = self
+        self._thread = None
+
+    @property
+    def url(self):
+        """ The api endpoint of the server """
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def respond(self, method, path, headers, body):
+        """ Returns (status, headers, content) for a request, override to add behaviour """
+        with self._lock:
+            self.requests += 1
+        response = self._transport.request(method, path, headers, body)
+        return response.status_code, {}, response.content
+
+    def start(self):
+        """ Starts serving in a background thread """
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """ Stops the server """
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -0,0 +1,138 @@
+"""
+Synthetic ZenHub data
+
+Builds ZenHub API payloads of any size so that benchmarks can run without
+a network connection or a real workspace.
+"""
+import json
+import random
+from zenhub.transport import Transport, CassetteResponse
+
+PIPELINE_NAMES = ['New Issues', 'Icebox', 'Backlog', 'In Progress', 'Review/QA', 'Done', 'Closed']
+ESTIMATES = [None, 1, 2, 3, 5, 8, 13]
+
+
+def board_data(num_issues, num_pipelines=len(PIPELINE_NAMES), seed=42):
+    """ Returns the data of a board with ``num_issues`` issues """
+    rand = random.Random(seed)
+    pipelines = [
+        {
+            'id': '5d0a7a9741fd098f6b7f%04x' % index,
+            'name': PIPELINE_NAMES[index % len(PIPELINE_NAMES)],
+            'issues': [],
+        }
+        for index in range(num_pipelines)
+    ]
+    for number in range(1, num_issues + 1):
+        issues = rand.choice(pipelines)['issues']
+        issue = {
+            'issue_number': number,
+            'is_epic': rand.random() < 0.02,
+            'position': len(issues),
+        }
+        estimate = rand.choice(ESTIMATES)
+        if estimate is not None:
+            issue['estimate'] = {'value': estimate}
+        issues.append(issue)
+    return {'pipelines': pipelines}
+
+
+def issue_data(number, board):
+    """ Returns the data of a single issue as it is found on ``board`` """
+    for pipeline in board['pipelines']:
+        for issue in pipeline['issues']:
+            if issue['issue_number'] == number:
+                return _issue_details(pipeline, issue, board)
+    return None
+
+
+def _issue_details(pipeline, issue, board):
+    """ Returns the issue data the API returns for an issue in a pipeline """
+    return {
+        'estimate': issue.get('estimate'),
+        'plus_ones': [],
+        'pipeline': {
+            'name': pipeline['name'],
+            'pipeline_id': pipeline['id'],
+            'workspace_id': '5d0a7a9741fd098f6b7f58ac',
+        },
+        'pipelines': [
+            {
+                'name': other['name'],
+                'pipeline_id': other['id'],
+                'workspace_id': '5d0a7a9741fd098f6b7f58ac',
+            }
+            for other in board['pipelines'][:2]
+        ],
+        'is_epic': issue['is_epic'],
+    }
+
+
+def epic_data(repo_id, num_issues, seed=42):
+    """ Returns the data of an epic with ``num_issues`` child issues """
+    rand = random.Random(seed)
+    issues = [
+        {
+            'issue_number': number,
+            'is_epic': False,
+            'repo_id': repo_id,
+            'estimate': {'value': rand.choice(ESTIMATES[1:])},
+            'pipeline': {'name': rand.choice(PIPELINE_NAMES),
+                         'pipeline_id': '5d0a7a9741fd098f6b7f58a8',
+                         'workspace_id': '5d0a7a9741fd098f6b7f58ac'},
+        }
+        for number in range(1, num_issues + 1)
+    ]
+    return {
+        'total_epic_estimates': {'value': sum(issue['estimate']['value'] for issue in issues)},
+        'estimate': {'value': 10},
+        'pipeline': {'name': 'Backlog', 'pipeline_id': '5d0a7a9741fd098f6b7f58a8',
+                     'workspace_id': '5d0a7a9741fd098f6b7f58ac'},
+        'pipelines': [],
+        'issues': issues,
+    }
+
+
+class SyntheticTransport(Transport):
+    """ Answers board, issue and epic requests for a set of synthetic repositories
+
+    :type repos: dict
+    :param repos: A map of repo_id to board data
+    :type epics: dict
+    :param epics: A map of repo_id to a map of epic number to epic data
+    """
+
+    def __init__(self, repos, api_endpoint='https://api.zenhub.io', epics=None):
+        self.repos = repos
+        self.epics = epics or {}
+        self.api_endpoint = api_endpoint
+        self._issues = {}
+
+    def _issue(self, repo_id, number):
+        """ Returns the details of an issue using an index built on first use """
+        if repo_id not in self._issues:
+            board = self.repos[repo_id]
+            self._issues[repo_id] = {
+                issue['issue_number']: (pipeline, issue)
+                for pipeline in board['pipelines'] for issue in pipeline['issues']
+            }
+        found = self._issues[repo_id].get(number)
+        if found is None:
+            return None
+        return _issue_details(found[0], found[1], self.repos[repo_id])
+
+    def request(self, method, url, headers, body=None, timeout=None):
+        parts = url[len(self.api_endpoint):].strip('/').split('/')
+        data = None
+        if len(parts) >= 4 and parts[1] == 'repositories':
+            board = self.repos.get(int(parts[2]))
+            if board is not None and parts[3] == 'board':
+                data = board
+            elif board is not None and parts[3] == 'issues' and len(parts) == 5:
+                data = self._issue(int(parts[2]), int(parts[4]))
+            elif parts[3] == 'epics' and len(parts) == 5:
+                data = self.epics.get(int(parts[2]), {}).get(int(parts[4]))
+        if data is None:
+            return CassetteResponse(404, {'Content-Length': '0'}, b'', url)
+        content = json.dumps(data).encode('utf-8')
+        return CassetteResponse(200, {'Content-Length': str(len(content))}, content, url)
@@ -0,0 +1,120 @@
+"""
+Stub transports and clocks shared by the test cases
+"""
+import re
+import json
+import time
+import threading
+from collections import namedtuple
+from urllib.parse import urlsplit
+from zenhub.transport import Transport, CassetteResponse
+
+# a request as seen by StubTransport, ``path`` is the url without the endpoint
+Request = namedtuple('Request', 'method path headers data timeout')
+
+
+def json_response(status, data, url, headers=None):
+    """ Returns a CassetteResponse with ``data`` encoded as JSON (no body for ``None``) """
+    content = b'' if data is None else json.dumps(data).encode('utf-8')
+    return CassetteResponse(status, dict({'Content-Length': str(len(content))}, **(headers or {})),
+                            content, url)
+
+
+class StubTransport(Transport):
+    """ A configurable stand-in for the ZenHub API
+
+    Every request is answered by the first route whose pattern is found in
+    the path of the request. An answer is one of:
+
+        a dict or list         sent with status 200
+        ``None``               a 404 without a body
+        ``(status, data)``     or ``(status, data, headers)``
+        a CassetteResponse     sent as it is
+        a callable             called with the :data:`Request` and the groups
+                               of the pattern, returns one of the above
+
+    A path that matches no route is answered with 404. Before answering the
+    transport sleeps ``latency`` seconds and raises ``error`` if it is set,
+    and ``status`` (if set) replaces the status of every answer.
+
+    :type routes: list
+    :param routes: ``(pattern, answer)`` pairs, see also :meth:`route`
+    """
+
+    def __init__(self, routes=(), latency=0.0):
+        self.routes = [(re.compile(pattern), answer) for pattern, answer in routes]
+        self.latency = latency
+        self.error = None
+        self.status = None
+        self.requests = []
+        self.in_flight = 0
+        self.most_in_flight = 0
+        self._lock = threading.Lock()
+
+    def route(self, pattern, answer):
+        """ Adds a route after the others and returns the transport """
+        self.routes.append((re.compile(pattern), answer))
+        return self
+
+    def paths(self, method=None):
+        """ Returns the paths that were requested, only the ``method`` ones if given """
+        with self._lock:
+            return [request.path for request in self.requests
+                    if method is None or request.method == method]
+
+    def request(self, method, url, headers, data=None, timeout=None):
+        request = Request(method, urlsplit(url).path, headers, data, timeout)
+        with self._lock:
+            self.requests.append(request)
+            self.in_flight += 1
+            self.most_in_flight = max(self.most_in_flight, self.in_flight)
+        try:
+            if self.latency:
+                time.sleep(self.latency)
+            if self.error is not None:
+                raise self.error
+            return self._answer(request, url)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def _answer(self, request, url):
+        answer, groups = None, ()
+        for pattern, route_answer in self.routes:
+            match = pattern.search(request.path)
+            if match:
+                answer, groups = route_answer, match.groups()
+                break
+        if callable(answer):
+            answer = answer(request, *groups)
+        if isinstance(answer, CassetteResponse):
+            return answer
+        if isinstance(answer, tuple):
+            status, data, headers = (answer + (None,))[:3]
+        elif answer is None:
+            status, data, headers = 404, None, None
+        else:
+            status, data, headers = 200, answer, None
+        return json_response(self.status or status, data, url, headers)
+
+
+class FakeClock:
+    """ A monotonic and a wall clock that only move when told to or slept on
+
+    :type now: float
+    :param now: The monotonic time to start at
+    """
+
+    def __init__(self, now=0.0):
+        self.now = now
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def wall(self):
+        return 1.6e9 + self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
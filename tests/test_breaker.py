@@ -0,0 +1,115 @@
+"""
+Test cases for the circuit breaker and stale responses
+"""
+import json
+import time
+from unittest import TestCase
+from requests.exceptions import ConnectionError as RequestsConnectionError, HTTPError
+from zenhub import ZenHub
+from zenhub.breaker import CircuitBreaker, CircuitOpenError, CLOSED, OPEN, HALF_OPEN
+from zenhub.cache import StaleData, is_stale
+from helpers import StubTransport, FakeClock
+
+BOARD_DATA = {}
+
+######################################################################
+#  T E S T   C A S E S
+######################################################################
+class TestCircuitBreaker(TestCase):
+    """ Test Cases for CircuitBreaker """
+
+    @classmethod
+    def setUpClass(cls):
+        global BOARD_DATA
+        with open('tests/fixtures/board_with_issues.json') as json_data:
+            BOARD_DATA = json.load(json_data)
+
+    def setUp(self):
+        self.flaky = StubTransport([(r'/board$', BOARD_DATA)])
+        self.clock = FakeClock()
+        self.breaker = CircuitBreaker(self.flaky, failure_ratio=0.5, minimum_requests=4,
+                                      window=10, reset_timeout=30, clock=self.clock)
+
+    def send(self):
+        return self.breaker.request('GET', 'https://api.zenhub.io/p1/repositories/1/board', {})
+
+    def test_trip_and_recover(self):
+        """ The breaker opens on errors and closes after a good trial """
+        self.send()
+        self.flaky.status = 503
+        self.send()
+        self.send()
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.flaky.error = RequestsConnectionError('refused')
+        self.assertRaises(RequestsConnectionError, self.send)
+        self.assertEqual(self.breaker.state, OPEN)
+        calls = len(self.flaky.requests)
+        self.assertRaises(CircuitOpenError, self.send)
+        self.assertEqual(len(self.flaky.requests), calls)
+        self.clock.now = 31
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        # a failed trial opens the breaker again
+        self.assertRaises(RequestsConnectionError, self.send)
+        self.assertEqual(self.breaker.state, OPEN)
+        self.clock.now = 62
+        self.flaky.error = None
+        self.flaky.status = 200
+        self.send()
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.assertEqual(self.breaker.stats(), {'state': CLOSED, 'trips': 2, 'rejected': 1,
+                                                'requests': 0, 'failures': 0})
+
+    def test_old_failures_expire(self):
+        """ Only the failures in the window count """
+        self.flaky.status = 500
+        for _ in range(3):
+            self.send()
+        self.clock.now = 11
+        self.flaky.status = 200
+        self.send()
+        self.assertEqual(self.breaker.state, CLOSED)
+
+    def test_slow_calls(self):
+        """ Slow requests count as failures """
+        breaker = CircuitBreaker(self.flaky, minimum_requests=2, slow_call=0.01)
+        self.flaky.latency = 0.02
+        for _ in range(2):
+            breaker.request('GET', 'https://api.zenhub.io/p1/repositories/1/board', {})
+        self.assertEqual(breaker.state, OPEN)
+
+    def test_serve_stale(self):
+        """ The last good response is served while the breaker is open """
+        zen = ZenHub('ZENHUB_TOKEN', transport=self.breaker, serve_stale=3600)
+        repo = zen.repository(123)
+        board = repo.board()
+        self.assertFalse(board.stale)
+        self.flaky.error = RequestsConnectionError('refused')
+        for _ in range(4):
+            board = repo.board()
+            self.assertTrue(board.stale)
+            self.assertEqual(board.data, BOARD_DATA)
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertEqual(zen.stale_served, 4)
+        self.assertTrue(is_stale(zen.get('/p1/repositories/123/board')))
+        # nothing to serve for a path that never succeeded
+        self.assertRaises(CircuitOpenError, zen.get, '/p1/repositories/456/board')
+        # client errors are not hidden
+        breaker = CircuitBreaker(self.flaky)
+        zen = ZenHub('ZENHUB_TOKEN', transport=breaker, serve_stale=3600)
+        self.flaky.error = None
+        zen.repository(123).board()
+        self.flaky.status = 401
+        self.assertRaises(HTTPError, zen.repository(123).board)
+
+    def test_revalidate(self):
+        """ A stale serve fetches the path again in the background """
+        zen = ZenHub('ZENHUB_TOKEN', transport=self.flaky, serve_stale=3600)
+        zen.get('/p1/repositories/123/board')
+        self.flaky.status = 502
+        data = zen.get('/p1/repositories/123/board')
+        self.assertIsInstance(data, StaleData)
+        for _ in range(100):
+            if len(self.flaky.requests) == 3:
+                break
+            time.sleep(0.01)
+        self.assertEqual(len(self.flaky.requests), 3)
@@ -0,0 +1,122 @@
+"""
+Test cases for the zenhub command line
+"""
+import io
+import json
+from unittest import TestCase, mock
+from zenhub import ZenHub
+from zenhub.cache import ResponseCache
+from zenhub.cli import main, export
+from helpers import StubTransport
+
+BOARD_DATA = {}
+ISSUE_DATA = {}
+
+######################################################################
+#  T E S T   C A S E S
+######################################################################
+class TestCli(TestCase):
+    """ Test Cases for the command line """
+
+    @classmethod
+    def setUpClass(cls):
+        global BOARD_DATA, ISSUE_DATA
+        with open('tests/fixtures/board_with_issues.json') as json_data:
+            BOARD_DATA = json.load(json_data)
+        with open('tests/fixtures/issue.json') as json_data:
+            ISSUE_DATA = json.load(json_data)
+
+    def setUp(self):
+        self.transport = StubTransport([
+            (r'^/p1/repositories/123/board$', BOARD_DATA),
+            (r'^/p1/repositories/123/issues/', ISSUE_DATA),
+            (r'^/p1/repositories/500/board$', (500, None)),
+        ])
+        self.zen = ZenHub('ZENHUB_TOKEN', transport=self.transport, cache=ResponseCache())
+
+    def test_export_board(self):
+        """ Export one record per board issue """
+        records = list(export(self.zen, 'board', [123, 404]))
+        count = sum(len(pipeline['issues']) for pipeline in BOARD_DATA['pipelines'])
+        self.assertEqual(len(records), count)
+        self.assertEqual(records[0]['repo_id'], 123)
+        self.assertIn('pipeline_name', records[0])
+
+    def test_export_issues(self):
+        """ Export the details of every issue """
+        records = list(export(self.zen, 'issues', [123], workers=4))
+        numbers = sorted(issue['issue_number'] for pipeline in BOARD_DATA['pipelines']
+                         for issue in pipeline['issues'])
+        self.assertEqual(sorted(record['issue_number'] for record in records), numbers)
+        self.assertEqual(records[0]['pipeline'], ISSUE_DATA['pipeline'])
+
+    def test_export_errors(self):
+        """ A failing repository is skipped """
+        errors = []
+        records = list(export(self.zen, 'board', [500, 123], errors=errors))
+        self.assertEqual(errors, [500])
+        self.assertTrue(records)
+
+    def test_export_uses_cache(self):
+        """ Repeated exports are served from the cache """
+        list(export(self.zen, 'board', [123]))
+        list(export(self.zen, 'board', [123]))
+        self.assertEqual(len(self.transport.requests), 1)
+
+    @mock.patch('zenhub.transport.RequestsTransport.pooled')
+    def test_main(self, mock_pooled):
+        """ Stream NDJSON to stdout with repo ids from stdin """
+        mock_pooled.return_value = self.transport
+        stdout = io.StringIO()
+        status = main(['board', '--token', 'ZENHUB_TOKEN', '-'],
+                      stdin=io.StringIO('123\n'), stdout=stdout)
+        self.assertEqual(status, 0)
+        lines = stdout.getvalue().splitlines()
+        self.assertTrue(lines)
+        self.assertEqual(json.loads(lines[0])['repo_id'], 123)
+
+    @mock.patch('zenhub.transport.RequestsTransport.pooled')
+    def test_main_bounded_cache(self, mock_pooled):
+        """ The command line caches a few responses per worker """
+        mock_pooled.return_value = self.transport
+        with mock.patch('zenhub.cache.ResponseCache', wraps=ResponseCache) as cache:
+            main(['board', '--token', 'ZENHUB_TOKEN', '--workers', '2', '123'],
+                 stdout=io.StringIO())
+        cache.assert_called_once_with(ttl=300.0, maxsize=8)
+
+    @mock.patch('os.dup2')
+    @mock.patch('zenhub.transport.RequestsTransport.pooled')
+    def test_main_broken_pipe(self, mock_pooled, mock_dup2):
+        """ A reader that goes away points stdout at devnull and fails """
+        mock_pooled.return_value = self.transport
+        stdout = mock.Mock()
+        stdout.write.side_effect = BrokenPipeError
+        with mock.patch('sys.stdout', mock.Mock()) as sys_stdout:
+            sys_stdout.fileno.return_value = 99
+            status = main(['board', '--token', 'ZENHUB_TOKEN', '123'], stdout=stdout)
+        self.assertEqual(status, 1)
+        self.assertEqual(mock_dup2.call_args[0][1], 99)
+
+    def test_main_no_token(self):
+        """ A token is required """
+        with mock.patch.dict('os.environ', {}, clear=True):
+            with mock.patch('sys.stderr', io.StringIO()):
+                self.assertRaises(SystemExit, main, ['board', '123', '--token', ''])
+
+    def test_main_bad_arguments(self):
+        """ Repository ids and the number of workers are checked """
+        for argv in (['board', 'abc'], ['board', '123', '--workers', '0']):
+            with mock.patch('sys.stderr', io.StringIO()) as stderr:
+                self.assertRaises(SystemExit, main, argv + ['--token', 'ZENHUB_TOKEN'])
+            self.assertIn('error', stderr.getvalue())
+
+    @mock.patch('zenhub.transport.RequestsTransport.pooled')
+    def test_main_bad_stdin(self, mock_pooled):
+        """ A word on stdin that is not a repository id is skipped and fails the export """
+        mock_pooled.return_value = self.transport
+        stdout = io.StringIO()
+        with self.assertLogs('zenhub.cli', 'ERROR'):
+            status = main(['board', '--token', 'ZENHUB_TOKEN', '-'],
+                          stdin=io.StringIO('abc\n123\n'), stdout=stdout)
+        self.assertEqual(status, 1)
+        self.assertEqual(json.loads(stdout.getvalue().splitlines()[0])['repo_id'], 123)
@@ -0,0 +1,88 @@
+"""
+Test cases for compressed responses and byte accounting
+"""
+import gzip
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import TestCase
+from zenhub import ZenHub
+from zenhub.transport import RequestsTransport, TransferStats, endpoint
+
+BOARD_DATA = {}
+
+class GzipHandler(BaseHTTPRequestHandler):
+    """ Answers every request with the board, gzip compressed when asked to """
+
+    def do_GET(self):
+        self.server.accept_encodings.append(self.headers.get('Accept-Encoding'))
+        body = json.dumps(BOARD_DATA).encode('utf-8')
+        self.send_response(200)
+        if 'gzip' in self.headers.get('Accept-Encoding', ''):
+            body = gzip.compress(body)
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+######################################################################
+#  T E S T   C A S E S
+######################################################################
+class TestCompression(TestCase):
+    """ Test Cases for compressed, streamed responses """
+
+    @classmethod
+    def setUpClass(cls):
+        global BOARD_DATA
+        with open('tests/fixtures/board_with_issues.json') as json_data:
+            BOARD_DATA = json.load(json_data)
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), GzipHandler)
+        self.server.accept_encodings = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = 'http://127.0.0.1:%d' % self.server.server_address[1]
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_compressed_board(self):
+        """ A compressed board is decoded and its bytes are counted """
+        transport = RequestsTransport.pooled()
+        transport.chunk_size = 256
+        zen = ZenHub('ZENHUB_TOKEN', api_endpoint=self.url, transport=transport)
+        board = zen.repository(123).board()
+        zen.repository(456).board()
+        transport.close()
+        self.assertEqual(board.data, BOARD_DATA)
+        self.assertIn('gzip', self.server.accept_encodings[0])
+        counts = transport.stats.endpoints()['/p1/repositories/:id/board']
+        body_bytes = len(json.dumps(BOARD_DATA).encode('utf-8'))
+        self.assertEqual(counts['requests'], 2)
+        self.assertEqual(counts['body_bytes'], 2 * body_bytes)
+        self.assertLess(counts['wire_bytes'], counts['body_bytes'])
+        self.assertGreater(transport.stats.totals()['savings'], 0.5)
+
+    def test_transfer_stats(self):
+        """ Counts are kept per endpoint """
+        stats = TransferStats()
+        stats.record('https://api.zenhub.io/p1/repositories/1/issues/7', 10, 40)
+        stats.record('https://api.zenhub.io/p1/repositories/2/issues/9', 30, 40)
+        self.assertEqual(stats.endpoints(), {
+            '/p1/repositories/:id/issues/:id': {'requests': 2, 'wire_bytes': 40, 'body_bytes': 80}
+        })
+        self.assertEqual(stats.totals()['savings'], 0.5)
+        self.assertEqual(endpoint('https://api.zenhub.io/p2/workspaces/5d0a/repositories/1/board'),
+                         '/p2/workspaces/:id/repositories/:id/board')
+        self.assertEqual(endpoint('https://api.zenhub.io/p1/repositories/1/workspaces'),
+                         '/p1/repositories/:id/workspaces')
+        self.assertEqual(endpoint('https://api.zenhub.io/p2/workspaces/5d0a7a9741fd098f6b7f58ac'
+                                  '/repositories/1/issues/2/moves'),
+                         '/p2/workspaces/:id/repositories/:id/issues/:id/moves')
+        stats.reset()
+        self.assertEqual(stats.totals()['requests'], 0)
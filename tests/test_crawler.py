@@ -0,0 +1,115 @@
+"""
+Test cases for the sharded Crawler
+"""
+import os
+import json
+import shutil
+import tempfile
+from functools import partial
+from unittest import TestCase
+from zenhub import ZenHub
+from zenhub.crawler import Crawler, crawl_repository
+from zenhub.ratelimit import SharedRateLimiter
+from zenhub.transport import RecordingTransport, ReplayTransport
+from helpers import StubTransport
+
+BOARD_DATA = {}
+ISSUE_DATA = {}
+EPIC_DATA = {}
+EPIC_ISSUES = {}
+
+def zenhub_stub():
+    """ Returns a transport that answers like ZenHub for a few repositories """
+    return StubTransport([
+        (r'/3/board$', (500, {})),
+        (r'/board$', BOARD_DATA),
+        (r'/epics$', EPIC_ISSUES),
+        (r'/epics/\d+$', EPIC_DATA),
+        (r'', ISSUE_DATA),
+    ])
+
+######################################################################
+#  T E S T   C A S E S
+######################################################################
+class TestCrawler(TestCase):
+    """ Test Cases for the Crawler """
+
+    @classmethod
+    def setUpClass(cls):
+        global BOARD_DATA, ISSUE_DATA, EPIC_DATA, EPIC_ISSUES
+        with open('tests/fixtures/board_with_issues.json') as json_data:
+            BOARD_DATA = json.load(json_data)
+        with open('tests/fixtures/issue.json') as json_data:
+            ISSUE_DATA = json.load(json_data)
+        with open('tests/fixtures/epic_data.json') as json_data:
+            EPIC_DATA = json.load(json_data)
+        with open('tests/fixtures/epic_issues.json') as json_data:
+            EPIC_ISSUES = json.load(json_data)
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.cassette = os.path.join(self.tmpdir, 'crawl.cassette')
+        self.checkpoint = os.path.join(self.tmpdir, 'crawl.checkpoint')
+        with RecordingTransport(self.cassette, zenhub_stub()) as recorder:
+            zen = ZenHub('ZENHUB_TOKEN', transport=recorder)
+            for repo_id in (1, 2, 3, 4):
+                try:
+                    crawl_repository(zen, repo_id)
+                except Exception:  # pylint: disable=broad-except
+                    pass
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def crawler(self):
+        """ Returns a crawler that replays the recorded cassette """
+        return Crawler('ZENHUB_TOKEN', processes=2, requests_per_minute=6000,
+                       checkpoint=self.checkpoint,
+                       transport_factory=partial(ReplayTransport, self.cassette))
+
+    def test_crawl_repository(self):
+        """ Crawl the board, issues and epics of one repository """
+        result = crawl_repository(ZenHub('ZENHUB_TOKEN', transport=zenhub_stub()), 1)
+        self.assertEqual(result['board'], BOARD_DATA)
+        self.assertEqual(len(result['issues']), 15)
+        self.assertEqual(result['issues'][0]['issue_number'], 7)
+        self.assertEqual(len(result['epics']), len(EPIC_ISSUES['epic_issues']))
+
+    def test_crawl_repository_in_workspace(self):
+        """ The board comes from the Workspace of the client and issues are shared """
+        transport = zenhub_stub()
+        zen = ZenHub('ZENHUB_TOKEN', transport=transport, default_workspace='ws')
+        result = crawl_repository(zen, 1, epics=False)
+        self.assertEqual(transport.paths()[0], '/p2/workspaces/ws/repositories/1/board')
+        self.assertEqual(result['board'], BOARD_DATA)
+        self.assertIs(zen.repository(1).board().issue(7), zen.repository(1).issue(7))
+
+    def test_crawl_and_resume(self):
+        """ Crawl in processes and resume from the checkpoint """
+        crawler = self.crawler()
+        results = {result['repo_id']: result for result in crawler.crawl([1, 2, 3, 4])}
+        self.assertEqual(sorted(results), [1, 2, 3, 4])
+        self.assertIn('error', results[3])
+        self.assertEqual(len(results[4]['issues']), 15)
+        self.assertEqual(crawler.stats, {'crawled': 3, 'failed': 1, 'skipped': 0})
+        self.assertEqual(crawler.completed(), {1, 2, 4})
+        # every request of every process was counted by the shared limiter
+        self.assertEqual(crawler.rate_limiter.granted,
+                         sum(2 + 15 + len(EPIC_ISSUES['epic_issues']) for _ in range(3)) + 1)
+
+        # a crash leaves a partial line behind
+        with open(self.checkpoint, 'a') as checkpoint:
+            checkpoint.write('{"repo_')
+        crawler = self.crawler()
+        results = list(crawler.crawl([1, 2, 3, 4]))
+        self.assertEqual([result['repo_id'] for result in results], [3])
+        self.assertEqual(crawler.stats, {'crawled': 0, 'failed': 1, 'skipped': 3})
+
+    def test_shared_rate_limiter(self):
+        """ The shared limiter behaves like a RateLimiter """
+        limiter = SharedRateLimiter(120, burst=2)
+        self.assertTrue(limiter.try_acquire())
+        self.assertTrue(limiter.try_acquire())
+        self.assertFalse(limiter.try_acquire())
+        self.assertEqual(limiter.granted, 2)
+        self.assertGreater(limiter.delay(), 0)
@@ -0,0 +1,100 @@
+"""
+Test cases for timeouts and deadlines
+"""
+import json
+import time
+from unittest import TestCase
+from zenhub import ZenHub
+from zenhub import deadline
+from zenhub.deadline import DeadlineExceeded
+from zenhub.ratelimit import RateLimiter
+from helpers import StubTransport
+
+BOARD_DATA = {}
+ISSUE_DATA = {}
+
+def board_stub():
+    """ Returns a transport that answers with the board or the issue """
+    return StubTransport([(r'/board$', BOARD_DATA), (r'', ISSUE_DATA)])
+
+
+def timeouts(transport):
+    """ Returns the timeouts the requests were sent with """
+    return [request.timeout for request in transport.requests]
+
+######################################################################
+#  T E S T   C A S E S
+######################################################################
+class TestDeadline(TestCase):
+    """ Test Cases for timeouts and deadlines """
+
+    @classmethod
+    def setUpClass(cls):
+        global BOARD_DATA, ISSUE_DATA
+        with open('tests/fixtures/board_with_issues.json') as json_data:
+            BOARD_DATA = json.load(json_data)
+        with open('tests/fixtures/issue.json') as json_data:
+            ISSUE_DATA = json.load(json_data)
+
+    def test_request_timeout(self):
+        """ Every request is sent with the timeout of the client """
+        transport = board_stub()
+        zen = ZenHub('ZENHUB_TOKEN', transport=transport)
+        zen.repository(123).board()
+        self.assertEqual(timeouts(transport), [ZenHub.DEFAULT_TIMEOUT])
+        ZenHub('ZENHUB_TOKEN', transport=transport, timeout=(1, 2)).repository(1).board()
+        self.assertEqual(timeouts(transport)[-1], (1, 2))
+
+    def test_timeout_bound_by_deadline(self):
+        """ The timeouts are shortened to the time left """
+        transport = board_stub()
+        zen = ZenHub('ZENHUB_TOKEN', transport=transport)
+        with zen.deadline(2.0):
+            with zen.deadline(10.0):
+                zen.repository(123).board()
+        connect, read = timeouts(transport)[0]
+        self.assertLessEqual(connect, 2.0)
+        self.assertLessEqual(read, 2.0)
+        self.assertGreater(read, 1.0)
+        self.assertIsNone(deadline.remaining())
+
+    def test_deadline_exceeded(self):
+        """ No request is sent after the deadline """
+        transport = board_stub()
+        zen = ZenHub('ZENHUB_TOKEN', transport=transport)
+        with zen.deadline(0.0):
+            self.assertRaises(DeadlineExceeded, zen.repository(123).board)
+        self.assertEqual(timeouts(transport), [])
+
+    def test_rate_limit_wait_bound_by_deadline(self):
+        """ Waiting for the rate limiter stops at the deadline """
+        limiter = RateLimiter(6, burst=1)
+        zen = ZenHub('ZENHUB_TOKEN', transport=board_stub(), rate_limiter=limiter)
+        zen.repository(123).board()
+        started = time.monotonic()
+        with zen.deadline(0.1):
+            self.assertRaises(DeadlineExceeded, zen.repository(123).board)
+        self.assertLess(time.monotonic() - started, 1.0)
+
+    def test_fan_out_partial_results(self):
+        """ The fan out returns what was fetched before the deadline """
+        zen = ZenHub('ZENHUB_TOKEN', transport=board_stub())
+        board = zen.repository(123).board()
+        zen.transport.latency = 0.05
+        started = time.monotonic()
+        with zen.deadline(0.12):
+            issues = board.issue_details(workers=2)
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertGreater(len(issues), 0)
+        self.assertLess(len(issues), 15)
+        # without a deadline every issue is fetched in board order
+        zen.transport.latency = 0.0
+        issues = board.issue_details(workers=4)
+        self.assertEqual([issue.number for issue in issues][:3], [7, 4, 17])
+        self.assertEqual(len(issues), 15)
+
+    def test_map_raises_errors(self):
+        """ Errors other than the deadline are raised by map """
+        zen = ZenHub('ZENHUB_TOKEN', transport=board_stub())
+        self.assertEqual(zen.map(lambda value: value * 2, [1, 2, 3]), [2, 4, 6])
+        self.assertRaises(ZeroDivisionError, zen.map, lambda value: 1 / value, [1, 0])
@@ -0,0 +1,118 @@
+"""
+Test cases for the identity map
+"""
+import gc
+import copy
+import json
+from unittest import TestCase, mock
+from zenhub import ZenHub, Board, Issue
+
+BOARD_DATA = {}
+ISSUE_DATA = {}
+
+######################################################################
+#  T E S T   C A S E S
+######################################################################
+class TestIdentityMap(TestCase):
+    """ Test Cases for shared Repository, Issue and Epic objects """
+
+    @classmethod
+    def setUpClass(cls):
+        global BOARD_DATA, ISSUE_DATA
+        with open('tests/fixtures/board_with_issues.json') as json_data:
+            BOARD_DATA = json.load(json_data)
+        with open('tests/fixtures/issue.json') as json_data:
+            ISSUE_DATA = json.load(json_data)
+
+    def setUp(self):
+        self.zen = ZenHub('ZENHUB_TOKEN')
+        self.repo = self.zen.repository(12345)
+
+    def test_same_repository(self):
+        """ The same ID returns the same Repository """
+        self.assertIs(self.zen.repository(12345), self.repo)
+        self.assertIsNot(ZenHub('ZENHUB_TOKEN').repository(12345), self.repo)
+
+    def test_unused_objects_are_collected(self):
+        """ The identity map does not keep objects alive """
+        self.zen.repository(999)
+        gc.collect()
+        self.assertNotIn(('repository', 999), self.zen.identity)
+
+    @mock.patch('zenhub.ZenHub.get')
+    def test_same_issue_from_board_and_find(self, mock_get):
+        """ An Issue from a Board and from Issue.find is one object """
+        board = Board(BOARD_DATA, self.repo)
+        board_issue = board.pipelines()[0].issues[0]
+        mock_get.return_value = ISSUE_DATA
+        found = self.repo.issue(board_issue.number)
+        self.assertIs(found, board_issue)
+        self.assertEqual(found.pipeline, ISSUE_DATA['pipeline'])
+        self.assertEqual(found.position, BOARD_DATA['pipelines'][0]['issues'][0]['position'])
+        # the board data itself is not modified
+        self.assertNotIn('pipeline', BOARD_DATA['pipelines'][0]['issues'][0])
+
+    @mock.patch('zenhub.ZenHub.get')
+    def test_projected_issue_is_not_shared(self, mock_get):
+        """ A projected Issue leaves the shared Issue alone """
+        mock_get.return_value = ISSUE_DATA
+        shared = self.repo.issue(3)
+        projected = self.repo.issue(3, fields=['estimate'])
+        self.assertIsNot(projected, shared)
+        self.assertNotIn('pipeline', projected.data)
+        self.assertEqual(shared.data, ISSUE_DATA)
+        board = Board(BOARD_DATA, self.repo)
+        board.fields = ['estimate']
+        full = Board(BOARD_DATA, self.repo)
+        self.assertIsNot(board.pipelines()[0].issues[0], full.pipelines()[0].issues[0])
+
+    @mock.patch('zenhub.ZenHub.put')
+    def test_estimate_update_is_shared(self, mock_put):
+        """ Setting an estimate is seen by every holder of the Issue """
+        issue = Board(BOARD_DATA, self.repo).pipelines()[0].issues[0]
+        same = Board(BOARD_DATA, self.repo).issue(issue.number)
+        self.assertIs(same, issue)
+        issue.estimate = 8
+        self.assertEqual(same.estimate, 8)
+        self.assertEqual(same.data['estimate'], {'value': 8})
+
+    @mock.patch('zenhub.ZenHub.get')
+    def test_board_replaces_its_fields(self, mock_get):
+        """ A later board clears the estimate it leaves out and moves the Issue """
+        mock_get.return_value = dict(ISSUE_DATA, estimate={'value': 5})
+        issue = self.repo.issue(7)
+        self.assertEqual(issue.estimate, 5)
+        data = copy.deepcopy(BOARD_DATA)
+        entry = data['pipelines'][0]['issues'].pop(0)
+        entry.pop('estimate', None)
+        data['pipelines'][2]['issues'].insert(0, entry)
+        board = Board(data, self.repo, workspace_id='ws')
+        self.assertIs(board.issue(7), issue)
+        self.assertEqual(issue.estimate, 0)
+        self.assertNotIn('estimate', issue.data)
+        self.assertEqual(issue.pipeline, {'name': data['pipelines'][2]['name'],
+                                          'pipeline_id': data['pipelines'][2]['id'],
+                                          'workspace_id': 'ws'})
+        # the fields only the issue data has are kept
+        self.assertEqual(issue.data['plus_ones'], ISSUE_DATA['plus_ones'])
+
+    @mock.patch('zenhub.ZenHub.post')
+    def test_move_to_updates_issue(self, mock_post):
+        """ Moving an Issue updates its pipeline and position """
+        issue = Issue.from_data(ISSUE_DATA, 3, self.repo)
+        issue.move_to('5d0a7cea41fd098f6b7f58b5', 1)
+        self.assertEqual(issue.pipeline['pipeline_id'], '5d0a7cea41fd098f6b7f58b5')
+        self.assertEqual(issue.position, 1)
+
+    @mock.patch('zenhub.ZenHub.get')
+    def test_same_epic(self, mock_get):
+        """ Epics from epics() and epic() are one object """
+        with open('tests/fixtures/epic_issues.json') as json_data:
+            mock_get.return_value = json.load(json_data)
+        summary = self.repo.epics()[0]
+        with open('tests/fixtures/epic_data.json') as json_data:
+            mock_get.return_value = json.load(json_data)
+        detail = self.repo.epic(summary.id)
+        self.assertIs(detail, summary)
+        self.assertEqual(len(summary.pipelines), 2)
+        self.assertIn('issue_url', summary.data)
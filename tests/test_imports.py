@@ -0,0 +1,33 @@
+"""
+Test cases for the lazy package imports
+"""
+import sys
+import subprocess
+from unittest import TestCase
+import zenhub
+
+######################################################################
+#  T E S T   C A S E S
+######################################################################
+class TestImports(TestCase):
+    """ Test Cases for lazy imports """
+
+    def test_public_classes(self):
+        """ Import the public classes from the package """
+        from zenhub import ZenHub, Repository, Board, Pipeline, Epic, Issue, Workspace
+        self.assertEqual(ZenHub.__module__, 'zenhub.zenhub')
+        self.assertEqual(Workspace.__module__, 'zenhub.workspace')
+        self.assertIn('Issue', dir(zenhub))
+
+    def test_unknown_attribute(self):
+        """ Unknown attributes raise AttributeError """
+        self.assertRaises(AttributeError, getattr, zenhub, 'NotAClass')
+
+    def test_requests_is_deferred(self):
+        """ requests is not imported until the first request """
+        code = ('import sys\n'
+                'from zenhub import ZenHub, Board\n'
+                'ZenHub("ZENHUB_TOKEN").repository(1)\n'
+                'print("requests" in sys.modules)\n')
+        output = subprocess.check_output([sys.executable, '-c', code], universal_newlines=True)
+        self.assertEqual(output.strip(), 'False')
@@ -0,0 +1,106 @@
+"""
+Test cases for the board loader
+"""
+import json
+import time
+from unittest import TestCase
+from zenhub import ZenHub, Issue
+from zenhub.cache import ResponseCache
+from zenhub.loader import BoardLoader
+from helpers import StubTransport
+
+BOARD_DATA = {}
+ISSUE_DATA = {}
+
+def board_stub(latency=0.0, missing=()):
+    """ Returns a transport that serves the board fixture and the issue fixture for every
+    issue, with the issue number as its estimate, except for the ``missing`` issues """
+    def issue(request, number):
+        if int(number) in missing:
+            return None
+        return dict(ISSUE_DATA, estimate={'value': int(number)})
+    return StubTransport([(r'/board$', BOARD_DATA), (r'/issues/(\d+)$', issue)], latency=latency)
+
+
+def issue_requests(transport):
+    """ Returns the number of issues that were requested """
+    return len([path for path in transport.paths() if '/issues/' in path])
+
+######################################################################
+#  T E S T   C A S E S
+######################################################################
+class TestBoardLoader(TestCase):
+    """ Test Cases for BoardLoader """
+
+    @classmethod
+    def setUpClass(cls):
+        global BOARD_DATA, ISSUE_DATA
+        with open('tests/fixtures/board_with_issues.json') as json_data:
+            BOARD_DATA = json.load(json_data)
+        with open('tests/fixtures/issue.json') as json_data:
+            ISSUE_DATA = json.load(json_data)
+        cls.numbers = [issue_data['issue_number'] for pipeline in BOARD_DATA['pipelines']
+                       for issue_data in pipeline['issues']]
+
+    def test_load(self):
+        """ Every issue on the board gets its details """
+        transport = board_stub()
+        zen = ZenHub('ZENHUB_TOKEN', transport=transport)
+        board = zen.repository(123).board(details=True)
+        issues = [issue for pipeline in board.pipelines() for issue in pipeline.issues]
+        self.assertEqual([issue.number for issue in issues], self.numbers)
+        self.assertEqual([issue.estimate for issue in issues], self.numbers)
+        self.assertTrue(all(issue.position is not None for issue in issues))
+        self.assertEqual(issue_requests(transport), len(self.numbers))
+        self.assertEqual(board.query(estimate=self.numbers[0])[0].number, self.numbers[0])
+
+    def test_issues_as_they_arrive(self):
+        """ Issues are handed out while the others are still being fetched """
+        transport = board_stub(latency=0.01, missing=self.numbers[:1])
+        zen = ZenHub('ZENHUB_TOKEN', transport=transport)
+        loader = BoardLoader(zen.repository(123), workers=2, window=3)
+        issues = loader.issues()
+        first = next(issues)
+        self.assertIsInstance(first, Issue)
+        self.assertLess(issue_requests(transport), len(self.numbers))
+        rest = list(issues)
+        self.assertEqual(len(rest) + 1, len(self.numbers) - 1)
+        self.assertEqual(loader.hydrated, len(self.numbers) - 1)
+        self.assertLessEqual(transport.most_in_flight, 2)
+        self.assertLess(loader.first_issue, loader.elapsed)
+        missing = loader.board.issue(self.numbers[0])
+        self.assertNotIn('pipelines', missing.data)
+
+    def test_fields(self):
+        """ The details are projected to the fields """
+        zen = ZenHub('ZENHUB_TOKEN', transport=board_stub())
+        board = BoardLoader(zen.repository(123), fields=['estimate']).load()
+        issue_data = board.data['pipelines'][0]['issues'][0]
+        self.assertIn('estimate', issue_data)
+        self.assertNotIn('pipelines', issue_data)
+
+    def test_deadline(self):
+        """ Loading stops at the deadline with the issues fetched so far """
+        transport = board_stub(latency=0.05)
+        zen = ZenHub('ZENHUB_TOKEN', transport=transport)
+        loader = BoardLoader(zen.repository(123), workers=1)
+        started = time.monotonic()
+        with zen.deadline(0.12):
+            board = loader.load()
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertIsNotNone(board)
+        self.assertLess(loader.hydrated, len(self.numbers))
+
+    def test_cache_untouched(self):
+        """ Hydrating a board leaves the cached board response alone """
+        zen = ZenHub('ZENHUB_TOKEN', transport=board_stub(), cache=ResponseCache())
+        repo = zen.repository(123)
+        plain = repo.board()
+        hydrated = repo.board(details=True)
+        self.assertIn('pipelines', hydrated.data['pipelines'][0]['issues'][0])
+        self.assertNotIn('pipelines', plain.data['pipelines'][0]['issues'][0])
+        self.assertEqual(repo.board().data, BOARD_DATA)
+        # the copy that was hydrated is patched in place
+        data = hydrated.data
+        self.assertTrue(hydrated.set_estimate(7, 3))
+        self.assertIs(hydrated.data, data)
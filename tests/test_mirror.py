@@ -0,0 +1,130 @@
+"""
+Test cases for the SQLite mirror
+"""
+import os
+import json
+import copy
+from unittest import TestCase
+from zenhub import ZenHub
+from zenhub.mirror import Mirror, MirroredIssue
+from helpers import StubTransport
+
+BOARD_DATA = {}
+EPIC_DATA = {}
+EPIC_LIST = {}
+
+######################################################################
+#  T E S T   C A S E S
+######################################################################
+class TestMirror(TestCase):
+    """ Test Cases for Mirror """
+
+    @classmethod
+    def setUpClass(cls):
+        global BOARD_DATA, EPIC_DATA, EPIC_LIST
+        with open('tests/fixtures/board_with_issues.json') as json_data:
+            BOARD_DATA = json.load(json_data)
+        with open('tests/fixtures/epic_data.json') as json_data:
+            EPIC_DATA = json.load(json_data)
+        with open('tests/fixtures/epic_issues.json') as json_data:
+            EPIC_LIST = json.load(json_data)
+
+    def setUp(self):
+        self.boards = {1: copy.deepcopy(BOARD_DATA), 2: copy.deepcopy(BOARD_DATA)}
+        self.missing_epics = set()
+        transport = StubTransport([
+            (r'/repositories/(\d+)/board$', lambda request, repo: self.boards.get(int(repo))),
+            (r'/epics$', EPIC_LIST),
+            (r'/epics/(\d+)$',
+             lambda request, epic: None if int(epic) in self.missing_epics else EPIC_DATA),
+        ])
+        self.zen = ZenHub('ZENHUB_TOKEN', transport=transport)
+        self.mirror = Mirror(':memory:', self.zen)
+        self.num_issues = sum(len(pipeline['issues']) for pipeline in BOARD_DATA['pipelines'])
+
+    def tearDown(self):
+        self.mirror.close()
+
+    def test_sync(self):
+        """ A first sync inserts every row """
+        stats = self.mirror.sync([1, 2, 3])
+        self.assertEqual(stats['repositories'], 2)
+        self.assertEqual(stats['updated'] + stats['deleted'] + stats['unchanged'], 0)
+        self.assertEqual(self.mirror.repositories(), [1, 2])
+        self.assertEqual(len(self.mirror.issues()), 2 * self.num_issues)
+        self.assertEqual(len(self.mirror.pipelines(1)), len(BOARD_DATA['pipelines']))
+        self.assertEqual(self.mirror.execute('SELECT COUNT(*) FROM epics'), [(4,)])
+
+    def test_incremental_sync(self):
+        """ Only changed rows are written again """
+        first = self.mirror.sync([1, 2])
+        self.assertEqual(self.mirror.sync([1, 2]),
+                         dict(first, inserted=0, unchanged=first['inserted'], skipped=2))
+        pipelines = self.boards[1]['pipelines']
+        moved = pipelines[1]['issues'].pop(0)
+        pipelines[0]['issues'].append(dict(moved, position=len(pipelines[0]['issues'])))
+        removed = pipelines[1]['issues'].pop()
+        stats = self.mirror.sync([1])
+        self.assertEqual((stats['inserted'], stats['updated'], stats['deleted']),
+                         (0, 1, 1))
+        issue = next(issue for issue in self.mirror.issues(repo_id=1)
+                     if issue.issue_number == moved['issue_number'])
+        self.assertEqual(issue.pipeline_id, pipelines[0]['id'])
+        self.assertEqual(issue.pipeline, pipelines[0]['name'])
+        self.assertNotIn(removed['issue_number'],
+                         [issue.issue_number for issue in self.mirror.issues(repo_id=1)])
+        self.assertEqual(len(self.mirror.issues(repo_id=2)), self.num_issues)
+
+    def test_unchanged_board_is_skipped(self):
+        """ A repository whose content did not change is not compared row by row """
+        self.mirror.sync([1, 2])
+        self.boards[2]['pipelines'][0]['issues'][0]['estimate'] = {'value': 8}
+        self.mirror.connection.execute('DELETE FROM issues WHERE repo_id = 1')
+        stats = self.mirror.sync([1, 2])
+        self.assertEqual((stats['skipped'], stats['updated']), (1, 1))
+        # the rows of the skipped repository were not read again
+        self.assertEqual(self.mirror.issues(repo_id=1), [])
+
+    def test_summary_only_epic_is_kept(self):
+        """ An Epic whose details could not be fetched keeps its rows """
+        self.mirror.sync([1])
+        children = self.mirror.execute('SELECT COUNT(*) FROM epic_issues WHERE epic_number = 3953')
+        self.missing_epics.add(3953)
+        stats = self.mirror.sync([1])
+        self.assertEqual(stats['deleted'], 0)
+        self.assertEqual(stats['skipped'], 0)
+        self.assertEqual(self.mirror.execute(
+            'SELECT COUNT(*) FROM epic_issues WHERE epic_number = 3953'), children)
+        self.assertEqual([epic.issue_number for epic in self.mirror.epics(1)], [1342, 3953])
+        self.assertIsNone(self.mirror.execute(
+            'SELECT content_hash FROM repositories WHERE repo_id = 1')[0][0])
+
+    def test_issues(self):
+        """ Issues are filtered by repository, pipeline and epic """
+        self.mirror.sync([1])
+        pipeline = BOARD_DATA['pipelines'][1]
+        issues = self.mirror.issues(pipeline=pipeline['name'])
+        self.assertEqual([issue.issue_number for issue in issues],
+                         [issue_data['issue_number'] for issue_data in pipeline['issues']])
+        self.assertIsInstance(issues[0], MirroredIssue)
+        self.assertEqual(issues, self.mirror.issues(repo_id=1, pipeline=pipeline['id']))
+        self.assertRaises(AttributeError, setattr, issues[0], 'estimate', 5)
+
+    def test_epics(self):
+        """ Epics are mirrored with their issues """
+        self.mirror.sync([1], epics=True)
+        epics = self.mirror.epics(1)
+        self.assertEqual([epic.issue_number for epic in epics], [1342, 3953])
+        self.assertEqual(epics[0].total_epic_estimates, 60)
+        self.assertEqual(len(epics[0].issues), len(EPIC_DATA['issues']))
+        self.mirror.sync([2], epics=False)
+        self.assertEqual(self.mirror.epics(2), [])
+
+    def test_persistent(self):
+        """ The mirror is kept in the database file """
+        path = self.id() + '.db'
+        self.addCleanup(os.remove, path)
+        with Mirror(path, self.zen) as mirror:
+            mirror.sync([1])
+        with Mirror(path) as mirror:
+            self.assertEqual(len(mirror.issues()), self.num_issues)
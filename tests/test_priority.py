@@ -0,0 +1,77 @@
+"""
+Test cases for the priority rate limiter
+"""
+import time
+import threading
+from unittest import TestCase
+from zenhub import ZenHub
+from zenhub.ratelimit import (PriorityRateLimiter, priority, current_priority,
+                              INTERACTIVE, NORMAL, BULK)
+
+######################################################################
+#  T E S T   C A S E S
+######################################################################
+class TestPriorityRateLimiter(TestCase):
+    """ Test Cases for PriorityRateLimiter """
+
+    def run_waiters(self, limiter, classes, stagger=0.0):
+        """ Starts one waiting thread per class (in order) and returns the grant order """
+        granted = []
+        lock = threading.Lock()
+
+        def wait(index, name):
+            with priority(name):
+                limiter.acquire()
+            with lock:
+                granted.append(index)
+
+        threads = []
+        for index, name in enumerate(classes):
+            thread = threading.Thread(target=wait, args=(index, name))
+            thread.start()
+            threads.append(thread)
+            # make sure every thread is queued before the next one starts
+            while sum(limiter.queued().values()) < index + 1 and len(granted) == 0:
+                time.sleep(0.001)
+            time.sleep(stagger)
+        for thread in threads:
+            thread.join(5)
+        return granted
+
+    def test_priority_context(self):
+        """ The priority class is kept in the context """
+        self.assertEqual(current_priority(), NORMAL)
+        with ZenHub.priority(BULK):
+            self.assertEqual(current_priority(), BULK)
+            with priority(INTERACTIVE):
+                self.assertEqual(current_priority(), INTERACTIVE)
+            self.assertEqual(current_priority(), BULK)
+        self.assertEqual(current_priority(), NORMAL)
+        self.assertRaises(ValueError, ZenHub.priority, 'urgent')
+
+    def test_interactive_first(self):
+        """ Interactive requests overtake queued bulk requests """
+        limiter = PriorityRateLimiter(1200, burst=1, aging=60)
+        limiter.acquire()
+        granted = self.run_waiters(limiter, [BULK, BULK, BULK, NORMAL, INTERACTIVE])
+        self.assertEqual(granted[:2], [4, 3])
+        self.assertEqual(sorted(granted[2:]), [0, 1, 2])
+        stats = limiter.wait_stats()
+        self.assertEqual(stats[BULK]['requests'], 3)
+        self.assertEqual(stats[INTERACTIVE]['requests'], 1)
+        self.assertLess(stats[INTERACTIVE]['max'], stats[BULK]['max'])
+        self.assertEqual(limiter.queued(), {INTERACTIVE: 0, NORMAL: 0, BULK: 0})
+
+    def test_aging(self):
+        """ A bulk request that waited long enough goes first """
+        limiter = PriorityRateLimiter(600, burst=1, aging=0.01)
+        limiter.acquire()
+        granted = self.run_waiters(limiter, [BULK, INTERACTIVE], stagger=0.05)
+        self.assertEqual(granted, [0, 1])
+
+    def test_timeout(self):
+        """ acquire gives up after the timeout """
+        limiter = PriorityRateLimiter(6, burst=1)
+        self.assertTrue(limiter.acquire(timeout=0.01))
+        self.assertFalse(limiter.acquire(timeout=0.02))
+        self.assertEqual(limiter.queued()[NORMAL], 0)
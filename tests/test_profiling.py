@@ -0,0 +1,86 @@
+"""
+Test cases for profiling
+"""
+import os
+import json
+import tempfile
+from unittest import TestCase
+from zenhub import ZenHub
+from helpers import StubTransport
+
+BOARD_DATA = {}
+ISSUE_DATA = {}
+
+######################################################################
+#  T E S T   C A S E S
+######################################################################
+class TestProfiling(TestCase):
+    """ Test Cases for zen.profile() """
+
+    @classmethod
+    def setUpClass(cls):
+        global BOARD_DATA, ISSUE_DATA
+        with open('tests/fixtures/board_with_issues.json') as json_data:
+            BOARD_DATA = json.load(json_data)
+        with open('tests/fixtures/issue.json') as json_data:
+            ISSUE_DATA = json.load(json_data)
+
+    def setUp(self):
+        self.zen = ZenHub('ZENHUB_TOKEN', transport=StubTransport([
+            (r'/board$', BOARD_DATA), (r'', ISSUE_DATA)]))
+
+    def test_call_tree(self):
+        """ Calls are recorded with their requests """
+        with self.zen.profile() as prof:
+            board = self.zen.repository(123).board()
+            board.issue_details(workers=4)
+        board_call, details = prof.root.children
+        self.assertEqual(board_call.name, 'Repository.board')
+        find = board_call.children[0]
+        self.assertEqual(find.name, 'Board.find')
+        self.assertEqual([child.name for child in find.children],
+                         ['GET /p1/repositories/:id/board', 'parse'])
+        self.assertEqual(details.name, 'Board.issue_details')
+        # calls made on other threads are recorded under the call that made them
+        self.assertEqual(len(details.children), 15)
+        self.assertEqual({child.name for child in details.children}, {'Repository.issue'})
+        summary = prof.summary()
+        self.assertEqual(summary['requests'], 16)
+        self.assertEqual(summary['calls'], 2 + 1 + 15 * 2)
+        self.assertGreater(summary['wall'], 0)
+        self.assertGreater(summary['parse_time'], 0)
+        self.assertRegex(prof.format(), r'\n    Board\.find \d+\.\d{3} ms\n')
+
+    def test_collapsed(self):
+        """ The profile is exported as collapsed stacks """
+        with self.zen.profile() as prof:
+            self.zen.repository(123).issue(1)
+            self.zen.repository(123).issue(2)
+        lines = prof.collapsed().splitlines()
+        stacks = [line.rsplit(' ', 1)[0] for line in lines]
+        self.assertEqual(stacks, [
+            'Repository.issue',
+            'Repository.issue;Issue.find',
+            'Repository.issue;Issue.find;GET /p1/repositories/:id/issues/:id',
+            'Repository.issue;Issue.find;parse',
+        ])
+        for line in lines:
+            self.assertTrue(line.rsplit(' ', 1)[1].isdigit())
+        path = os.path.join(tempfile.mkdtemp(), 'issues.folded')
+        prof.write_collapsed(path)
+        with open(path) as folded:
+            self.assertEqual(folded.read(), prof.collapsed())
+        os.remove(path)
+
+    def test_cprofile(self):
+        """ cProfile runs with the profile """
+        with self.zen.profile(cprofile=True) as prof:
+            self.zen.repository(123).board()
+        self.assertGreater(prof.stats.total_calls, 0)
+
+    def test_not_profiling(self):
+        """ Nothing is recorded outside of a profile """
+        with self.zen.profile() as prof:
+            pass
+        self.zen.repository(123).board()
+        self.assertEqual(prof.root.children, [])
@@ -0,0 +1,82 @@
+"""
+Test cases for Issue queries
+"""
+import copy
+import json
+from unittest import TestCase
+from zenhub import ZenHub, Board, Epic
+from zenhub.query import Query
+
+BOARD_DATA = {}
+EPIC_DATA = {}
+
+######################################################################
+#  T E S T   C A S E S
+######################################################################
+class TestQuery(TestCase):
+    """ Test Cases for Query """
+
+    @classmethod
+    def setUpClass(cls):
+        global BOARD_DATA, EPIC_DATA
+        with open('tests/fixtures/board_with_issues.json') as json_data:
+            BOARD_DATA = json.load(json_data)
+        with open('tests/fixtures/epic_data.json') as json_data:
+            EPIC_DATA = json.load(json_data)
+
+    def setUp(self):
+        self.zen = ZenHub('ZENHUB_TOKEN')
+        self.repo = self.zen.repository(1234567)
+        self.board = Board(copy.deepcopy(BOARD_DATA), self.repo)
+        self.other = Board(copy.deepcopy(BOARD_DATA), self.zen.repository(7654321))
+        self.other.set_estimate(7, 8)
+        self.epic = Epic(EPIC_DATA, 20, self.repo)
+
+    def test_board_query(self):
+        """ Query the issues of one board """
+        issues = self.board.query(pipeline='New Issues', is_epic=False)
+        self.assertEqual([issue.number for issue in issues], [7, 4, 17, 9, 12, 10])
+        issues = self.board.query(pipeline='57e2f42c86e6ae28594241a1')
+        self.assertEqual([issue.number for issue in issues], [1])
+        self.assertIs(issues[0], self.board.issue(1))
+        issues = self.board.query(estimate_gte=2, order_by='-estimate')
+        self.assertEqual([issue.number for issue in issues], [3, 1])
+        issues = self.board.query(pipeline=['Icebox', 'Done'], position_lte=1, limit=2)
+        self.assertEqual([issue.number for issue in issues], [5, 8])
+        self.assertEqual(self.board.query(estimate=None, pipeline='In Progress')[0].number, 2)
+        self.assertEqual(self.board.query(pipeline='Missing'), [])
+
+    def test_query_follows_changes(self):
+        """ The board query sees local changes """
+        self.assertEqual(self.board.query(estimate_gt=5), [])
+        self.board.set_estimate(9, 13)
+        self.assertEqual([issue.number for issue in self.board.query(estimate_gt=5)], [9])
+        self.board.move_issue(9, 'Done', position=0)
+        self.assertEqual([issue.number for issue in self.board.query(pipeline='Done')], [9, 3])
+
+    def test_many_boards(self):
+        """ Query across boards and epics """
+        query = Query([self.board, self.other], epics=[self.epic])
+        self.assertEqual(len(query), 30)
+        self.assertEqual(query.count(), 30)
+        self.assertEqual(query.count(is_epic=True), 2)
+        self.assertEqual(query.numbers(estimate_gte=5, order_by='-estimate'),
+                         [(7654321, 7), (1234567, 3), (7654321, 3)])
+        self.assertEqual(query.numbers(repo_id=7654321, order_by='issue_number', limit=3),
+                         [(7654321, 1), (7654321, 2), (7654321, 3)])
+        self.assertEqual(query.numbers(epic=20), [(1234567, 2)])
+        self.assertEqual(query.numbers(epic=20, pipeline='Backlog'), [])
+        self.assertEqual(query.numbers(order_by='estimate', limit=2),
+                         [(1234567, 1), (7654321, 1)])
+
+    def test_bad_conditions(self):
+        """ Unknown conditions are rejected """
+        query = Query([self.board])
+        self.assertRaises(ValueError, query.count, color='red')
+        self.assertRaises(ValueError, query.count, pipeline_gt='A')
+        self.assertRaises(ValueError, query.numbers, order_by='epic')
+
+    def test_pipeline_by_name(self):
+        """ Board.pipeline returns the pipeline """
+        self.assertEqual(self.board.pipeline('Done').id, '57e2f42c86e6ae285942419e')
+        self.assertIsNone(self.board.pipeline('Missing'))
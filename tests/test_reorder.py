@@ -0,0 +1,101 @@
+"""
+Test cases for reordering Pipelines
+"""
+import json
+import random
+from unittest import TestCase
+from zenhub import ZenHub, Board
+from zenhub.pipeline import Pipeline, minimal_moves
+from helpers import StubTransport
+
+BOARD_DATA = {}
+
+def apply(current, moves):
+    """ Returns the order after the moves """
+    order = list(current)
+    for number, position in moves:
+        order.remove(number)
+        order.insert(position, number)
+    return order
+
+######################################################################
+#  T E S T   C A S E S
+######################################################################
+class TestReorder(TestCase):
+    """ Test Cases for Pipeline.reorder """
+
+    @classmethod
+    def setUpClass(cls):
+        global BOARD_DATA
+        with open('tests/fixtures/board_with_issues.json') as json_data:
+            BOARD_DATA = json.load(json_data)
+
+    def setUp(self):
+        self.transport = StubTransport([(r'/moves$', (200, None))])
+        self.zen = ZenHub('ZENHUB_TOKEN', transport=self.transport)
+        self.repo = self.zen.repository(123)
+
+    def test_minimal_moves(self):
+        """ Only the issues outside of a longest increasing subsequence are moved """
+        self.assertEqual(minimal_moves([1, 2, 3, 4], [1, 2, 3, 4]), [])
+        self.assertEqual(minimal_moves([1, 2, 3, 4], [4, 1, 2, 3]), [(4, 0)])
+        self.assertEqual(minimal_moves([1, 2, 3, 4], [2, 3, 4, 1]), [(1, 3)])
+        self.assertEqual(len(minimal_moves([1, 2, 3, 4], [4, 3, 2, 1])), 3)
+        self.assertEqual(apply([1, 2, 3, 4, 5], minimal_moves([1, 2, 3, 4, 5], [5, 3])),
+                         [5, 3, 1, 2, 4])
+
+    def test_minimal_moves_random(self):
+        """ The moves always produce the desired order with n - LIS moves """
+        rng = random.Random(7)
+        for size in (0, 1, 2, 5, 30, 200):
+            current = list(range(size))
+            for _ in range(20):
+                desired = rng.sample(current, size)
+                moves = minimal_moves(current, desired)
+                self.assertEqual(apply(current, moves), desired)
+                self.assertEqual(len(moves), size - self._lis(desired))
+
+    @staticmethod
+    def _lis(sequence):
+        """ The length of a longest increasing subsequence, quadratically """
+        lengths = []
+        for index, value in enumerate(sequence):
+            lengths.append(1 + max([lengths[j] for j in range(index) if sequence[j] < value],
+                                   default=0))
+        return max(lengths, default=0)
+
+    def test_invalid_order(self):
+        """ Unknown and duplicate issues are rejected """
+        self.assertRaises(ValueError, minimal_moves, [1, 2], [3])
+        self.assertRaises(ValueError, minimal_moves, [1, 2], [2, 2])
+
+    def test_reorder_board_pipeline(self):
+        """ Reordering a Pipeline of a Board sends the moves and updates the Board """
+        board = Board(json.loads(json.dumps(BOARD_DATA)), self.repo, 'w1')
+        pipeline = max(board.pipelines(), key=lambda pipeline: len(pipeline.data['issues']))
+        current = [issue.number for issue in pipeline.issues]
+        desired = current[1:] + current[:1]
+        report = pipeline.reorder(desired)
+        self.assertEqual(report, {'moved': [current[0]], 'requests': 1,
+                                  'saved': len(current) - 1})
+        moves = [(request.path, json.loads(request.data)) for request in self.transport.requests]
+        self.assertEqual(moves, [(
+            f'/p2/workspaces/w1/repositories/123/issues/{current[0]}/moves',
+            {'pipeline_id': pipeline.id, 'position': len(current) - 1}
+        )])
+        self.assertEqual([issue.number for issue in pipeline.issues], desired)
+        self.assertEqual(board.query(pipeline=pipeline.name, order_by='position')[-1].number,
+                         current[0])
+
+    def test_reorder_pipeline(self):
+        """ A Pipeline without a Board updates its own data """
+        data = {'id': 'p1', 'name': 'Backlog',
+                'issues': [{'issue_number': number, 'is_epic': False, 'position': index}
+                           for index, number in enumerate([1, 2, 3, 4])]}
+        pipeline = Pipeline(data, self.repo)
+        report = pipeline.reorder([4, 3, 2, 1])
+        self.assertEqual(report['requests'], 3)
+        self.assertEqual(report['saved'], 1)
+        self.assertEqual([issue_data['issue_number'] for issue_data in data['issues']],
+                         [4, 3, 2, 1])
+        self.assertEqual([issue_data['position'] for issue_data in data['issues']], [0, 1, 2, 3])
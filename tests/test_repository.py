@@ -84,6 +84,31 @@ class TestRepository(TestCase):
         self.assertIsInstance(epics[0], Epic)
         self.assertEqual(epics[0].id, 3953)
 
+    @mock.patch('zenhub.ZenHub.get')
+    def test_get_epics_with_details(self, mock_get):
+        """ Test Get Epics with their details """
+        with open('tests/fixtures/epic_issues.json') as json_data:
+            EPIC_ISSUES = json.load(json_data)
+        with open('tests/fixtures/epic_data.json') as json_data:
+            EPIC_DATA = json.load(json_data)
+
+        def get(path):
+            if path.endswith('/epics'):
+                return EPIC_ISSUES
+            return dict(EPIC_DATA, total_epic_estimates={'value': int(path.split('/')[-1])})
+        mock_get.side_effect = get
+        epics = self.repo.epics(details=True, fields=['estimate'])
+        self.assertEqual(mock_get.call_count, 3)
+        self.assertEqual([epic.id for epic in epics], [3953, 1342])
+        self.assertEqual([epic.total_epic_estimates for epic in epics], [3953, 1342])
+        self.assertEqual(len(epics[0].issues), 2)
+        self.assertNotIn('pipelines', epics[0].issues[0])
+        self.assertEqual(epics[1].data['issue_url'],
+                         'https://github.com/RepoOwner/RepoName/issues/1342')
+        # projected Epics are not the shared ones
+        self.assertIsNot(self.repo.epics()[0], epics[0])
+        self.assertIn('pipelines', self.repo.epic(3953).issues[0])
+
     @mock.patch('zenhub.ZenHub.get')
     def test_get_an_epics(self, mock_get):
         """ Test Get an Epic """
@@ -95,3 +120,34 @@ class TestRepository(TestCase):
         self.assertIsInstance(epic, Epic)
         self.assertEqual(epic.id, 1)
         self.assertEqual(len(epic.pipelines), 2)
+
+    @mock.patch('zenhub.ZenHub.get')
+    def test_get_board_with_fields(self, mock_get):
+        """ Test Get Board with projected fields """
+        with open('tests/fixtures/board_with_issues.json') as json_data:
+            mock_get.return_value = json.load(json_data)
+        board = self.repo.board(fields=['position'])
+        for pipeline in board.data['pipelines']:
+            self.assertEqual(set(pipeline), {'id', 'name', 'issues'})
+            for issue_data in pipeline['issues']:
+                self.assertEqual(set(issue_data), {'issue_number', 'is_epic', 'position'})
+
+    @mock.patch('zenhub.ZenHub.get')
+    def test_get_issue_with_fields(self, mock_get):
+        """ Test Get an Issue with projected fields """
+        with open('tests/fixtures/issue.json') as json_data:
+            mock_get.return_value = json.load(json_data)
+        issue = self.repo.issue(3, fields=['estimate'])
+        self.assertEqual(set(issue.data), {'is_epic', 'estimate'})
+        self.assertEqual(issue.estimate, mock_get.return_value['estimate']['value'])
+        self.assertIsNone(issue.pipeline)
+
+    @mock.patch('zenhub.ZenHub.get')
+    def test_get_an_epic_with_fields(self, mock_get):
+        """ Test Get an Epic with projected fields """
+        with open('tests/fixtures/epic_data.json') as json_data:
+            mock_get.return_value = json.load(json_data)
+        epic = self.repo.epic(1, fields=['repo_id'])
+        self.assertEqual(len(epic.pipelines), 2)
+        for issue_data in epic.issues:
+            self.assertEqual(set(issue_data), {'issue_number', 'is_epic', 'repo_id'})
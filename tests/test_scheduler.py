@@ -0,0 +1,111 @@
+"""
+Test cases for the rate limiter and the polling scheduler
+"""
+import copy
+import json
+from unittest import TestCase
+from zenhub import ZenHub
+from zenhub.ratelimit import RateLimiter
+from zenhub.scheduler import PollingScheduler, board_signature, diff_boards
+from helpers import StubTransport, FakeClock
+
+BOARD_DATA = {}
+
+######################################################################
+#  T E S T   C A S E S
+######################################################################
+class TestRateLimiter(TestCase):
+    """ Test Cases for the token bucket """
+
+    def test_budget(self):
+        """ Requests are spread over time """
+        clock = FakeClock(1000.0)
+        limiter = RateLimiter(60, burst=2, clock=clock, sleep=clock.sleep)
+        self.assertTrue(limiter.try_acquire())
+        self.assertTrue(limiter.try_acquire())
+        self.assertFalse(limiter.try_acquire())
+        self.assertAlmostEqual(limiter.delay(), 1.0)
+        self.assertTrue(limiter.acquire())
+        self.assertAlmostEqual(sum(clock.slept), 1.0)
+        self.assertFalse(limiter.acquire(timeout=0.5))
+        self.assertEqual(limiter.granted, 3)
+
+
+class TestPollingScheduler(TestCase):
+    """ Test Cases for adaptive polling """
+
+    @classmethod
+    def setUpClass(cls):
+        global BOARD_DATA
+        with open('tests/fixtures/board_with_issues.json') as json_data:
+            BOARD_DATA = json.load(json_data)
+
+    def setUp(self):
+        self.clock = FakeClock(1000.0)
+        self.boards = {1: copy.deepcopy(BOARD_DATA), 2: copy.deepcopy(BOARD_DATA)}
+        self.transport = StubTransport([
+            (r'/repositories/(\d+)/board$', lambda request, repo: self.boards[int(repo)])])
+        self.changes = []
+        self.scheduler = PollingScheduler(
+            ZenHub('ZENHUB_TOKEN', transport=self.transport), [1, 2],
+            requests_per_minute=60, min_interval=10, max_interval=80, backoff=2,
+            on_change=lambda repo_id, board, diff: self.changes.append((repo_id, diff)),
+            clock=self.clock, sleep=self.clock.sleep)
+
+    def test_diff(self):
+        """ Find moved and estimated issues """
+        old = board_signature(BOARD_DATA)
+        data = copy.deepcopy(BOARD_DATA)
+        moved = data['pipelines'][0]['issues'].pop(0)
+        data['pipelines'][1]['issues'].append(moved)
+        data['pipelines'][1]['issues'][0]['estimate'] = {'value': 99}
+        diff = diff_boards(old, board_signature(data))
+        self.assertEqual(diff['moved'], [moved['issue_number']])
+        self.assertEqual(diff['estimated'], [data['pipelines'][1]['issues'][0]['issue_number']])
+        self.assertEqual(diff_boards(old, old), {})
+
+    def test_budget_is_respected(self):
+        """ Only one poll per second with a budget of 60 per minute """
+        self.assertEqual(self.scheduler.run_once(), 1)
+        self.assertIsNone(self.scheduler.run_once())
+        self.clock.now += 1
+        self.assertEqual(self.scheduler.run_once(), 2)
+        self.assertEqual(len(self.transport.requests), 2)
+        metrics = self.scheduler.metrics()
+        self.assertEqual(metrics['budget']['used_last_minute'], 2)
+        self.assertEqual(metrics['repositories'][1]['polls'], 1)
+
+    def test_adaptive_intervals(self):
+        """ Quiet boards back off and changed boards are polled sooner """
+        for _ in range(2):
+            self.scheduler.poll(self.scheduler.states[1])
+            self.scheduler.poll(self.scheduler.states[2])
+        self.assertEqual(self.scheduler.states[1].interval, 40)
+        self.boards[2]['pipelines'][0]['issues'][0]['estimate'] = {'value': 13}
+        self.scheduler.poll(self.scheduler.states[2])
+        self.assertEqual(self.scheduler.states[2].interval, 10)
+        self.assertEqual(self.changes[0][0], 2)
+        self.assertIn('estimated', self.changes[0][1])
+        for _ in range(5):
+            self.scheduler.poll(self.scheduler.states[1])
+        self.assertEqual(self.scheduler.states[1].interval, 80)
+        metrics = self.scheduler.metrics()['repositories']
+        self.assertEqual(metrics[2]['changes'], 1)
+        self.assertEqual(metrics[2]['since_change'], 0)
+
+    def test_recent_polls_are_pruned(self):
+        """ Only the polls of the last minute are kept """
+        for _ in range(10):
+            self.scheduler.poll(self.scheduler.states[1])
+            self.clock.now += 30
+        self.assertLessEqual(len(self.scheduler._recent), 2)
+
+    def test_workspace_resolution(self):
+        """ Boards are found through the Workspace the client resolves """
+        zen = ZenHub('ZENHUB_TOKEN', transport=self.transport, default_workspace='ws')
+        scheduler = PollingScheduler(zen, [1], clock=self.clock, sleep=self.clock.sleep)
+        scheduler.poll(scheduler.states[1])
+        scheduler.poll(scheduler.states[1])
+        self.assertEqual(self.transport.paths()[-2:],
+                         ['/p2/workspaces/ws/repositories/1/board'] * 2)
+        self.assertEqual(scheduler.states[1].board.workspace_id, 'ws')
@@ -0,0 +1,154 @@
+"""
+Test cases for binary snapshots
+"""
+import os
+import json
+import mmap
+import shutil
+import tempfile
+from unittest import TestCase, mock
+from zenhub import ZenHub, Board, Epic, Workspace, Issue
+from zenhub.snapshot import SnapshotError
+
+BOARD_DATA = {}
+EPIC_DATA = {}
+
+######################################################################
+#  T E S T   C A S E S
+######################################################################
+class TestSnapshot(TestCase):
+    """ Test Cases for saving and loading snapshots """
+
+    @classmethod
+    def setUpClass(cls):
+        global BOARD_DATA, EPIC_DATA
+        with open('tests/fixtures/board_with_issues.json') as json_data:
+            BOARD_DATA = json.load(json_data)
+        with open('tests/fixtures/epic_data.json') as json_data:
+            EPIC_DATA = json.load(json_data)
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'test.snapshot')
+        self.repo = ZenHub('ZENHUB_TOKEN').repository(12345)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_board_round_trip(self):
+        """ Save and load a Board """
+        Board(BOARD_DATA, self.repo).save(self.path)
+        board = Board.load(self.path, self.repo)
+        self.assertEqual(board.repo, self.repo)
+        self.assertEqual(board.data, BOARD_DATA)
+        self.assertEqual(len(board.pipelines()), len(BOARD_DATA['pipelines']))
+
+    def test_board_issue_lookup(self):
+        """ Find an issue in a snapshot without loading the board """
+        Board(BOARD_DATA, self.repo).save(self.path)
+        board = Board.load(self.path, self.repo)
+        expected = BOARD_DATA['pipelines'][0]['issues'][1]
+        issue = board.issue(expected['issue_number'])
+        self.assertIsInstance(issue, Issue)
+        self.assertEqual(issue.data, expected)
+        self.assertIsNone(board.issue(99999))
+        self.assertIsNone(board._data)
+
+    def test_board_issue_lookup_in_memory(self):
+        """ Find an issue on a board that was not loaded from a snapshot """
+        board = Board(BOARD_DATA, self.repo)
+        pipeline = BOARD_DATA['pipelines'][0]
+        expected = dict(pipeline['issues'][0],
+                        pipeline={'name': pipeline['name'], 'pipeline_id': pipeline['id']})
+        self.assertEqual(board.issue(expected['issue_number']).data, expected)
+        self.assertIsNone(board.issue(99999))
+
+    def test_loaded_issues_are_not_shared(self):
+        """ Issues from a snapshot leave the live Issues alone """
+        Board(BOARD_DATA, self.repo).save(self.path)
+        live = Issue.from_data({'is_epic': False, 'position': 3, 'estimate': {'value': 8}},
+                               7, self.repo)
+        with Board.load(self.path, self.repo) as board:
+            self.assertIsNot(board.issue(7), live)
+            self.assertNotIn(live, board.pipelines()[0].issues)
+            self.assertNotIn(live, board.query())
+        self.assertEqual((live.estimate, live.position), (8, 3))
+        Epic(EPIC_DATA, 3953, self.repo).save(self.path)
+        entry = EPIC_DATA['issues'][1]
+        repo = self.repo.zenhub.repository(entry['repo_id'])
+        live = Issue.from_data({'is_epic': False, 'estimate': {'value': 1}},
+                               entry['issue_number'], repo)
+        with Epic.load(self.path, self.repo) as epic:
+            self.assertIsNot(epic.issue(entry['issue_number']), live)
+        self.assertEqual(live.estimate, 1)
+
+    def test_epic_round_trip(self):
+        """ Save and load an Epic """
+        Epic(EPIC_DATA, 3953, self.repo).save(self.path)
+        epic = Epic.load(self.path, self.repo)
+        self.assertEqual(epic.id, 3953)
+        issue = epic.issue(EPIC_DATA['issues'][0]['issue_number'])
+        self.assertEqual(issue.data, EPIC_DATA['issues'][0])
+        self.assertEqual(issue.repo.id, EPIC_DATA['issues'][0]['repo_id'])
+        self.assertEqual(epic.data, EPIC_DATA)
+        self.assertEqual(epic.total_epic_estimates, EPIC_DATA['total_epic_estimates']['value'])
+
+    def test_workspace_round_trip(self):
+        """ Save and load a Workspace """
+        data = {"name": None, "description": None, "id": "57e2f42c86e6ae285942419d",
+                "repositories": [68837948]}
+        Workspace(data, self.repo).save(self.path)
+        workspace = Workspace.load(self.path, self.repo)
+        self.assertEqual(workspace.data, data)
+
+    def test_unusual_values(self):
+        """ Values that do not fit the fixed-width records survive a round trip """
+        data = {'pipelines': [{'id': 'a', 'name': 'Ünïcode', 'issues': [
+            {'issue_number': 1, 'is_epic': False, 'position': 0, 'estimate': {'value': 0.5}},
+            {'issue_number': 2, 'is_epic': True, 'position': None, 'estimate': None},
+            {'issue_number': 3, 'is_epic': False, 'estimate': {'value': 2}, 'labels': ['x']},
+        ]}], 'extra': True}
+        Board(data, self.repo).save(self.path)
+        self.assertEqual(Board.load(self.path, self.repo).data, data)
+
+    def test_close(self):
+        """ Boards and Epics from snapshots unmap their file when closed """
+        Board(BOARD_DATA, self.repo).save(self.path)
+        with Board.load(self.path, self.repo) as board:
+            snapshot = board._snapshot
+            self.assertEqual(len(board.pipelines()), len(BOARD_DATA['pipelines']))
+        self.assertTrue(snapshot._mmap.closed)
+        self.assertEqual(board.data, BOARD_DATA)
+        Epic(EPIC_DATA, 3953, self.repo).save(self.path)
+        with Epic.load(self.path, self.repo) as epic:
+            snapshot = epic._snapshot
+        self.assertTrue(snapshot._mmap.closed)
+        self.assertIsNone(epic._snapshot)
+        # closing a board that was not loaded from a snapshot does nothing
+        Board(BOARD_DATA, self.repo).close()
+
+    def test_bad_header_is_unmapped(self):
+        """ A file with a bad header is unmapped before the error is raised """
+        with open(self.path, 'wb') as bad_file:
+            bad_file.write(b'\0' * 4096)
+        mapped = []
+        real_mmap = mmap.mmap
+
+        def mmap_file(*args, **kwargs):
+            mapped.append(real_mmap(*args, **kwargs))
+            return mapped[-1]
+        with mock.patch('mmap.mmap', side_effect=mmap_file):
+            self.assertRaises(SnapshotError, Board.load, self.path, self.repo)
+        self.assertEqual(len(mapped), 1)
+        self.assertTrue(mapped[0].closed)
+
+    def test_wrong_kind(self):
+        """ Load a snapshot of the wrong type """
+        Board(BOARD_DATA, self.repo).save(self.path)
+        self.assertRaises(SnapshotError, Epic.load, self.path, self.repo)
+
+    def test_not_a_snapshot(self):
+        """ Load a file that is not a snapshot """
+        with open(self.path, 'w') as bad_file:
+            json.dump(BOARD_DATA, bad_file)
+        self.assertRaises(SnapshotError, Board.load, self.path, self.repo)
@@ -0,0 +1,63 @@
+"""
+Test cases for sharing one client between threads
+"""
+import json
+import threading
+from unittest import TestCase, mock
+from concurrent.futures import ThreadPoolExecutor
+from zenhub import ZenHub
+from zenhub.cache import ResponseCache
+from zenhub.transport import RequestsTransport, CassetteResponse
+
+ISSUE_DATA = {}
+
+######################################################################
+#  T E S T   C A S E S
+######################################################################
+class TestThreads(TestCase):
+    """ Test Cases for thread safety """
+
+    @classmethod
+    def setUpClass(cls):
+        global ISSUE_DATA
+        with open('tests/fixtures/issue.json') as json_data:
+            ISSUE_DATA = json.load(json_data)
+
+    def test_session_per_thread(self):
+        """ Every thread gets its own session """
+        sessions = []
+
+        def session_factory():
+            session = mock.MagicMock()
+            session.get.return_value = CassetteResponse(
+                200, {}, json.dumps(ISSUE_DATA).encode('utf-8'))
+            sessions.append((threading.get_ident(), session))
+            return session
+
+        transport = RequestsTransport(session_factory=session_factory)
+        zen = ZenHub('ZENHUB_TOKEN', transport=transport)
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            issues = list(executor.map(lambda number: zen.repository(1).issue(number % 4),
+                                       range(200)))
+        owners = [owner for owner, _ in sessions]
+        self.assertEqual(len(owners), len(set(owners)))
+        self.assertLessEqual(len(sessions), 8)
+        self.assertEqual(sum(session.get.call_count for _, session in sessions), 200)
+        # one shared object per issue no matter which thread loaded it
+        self.assertEqual(len({id(issue) for issue in issues}), 4)
+        transport.close()
+        for _, session in sessions:
+            session.close.assert_called_once_with()
+
+    def test_shared_cache(self):
+        """ A shared cache keeps consistent counts """
+        cache = ResponseCache(maxsize=50)
+
+        def work(index):
+            cache.set(f'/path/{index % 100}', {'index': index})
+            cache.get(f'/path/{(index * 7) % 100}')
+
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            list(executor.map(work, range(5000)))
+        self.assertEqual(cache.hits + cache.misses, 5000)
+        self.assertEqual(len(cache), 50)
@@ -0,0 +1,149 @@
+"""
+Test cases for the token pool
+"""
+import json
+from collections import Counter
+from unittest import TestCase
+from requests.exceptions import HTTPError
+from zenhub import ZenHub
+from zenhub.deadline import DeadlineExceeded
+from zenhub.tokens import TokenPool, NoTokenAvailable, ROUND_ROBIN
+from helpers import StubTransport, FakeClock
+
+ISSUE_DATA = {}
+
+class RateLimits:
+    """ Answers every request with the issue fixture under a per minute limit for each token """
+
+    def __init__(self, clock, limits, revoked=()):
+        self.clock = clock
+        self.limits = limits
+        self.revoked = set(revoked)
+        self.windows = {}
+
+    def __call__(self, request):
+        token = request.headers['X-Authentication-Token']
+        if token in self.revoked:
+            return 401, None
+        started, used = self.windows.get(token, (self.clock.now, 0))
+        if self.clock.now >= started + 60:
+            started, used = self.clock.now, 0
+        used += 1
+        self.windows[token] = (started, used)
+        limit = self.limits[token]
+        headers = {'X-RateLimit-Limit': str(limit),
+                   'X-RateLimit-Used': str(min(used, limit)),
+                   'X-RateLimit-Reset': str(self.clock.wall() - self.clock.now + started + 60)}
+        if used > limit:
+            return 429, None, headers
+        return 200, ISSUE_DATA, headers
+
+
+def sent(stub):
+    """ Returns the tokens of the requests ``stub`` received, in order """
+    return [request.headers['X-Authentication-Token'] for request in stub.requests]
+
+######################################################################
+#  T E S T   C A S E S
+######################################################################
+class TestTokenPool(TestCase):
+    """ Test Cases for TokenPool """
+
+    @classmethod
+    def setUpClass(cls):
+        global ISSUE_DATA
+        with open('tests/fixtures/issue.json') as json_data:
+            ISSUE_DATA = json.load(json_data)
+
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def client(self, limits, revoked=(), **kwargs):
+        """ Returns a client with a pool of the tokens in ``limits`` """
+        self.limits = RateLimits(self.clock, limits, revoked)
+        self.stub = StubTransport([('', self.limits)])
+        self.pool = TokenPool(self.stub, list(limits), clock=self.clock, sleep=self.clock.sleep,
+                              wall=self.clock.wall, **kwargs)
+        return ZenHub('unused', transport=self.pool, codec='json')
+
+    def fetch(self, zen, count):
+        """ Fetches ``count`` issues """
+        return [zen.get(f'/p1/repositories/1/issues/{number}') for number in range(count)]
+
+    def test_spread_over_tokens(self):
+        """ The pool sends as many requests as all of its tokens allow """
+        zen = self.client({'token-a': 10, 'token-b': 10, 'token-c': 10}, requests_per_minute=10)
+        self.assertTrue(all(self.fetch(zen, 30)))
+        self.assertEqual(self.clock.now, 0.0)
+        self.assertEqual(Counter(sent(self.stub)), {'token-a': 10, 'token-b': 10, 'token-c': 10})
+        self.assertTrue(all(stats['remaining'] == 0 for stats in self.pool.stats().values()))
+        self.assertTrue(self.fetch(zen, 1)[0])
+        self.assertEqual(self.pool.waited, 60.0)
+        self.assertEqual([stats['throttled'] for stats in self.pool.stats().values()], [0, 0, 0])
+
+    def test_least_loaded(self):
+        """ The token with the most budget left is used first """
+        zen = self.client({'token-a': 5, 'token-b': 20})
+        self.fetch(zen, 12)
+        # the budgets are learned from the first responses
+        self.assertEqual(Counter(sent(self.stub)), {'token-a': 1, 'token-b': 11})
+
+    def test_round_robin(self):
+        """ The tokens are used in turn """
+        zen = self.client({'token-a': 5, 'token-b': 5, 'token-c': 5}, strategy=ROUND_ROBIN)
+        self.fetch(zen, 6)
+        self.assertEqual(sent(self.stub), ['token-a', 'token-b', 'token-c'] * 2)
+
+    def test_unknown_strategy(self):
+        """ Unknown strategies and empty pools are rejected """
+        self.assertRaises(ValueError, TokenPool, None, ['token-a'], strategy='random')
+        self.assertRaises(ValueError, TokenPool, None, [])
+
+    def test_revoked_token(self):
+        """ A token that is refused is cooled down and the request is sent again """
+        zen = self.client({'token-a': 5, 'token-b': 5}, revoked=['token-a'],
+                          strategy=ROUND_ROBIN, cooldown=120)
+        self.assertTrue(all(self.fetch(zen, 4)))
+        self.assertEqual(sent(self.stub), ['token-a', 'token-b', 'token-b', 'token-b', 'token-b'])
+        stats = self.pool.stats()
+        self.assertEqual(stats['0:...en-a']['auth_failures'], 1)
+        self.assertTrue(stats['0:...en-a']['cooling'])
+        self.assertEqual(stats['1:...en-b']['requests'], 4)
+        self.clock.sleep(120)
+        self.assertFalse(self.pool.stats()['0:...en-a']['cooling'])
+
+    def test_stats_names(self):
+        """ Tokens that end alike have their own stats """
+        self.client({'first-abcd': 5, 'second-abcd': 5})
+        self.assertEqual(sorted(self.pool.stats()), ['0:...abcd', '1:...abcd'])
+
+    def test_every_token_revoked(self):
+        """ The refusal is returned when every token was refused """
+        zen = self.client({'token-a': 5, 'token-b': 5}, revoked=['token-a', 'token-b'])
+        self.assertRaises(HTTPError, zen.get, '/p1/repositories/1/issues/1')
+        self.assertRaises(NoTokenAvailable, zen.get, '/p1/repositories/1/issues/2')
+
+    def test_throttled_token(self):
+        """ A 429 uses up the budget of a token and the request goes to another one """
+        zen = self.client({'token-a': 3, 'token-b': 3}, strategy=ROUND_ROBIN)
+        # another client used up token-a
+        self.limits.windows['token-a'] = (0.0, 3)
+        self.assertTrue(all(self.fetch(zen, 3)))
+        self.assertEqual(sent(self.stub), ['token-a', 'token-b', 'token-b', 'token-b'])
+        self.assertEqual(self.pool.stats()['0:...en-a']['throttled'], 1)
+        self.assertEqual(self.pool.stats()['0:...en-a']['remaining'], 0)
+
+    def test_deadline(self):
+        """ Waiting for a token gives up at the deadline """
+        zen = self.client({'token-a': 1})
+        self.fetch(zen, 1)
+        with zen.deadline(5.0):
+            self.assertRaises(DeadlineExceeded, self.fetch, zen, 1)
+
+    def test_with_tokens(self):
+        """ A client can be made with several tokens """
+        stub = StubTransport([('', RateLimits(self.clock, {'token-a': 5, 'token-b': 5}))])
+        zen = ZenHub.with_tokens(['token-a', 'token-b'], transport=stub, strategy=ROUND_ROBIN)
+        self.assertIsInstance(zen.transport, TokenPool)
+        self.fetch(zen, 2)
+        self.assertEqual(sent(stub), ['token-a', 'token-b'])
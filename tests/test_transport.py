@@ -0,0 +1,100 @@
+"""
+Test cases for the Transport classes
+"""
+import os
+import gzip
+import json
+import shutil
+import tempfile
+from unittest import TestCase, mock
+from requests.exceptions import HTTPError
+from zenhub import ZenHub, Board
+from zenhub.transport import RecordingTransport, ReplayTransport, CassetteResponse
+from helpers import StubTransport
+
+BOARD_DATA = {}
+
+######################################################################
+#  T E S T   C A S E S
+######################################################################
+class TestTransport(TestCase):
+    """ Test Cases for record and replay """
+
+    @classmethod
+    def setUpClass(cls):
+        global BOARD_DATA
+        with open('tests/fixtures/board_with_issues.json') as json_data:
+            BOARD_DATA = json.load(json_data)
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.cassette = os.path.join(self.tmpdir, 'test.cassette')
+        self.stub = StubTransport([
+            (r'^/p1/repositories/123/board$', BOARD_DATA),
+            (r'^/p1/repositories/123/issues/9$', (404, {})),
+            (r'^/p1/repositories/123/issues/5/moves$', (401, {})),
+        ])
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def record(self):
+        """ Records a board, a missing issue and a failed move """
+        with RecordingTransport(self.cassette, self.stub) as recorder:
+            zen = ZenHub('ZENHUB_TOKEN', transport=recorder)
+            repo = zen.repository(123)
+            board = repo.board()
+            self.assertIsNone(repo.issue(9))
+            self.assertRaises(HTTPError, zen.post, '/p1/repositories/123/issues/5/moves',
+                              {"pipeline_id": "abc", "position": 0})
+        return board
+
+    def test_record(self):
+        """ Record a cassette """
+        board = self.record()
+        self.assertIsInstance(board, Board)
+        self.assertEqual(len(self.stub.requests), 3)
+        self.assertTrue(os.path.getsize(self.cassette) > 0)
+
+    def test_replay(self):
+        """ Replay a cassette without a network """
+        self.record()
+        replay = ReplayTransport(self.cassette)
+        self.assertEqual(len(replay), 3)
+        zen = ZenHub('ZENHUB_TOKEN', transport=replay)
+        repo = zen.repository(123)
+        board = repo.board()
+        self.assertEqual(board.data, BOARD_DATA)
+        self.assertIsNone(repo.issue(9))
+        self.assertRaises(HTTPError, zen.post, '/p1/repositories/123/issues/5/moves',
+                          {"position": 0, "pipeline_id": "abc"})
+
+    def test_recorded_headers(self):
+        """ Headers are replayed without regard to case and describe the recorded content """
+        content = json.dumps({'moved': True}).encode('utf-8')
+        self.stub.route(r'/moves$', CassetteResponse(
+            200, {'content-length': '31', 'content-encoding': 'gzip'}, content))
+        with RecordingTransport(self.cassette, self.stub) as recorder:
+            ZenHub('ZENHUB_TOKEN', transport=recorder).post('/p1/repositories/1/issues/2/moves',
+                                                             {'position': 0})
+        with gzip.open(self.cassette, 'rt', encoding='utf-8') as cassette:
+            headers = json.loads(cassette.readline())['headers']
+        self.assertEqual({name.lower(): value for name, value in headers.items()},
+                         {'content-length': str(len(content))})
+        zen = ZenHub('ZENHUB_TOKEN', transport=ReplayTransport(self.cassette))
+        self.assertEqual(zen.post('/p1/repositories/1/issues/2/moves', {'position': 0}),
+                         {'moved': True})
+
+    def test_replay_not_recorded(self):
+        """ Replay a request that was not recorded """
+        self.record()
+        zen = ZenHub('ZENHUB_TOKEN', transport=ReplayTransport(self.cassette))
+        self.assertRaises(KeyError, zen.get, '/p1/repositories/456/board')
+
+    @mock.patch('zenhub.transport.time.sleep')
+    def test_replay_latency(self, mock_sleep):
+        """ Replay with a simulated latency """
+        self.record()
+        zen = ZenHub('ZENHUB_TOKEN', transport=ReplayTransport(self.cassette, latency=0.25))
+        zen.repository(123).board()
+        mock_sleep.assert_called_once_with(0.25)
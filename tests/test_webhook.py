@@ -0,0 +1,187 @@
+"""
+Test cases for the webhook receiver
+"""
+import io
+import json
+import copy
+import threading
+from urllib.parse import urlencode
+from urllib.request import Request, urlopen
+from urllib.error import HTTPError
+from unittest import TestCase, mock
+from zenhub import ZenHub, Board
+from zenhub.cache import ResponseCache
+from zenhub.webhook import WebhookReceiver, WebhookError
+
+BOARD_DATA = {}
+
+def transfer(issue_number, from_pipeline, to_pipeline):
+    """ Returns an issue_transfer payload """
+    return {
+        "type": "issue_transfer",
+        "github_url": f"https://github.com/ZenHubIO/support/issues/{issue_number}",
+        "organization": "ZenHubIO",
+        "repo": "support",
+        "user_name": "ZenHubIO",
+        "issue_number": str(issue_number),
+        "issue_title": "Test",
+        "to_pipeline_name": to_pipeline,
+        "workspace_id": "5d0a7a9741fd098f6b7f58ac",
+        "workspace_name": "Test",
+        "from_pipeline_name": from_pipeline,
+    }
+
+######################################################################
+#  T E S T   C A S E S
+######################################################################
+class TestWebhookReceiver(TestCase):
+    """ Test Cases for applying webhooks to cached boards """
+
+    @classmethod
+    def setUpClass(cls):
+        global BOARD_DATA
+        with open('tests/fixtures/board_with_issues.json') as json_data:
+            BOARD_DATA = json.load(json_data)
+
+    def setUp(self):
+        self.zen = ZenHub('ZENHUB_TOKEN')
+        self.repo = self.zen.repository(12345)
+        self.board = Board(copy.deepcopy(BOARD_DATA), self.repo)
+        self.receiver = WebhookReceiver()
+        self.receiver.watch(self.board, 'ZenHubIO/support')
+
+    @property
+    def first(self):
+        return self.board.data['pipelines'][0]
+
+    @property
+    def second(self):
+        return self.board.data['pipelines'][1]
+
+    def numbers(self, pipeline):
+        return [issue_data['issue_number'] for issue_data in pipeline['issues']]
+
+    def test_issue_transfer(self):
+        """ Move an issue to another pipeline """
+        number = self.first['issues'][1]['issue_number']
+        issue = self.board.issue(number)
+        result = self.receiver.handle(transfer(number, self.first['name'], self.second['name']))
+        self.assertEqual(result, 'applied')
+        self.assertNotIn(number, self.numbers(self.first))
+        self.assertEqual(self.numbers(self.second)[0], number)
+        self.assertEqual([entry['position'] for entry in self.first['issues']],
+                         list(range(len(self.first['issues']))))
+        self.assertEqual(self.board.issue(number).position, 0)
+        self.assertIs(self.board.issue(number), issue)
+
+    def test_issue_reprioritized(self):
+        """ Move an issue within a pipeline """
+        numbers = self.numbers(self.first)
+        payload = transfer(numbers[0], None, self.first['name'])
+        payload.update(type='issue_reprioritized', from_position='0', to_position='2')
+        self.assertEqual(self.receiver.handle(payload), 'applied')
+        self.assertEqual(self.numbers(self.first), numbers[1:3] + numbers[:1] + numbers[3:])
+
+    def test_estimate(self):
+        """ Set and clear an estimate """
+        number = self.first['issues'][0]['issue_number']
+        payload = transfer(number, None, None)
+        payload.update(type='estimate_set', estimate='5')
+        self.assertEqual(self.receiver.handle(payload), 'applied')
+        self.assertEqual(self.board.issue(number).estimate, 5)
+        payload.update(type='estimate_cleared')
+        self.assertEqual(self.receiver.handle(payload), 'applied')
+        self.assertEqual(self.board.issue(number).estimate, 0)
+
+    def test_shared_cache(self):
+        """ A change to one board does not leak into another from the cache """
+        zen = ZenHub('ZENHUB_TOKEN', cache=ResponseCache(), default_workspace='ws')
+        path = '/p2/workspaces/ws/repositories/12345/board'
+        zen.cache.set(path, copy.deepcopy(BOARD_DATA))
+        repo = zen.repository(12345)
+        first, second = Board.find(repo), Board.find(repo)
+        self.assertTrue(first.move_issue(5, 'Done'))
+        self.assertEqual(self.numbers(first.data['pipelines'][5]), [5, 3])
+        self.assertEqual(self.numbers(second.data['pipelines'][1]), [5, 8, 6, 11, 13])
+        self.assertEqual(second.issue(5).position, 0)
+        self.assertEqual(self.numbers(zen.cache.get(path)['pipelines'][5]), [3])
+        second.data['pipelines'][1]['issues'].clear()
+        self.assertRaises(LookupError, second.issue, 5)
+
+    @mock.patch('zenhub.ZenHub.get')
+    def test_drift_refetches(self, mock_get):
+        """ A board that does not match the event is fetched again """
+        mock_get.return_value = copy.deepcopy(BOARD_DATA)
+        number = self.first['issues'][0]['issue_number']
+        result = self.receiver.handle(transfer(number, 'Not The Pipeline', self.second['name']))
+        self.assertEqual(result, 'refetched')
+        mock_get.assert_called_once_with('/p1/repositories/12345/board', fresh=True)
+        self.assertEqual(self.receiver.stats['refetched'], 1)
+
+    @mock.patch('zenhub.ZenHub.get')
+    def test_refetch_fails(self, mock_get):
+        """ A board that cannot be fetched again is reported as failed """
+        mock_get.side_effect = ConnectionError('unreachable')
+        number = self.first['issues'][0]['issue_number']
+        result = self.receiver.handle(transfer(number, 'Not The Pipeline', self.second['name']))
+        self.assertEqual(result, 'failed')
+        self.assertEqual(self.receiver.stats['failed'], 1)
+        environ = {
+            'REQUEST_METHOD': 'POST',
+            'CONTENT_TYPE': 'application/json',
+            'wsgi.input': io.BytesIO(json.dumps(transfer(number, 'Nope', 'Backlog')).encode('utf-8')),
+        }
+        environ['CONTENT_LENGTH'] = str(len(environ['wsgi.input'].getvalue()))
+        start_response = mock.Mock()
+        body = self.receiver(environ, start_response)
+        self.assertEqual(start_response.call_args[0][0], '502 Bad Gateway')
+        self.assertEqual(json.loads(b''.join(body)), {'result': 'failed'})
+
+    def test_refetch_outside_lock(self):
+        """ Other events are handled while a drifted board is fetched """
+        def refresh():
+            self.assertFalse(self.receiver._lock.locked())
+            return True
+        self.board.refresh = refresh
+        number = self.first['issues'][0]['issue_number']
+        result = self.receiver.handle(transfer(number, 'Not The Pipeline', self.second['name']))
+        self.assertEqual(result, 'refetched')
+
+    def test_ignored(self):
+        """ Unknown repositories and events are ignored """
+        payload = transfer(1, 'A', 'B')
+        payload['repo'] = 'other'
+        self.assertEqual(self.receiver.handle(payload), 'ignored')
+        payload = transfer(1, 'A', 'B')
+        payload['type'] = 'issue_closed'
+        self.assertEqual(self.receiver.handle(payload), 'ignored')
+        self.assertRaises(WebhookError, self.receiver.handle, {'type': 'issue_transfer'})
+
+    def test_http_server(self):
+        """ Post payloads to a local server """
+        server = self.receiver.make_server('127.0.0.1', 0)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        try:
+            url = f'http://127.0.0.1:{server.server_port}/'
+            number = self.first['issues'][0]['issue_number']
+            body = urlencode(transfer(number, self.first['name'], self.second['name']))
+            with urlopen(Request(url, data=body.encode('utf-8'))) as response:
+                self.assertEqual(json.loads(response.read()), {'result': 'applied'})
+            self.assertEqual(self.numbers(self.second)[0], number)
+
+            body = json.dumps(transfer(number, self.second['name'], self.first['name']))
+            request = Request(url, data=body.encode('utf-8'),
+                              headers={'Content-Type': 'application/json'})
+            with urlopen(request) as response:
+                self.assertEqual(json.loads(response.read()), {'result': 'applied'})
+
+            request = Request(url, data=b'[1, 2]', headers={'Content-Type': 'application/json'})
+            with self.assertRaises(HTTPError) as context:
+                urlopen(request)
+            self.assertEqual(context.exception.code, 400)
+            context.exception.close()
+        finally:
+            server.shutdown()
+            server.server_close()
+            thread.join()
@@ -0,0 +1,113 @@
+"""
+Test cases for the Workspace resolution of boards and moves
+"""
+import json
+from unittest import TestCase
+from zenhub import ZenHub, Issue
+from helpers import StubTransport
+
+BOARD_DATA = {}
+ISSUE_DATA = {}
+
+def workspace_stub(workspaces):
+    """ Returns a transport that serves the workspaces in ``workspaces`` by repo id """
+    return StubTransport([
+        (r'/repositories/(\d+)/workspaces$', lambda request, repo_id: workspaces.get(int(repo_id))),
+        (r'/board$', BOARD_DATA),
+        (r'', {}),
+    ])
+
+######################################################################
+#  T E S T   C A S E S
+######################################################################
+class TestWorkspaces(TestCase):
+    """ Test Cases for the Workspace resolution """
+
+    @classmethod
+    def setUpClass(cls):
+        global BOARD_DATA, ISSUE_DATA
+        with open('tests/fixtures/board_with_issues.json') as json_data:
+            BOARD_DATA = json.load(json_data)
+        with open('tests/fixtures/issue.json') as json_data:
+            ISSUE_DATA = json.load(json_data)
+
+    def setUp(self):
+        self.transport = workspace_stub({
+            1: [{'id': 'w1', 'name': 'One', 'repositories': [1, 2]},
+                {'id': 'w2', 'name': 'Two', 'repositories': [1]}],
+            2: [{'id': 'w1', 'name': 'One', 'repositories': [1, 2]}],
+            3: [],
+        })
+
+    def test_legacy_board(self):
+        """ Without a known Workspace the p1 board is fetched """
+        zen = ZenHub('ZENHUB_TOKEN', transport=self.transport)
+        board = zen.repository(1).board()
+        self.assertIsNone(board.workspace_id)
+        self.assertEqual(self.transport.paths('GET'), ['/p1/repositories/1/board'])
+
+    def test_default_workspace(self):
+        """ The default Workspace is used without looking it up """
+        zen = ZenHub('ZENHUB_TOKEN', transport=self.transport, default_workspace='w1')
+        board = zen.repository(1).board()
+        self.assertEqual(board.workspace_id, 'w1')
+        board.refresh()
+        self.assertEqual(self.transport.paths('GET'),
+                         ['/p2/workspaces/w1/repositories/1/board'] * 2)
+
+    def test_workspaces_cached(self):
+        """ The Workspaces of a repository are fetched once and used for its board """
+        zen = ZenHub('ZENHUB_TOKEN', transport=self.transport)
+        repo = zen.repository(1)
+        self.assertEqual([workspace.id for workspace in repo.workspaces()], ['w1', 'w2'])
+        self.assertEqual([workspace.id for workspace in repo.workspaces()], ['w1', 'w2'])
+        repo.board()
+        repo.workspaces(fresh=True)
+        self.assertEqual(self.transport.paths('GET'), ['/p1/repositories/1/workspaces',
+                                                  '/p2/workspaces/w1/repositories/1/board',
+                                                  '/p1/repositories/1/workspaces'])
+
+    def test_workspaces_expire(self):
+        """ The Workspaces are fetched again after the ttl """
+        zen = ZenHub('ZENHUB_TOKEN', transport=self.transport, workspace_ttl=0)
+        zen.repository(1).workspaces()
+        zen.repository(1).workspaces()
+        self.assertEqual(len(self.transport.paths('GET')), 2)
+
+    def test_workspace_of(self):
+        """ The default Workspace is preferred when it contains the repository """
+        zen = ZenHub('ZENHUB_TOKEN', transport=self.transport, default_workspace='w2')
+        zen.prefetch_workspaces([1, 2, 3, 4])
+        self.assertEqual(zen.workspace_of(1), 'w2')
+        self.assertEqual(zen.workspace_of(2), 'w1')
+        self.assertIsNone(zen.workspace_of(3))
+        self.assertEqual(zen.workspace_of(4), 'w2')
+
+    def test_prefetch_known_repositories(self):
+        """ Prefetching looks up every repository the client knows once """
+        zen = ZenHub('ZENHUB_TOKEN', transport=self.transport)
+        repos = [zen.repository(repo_id) for repo_id in (1, 2, 3)]
+        self.assertEqual(zen.prefetch_workspaces(), {1: 'w1', 2: 'w1', 3: None})
+        self.assertEqual(zen.prefetch_workspaces(), {1: 'w1', 2: 'w1', 3: None})
+        self.assertEqual(sorted(self.transport.paths('GET')),
+                         [f'/p1/repositories/{repo.id}/workspaces' for repo in repos])
+        for repo in repos:
+            repo.board()
+        self.assertEqual(self.transport.paths('GET')[3:], ['/p2/workspaces/w1/repositories/1/board',
+                                                      '/p2/workspaces/w1/repositories/2/board',
+                                                      '/p1/repositories/3/board'])
+
+    def test_move_in_workspace(self):
+        """ Issues are moved in the resolved Workspace """
+        zen = ZenHub('ZENHUB_TOKEN', transport=self.transport)
+        repo = zen.repository(2)
+        issue = Issue(ISSUE_DATA, 7, repo)
+        issue.move_to('p1', 0)
+        zen.prefetch_workspaces()
+        issue.move_to('p2', 'bottom')
+        issue.move_to('p3', 'top', workspace_id='w9')
+        self.assertEqual(self.transport.paths('POST'), [
+            '/p1/repositories/2/issues/7/moves',
+            '/p2/workspaces/w1/repositories/2/issues/7/moves',
+            '/p2/workspaces/w9/repositories/2/issues/7/moves',
+        ])
@@ -6,7 +6,7 @@ import logging
 from unittest import TestCase, mock
 from requests import Response
 from requests.exceptions import HTTPError
-from zenhub import ZenHub, Repository
+from zenhub import ZenHub, Repository, codec
 
 ######################################################################
 #  T E S T   C A S E S
@@ -21,6 +21,28 @@ class TestZenHub(TestCase):
         self.assertEqual(zen.api_endpoint, ZenHub.DEFAULT_API_ENDPOINT)
         self.assertEqual(zen.headers, {'X-Authentication-Token': 'ZENHUB_TOKEN'})
 
+    def test_codecs(self):
+        """ Decode and encode with every installed codec """
+        for name in codec.available():
+            zen = ZenHub('ZENHUB_TOKEN', codec=name)
+            self.assertEqual(zen.codec.name, name)
+            data = {"message": "ok!", "list": [1, 2.5, None, True]}
+            self.assertEqual(zen.codec.loads(zen.codec.encode(data)), data)
+            self.assertEqual(json.loads(zen.codec.dumps(data, indent=True)), data)
+        self.assertEqual(ZenHub('ZENHUB_TOKEN', codec='json').codec.name, 'json')
+        self.assertRaises(ValueError, ZenHub, 'ZENHUB_TOKEN', codec='phony')
+
+    @mock.patch('requests.post')
+    def test_post_encodes_body(self, mock_request):
+        """ Test POST body is encoded with the codec """
+        mock_request.return_value = mock.MagicMock(spec=Response, status_code=200,
+                                                   headers={"Content-Length": 0})
+        zen = ZenHub('ZENHUB_TOKEN')
+        zen.post('/phony', {"message":"ok!"})
+        kwargs = mock_request.call_args[1]
+        self.assertEqual(json.loads(kwargs['data']), {"message":"ok!"})
+        self.assertEqual(kwargs['headers']['Content-Type'], 'application/json')
+
     def test_repository(self):
         """ Test Get repository """
         zen = ZenHub('ZENHUB_TOKEN')
@@ -33,7 +55,8 @@ class TestZenHub(TestCase):
     def test_get_request(self, mock_request):
         """ Test GET Request """
         mock_request.return_value = mock.MagicMock(spec=Response,
-                                                   status_code=200)
+                                                   status_code=200,
+                                                   content=b'{"message":"ok!"}')
         mock_request.return_value.json.return_value = {"message":"ok!"}
         zen = ZenHub('ZENHUB_TOKEN')
         resp = zen.get('/phony')
@@ -68,7 +91,8 @@ class TestZenHub(TestCase):
         }
         mock_request.return_value = mock.MagicMock(spec=Response,
                                                    status_code=200,
-                                                   headers=headers)
+                                                   headers=headers,
+                                                   content=b'{"message":"ok!"}')
         mock_request.return_value.json.return_value = {"message":"ok!"}
         zen = ZenHub('ZENHUB_TOKEN')
         resp = zen.post('/phony', {"message":"ok!"})
@@ -83,7 +107,8 @@ class TestZenHub(TestCase):
         }
         mock_request.return_value = mock.MagicMock(spec=Response,
                                                    status_code=200,
-                                                   headers=headers)
+                                                   headers=headers,
+                                                   content=b'{"message":"ok!"}')
         mock_request.return_value.json.return_value = {"message":"ok!"}
         zen = ZenHub('ZENHUB_TOKEN')
         resp = zen.put('/phony', {"message":"ok!"})
@@ -108,7 +133,8 @@ class TestZenHub(TestCase):
         }
         mock_request.return_value = mock.MagicMock(spec=Response,
                                                    status_code=200,
-                                                   headers=headers)
+                                                   headers=headers,
+                                                   content=b'{"message":"ok!"}')
         mock_request.return_value.json.return_value = {"message":"ok!"}
         zen = ZenHub('ZENHUB_TOKEN')
         resp = zen.patch('/phony', {"message":"ok!"})
@@ -29,12 +29,35 @@ It includes the following classes
 - Issue
 - Workspace
 
+The classes are imported lazily the first time they are used so that
+``import zenhub`` stays cheap for short lived scripts.
 """
 
-from .zenhub import ZenHub
-from .repository import Repository
-from .board import Board
-from .pipeline import Pipeline
-from .epic import Epic
-from .issue import Issue
-from .workspace import Workspace
+from importlib import import_module
+
+_LAZY_IMPORTS = {
+    'ZenHub': '.zenhub',
+    'Repository': '.repository',
+    'Board': '.board',
+    'Pipeline': '.pipeline',
+    'Epic': '.epic',
+    'Issue': '.issue',
+    'Workspace': '.workspace',
+}
+
+__all__ = list(_LAZY_IMPORTS)
+
+
+def __getattr__(name):
+    """ Imports a class from its submodule the first time it is used """
+    try:
+        module_name = _LAZY_IMPORTS[name]
+    except KeyError:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}') from None
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -25,44 +25,198 @@ Implements the following ZenHub REST calls:
 
     Get Board Data for a Repository
         ``GET  /p1/repositories/:repo_id/board``
+    Get a ZenHub Board for a repository (when the board belongs to a Workspace)
+        ``GET  /p2/workspaces/:workspace_id/repositories/:repo_id/board``
+
+Boards can be saved to and loaded from a binary snapshot file
+(see :mod:`zenhub.snapshot`).
 
 Based on ZenHub API @ https://github.com/ZenHubIO/API
 """
 
-import json
+from .profiling import profiled
+from .cache import is_stale
+from .issue import Issue, BOARD_FIELDS, board_issue
+from .projection import issue_fields, project_board
 from .pipeline import Pipeline
 
 class Board:
     """ Represents a Kanban Board in ZenHub """
 
-    def __init__(self, data, repo):
-        self.data = data
+    def __init__(self, data, repo, workspace_id=None):
+        self._data = data
+        self._snapshot = None
+        self._locations = None
+        self._query = None
+        # False while the data may be shared, e.g. with the response cache
+        self._owned = False
         self.repo = repo
+        self.workspace_id = workspace_id
+        self.fields = None
+        # True when the data is a last good response served while the API failed
+        self.stale = False
+        # True while the data is the one loaded from a snapshot
+        self.loaded = False
 
     def __repr__(self):
         return '<%s %r>' % (type(self).__name__, self.repo.id)
 
     def __str__(self):
-        return '<%s %r>\n' % (type(self).__name__, self.repo.id) + json.dumps(self.data, indent=4)
+        return ('<%s %r>\n' % (type(self).__name__, self.repo.id)
+                + self.repo.zenhub.codec.dumps(self.data, indent=True))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """ Unmaps the snapshot file this Board was loaded from, if any
+
+        The data that was read before stays available, the rest is not.
+        """
+        if self._snapshot is not None:
+            self._snapshot.close()
+            self._snapshot = None
+
+    @property
+    def data(self):
+        """ The board data as returned by the ZenHub API
+
+        A board loaded from a snapshot reads all of its data the first
+        time this is accessed.
+        """
+        if self._data is None and self._snapshot is not None:
+            self._data = dict(self._snapshot.meta, pipelines=self._snapshot.groups())
+        return self._data
+
+    @data.setter
+    def data(self, value):
+        self._data = value
+        self._owned = False
+        self._reindex()
+
+    def _reindex(self):
+        """ Drops the indexes, e.g. after the data was changed in place """
+        self._locations = None
+        self._query = None
+
+    @property
+    def shares_issues(self):
+        """ Whether the Issues of this Board are the ones the client shares
+
+        The Issues of a projected board or of a board loaded from a snapshot
+        are not shared, since their data is partial or may be older than the
+        shared Issues (see :mod:`zenhub.identity`).
+        """
+        return self.fields is None and not self.loaded
+
+    def _own(self):
+        """ Copies the data before the first local change
+
+        The data of a board may be the very dict held by the response cache
+        and by other Boards, which must not see the change.
+        """
+        if self._owned:
+            return
+        data = self.data
+        self.data = dict(data, pipelines=[
+            dict(pipeline, issues=[dict(issue_data) for issue_data in pipeline['issues']])
+            for pipeline in data['pipelines']
+        ])
+        self._owned = True
+
+    @staticmethod
+    def _issue_in(pipeline, issue_number):
+        """ Returns the index and data of an issue in a pipeline dict
+
+        :raise LookupError: the issue is not in the pipeline
+        """
+        found = next(((index, issue_data) for index, issue_data in enumerate(pipeline['issues'])
+                      if issue_data['issue_number'] == issue_number), None)
+        if found is None:
+            raise LookupError(f'issue #{issue_number} is not in pipeline '
+                              f'{pipeline.get("name")!r} although the board index says so')
+        return found
+
+    def _pipeline_of(self, issue_number):
+        """ Returns the pipeline dict that holds an issue using an index built on first use """
+        if self._locations is None:
+            self._locations = {
+                issue_data['issue_number']: pipeline
+                for pipeline in self.data['pipelines']
+                for issue_data in pipeline['issues']
+            }
+        return self._locations.get(issue_number)
+
+    def _pipeline_named(self, name_or_id):
+        """ Returns the pipeline dict with this name or id or ``None`` """
+        return next((pipeline for pipeline in self.data['pipelines']
+                     if name_or_id in (pipeline.get('name'), pipeline.get('id'))), None)
 
     @staticmethod
-    def find(repo):
+    @profiled
+    def find(repo, fields=None, workspace_id=None):
         """ Constructs and returns a :class:`Board <Board>`.
 
+        The board of the Workspace the client resolves for the repository
+        (see :meth:`ZenHub.workspace_of <zenhub.ZenHub.workspace_of>`) is
+        fetched unless a ``workspace_id`` is given.
+
         :type: :class:`zenhub.Repo`
         :param repo: The ``Repo`` class for this board
+        :type fields: list
+        :param fields: Only keep these fields of each issue (keeps all if ``None``)
+        :type workspace_id: string
+        :param workspace_id: The Workspace of the board
 
-        :calls: `GET /p1/repositories/:repo_id/board <https://github.com/ZenHubIO/API#get-epic-data>`_
+        :calls: `GET /p2/workspaces/:workspace_id/repositories/:repo_id/board
+                <https://github.com/ZenHubIO/API#get-a-zenhub-board-for-a-repository>`_
+                or `GET /p1/repositories/:repo_id/board <https://github.com/ZenHubIO/API#get-epic-data>`_
+                when the Workspace is not known
 
         :return: The Board class that represents the kanban board
         :rtype: :class:`zenhub.Board`
 
         """
-        data = repo.zenhub.get(f"/p1/repositories/{repo.id}/board")
+        workspace_id = workspace_id or repo.zenhub.workspace_of(repo.id)
+        data = repo.zenhub.get(Board._path(repo, workspace_id))
         if data:
-            return Board(data, repo)
+            board = Board(project_board(data, issue_fields(fields)), repo, workspace_id)
+            board.fields = fields
+            board.stale = is_stale(data)
+            return board
         return None
 
+    @staticmethod
+    def _path(repo, workspace_id):
+        """ Returns the path of the board of a repository, in a Workspace if one is given """
+        if workspace_id:
+            return f'/p2/workspaces/{workspace_id}/repositories/{repo.id}/board'
+        return f'/p1/repositories/{repo.id}/board'
+
+    @profiled
+    def refresh(self):
+        """ Fetches the data of this Board again
+
+        :calls: `GET /p1/repositories/:repo_id/board <https://github.com/ZenHubIO/API#get-a-zenhub-board-for-a-repository>`_
+                or `GET /p2/workspaces/:workspace_id/repositories/:repo_id/board
+                <https://github.com/ZenHubIO/API#get-a-zenhub-board-for-a-repository>`_
+                when the board belongs to a Workspace
+
+        :return: ``True`` if the board was found
+        :rtype: bool
+        """
+        data = self.repo.zenhub.get(Board._path(self.repo, self.workspace_id), fresh=True)
+        if not data:
+            return False
+        self.close()
+        self.data = project_board(data, issue_fields(self.fields))
+        self.stale = is_stale(data)
+        self.loaded = False
+        return True
+
     def pipelines(self):
         """ Returns the Pipelines that are in this Board or an empty list
 
@@ -70,7 +224,7 @@ class Board:
         :rtype: list
 
         """
-        return [Pipeline(pipeline, self.repo) for pipeline in self.data['pipelines']]
+        return [Pipeline(pipeline, self.repo, self) for pipeline in self.data['pipelines']]
 
     def pipeline(self, name):
         """ Returns a single Pipelines by name or ``None`` if not found
@@ -82,4 +236,192 @@ class Board:
         :rtype: :class:`zenhub.Pipeline` or ``None``
 
         """
-        next((pipeline for pipeline in self.pipelines() if pipeline.name == name), None)
+        return next((pipeline for pipeline in self.pipelines() if pipeline.name == name), None)
+
+    def issue(self, issue_number):
+        """ Returns a single Issue on this Board by number or ``None`` if not found
+
+        A board loaded from a snapshot finds the issue without reading the
+        rest of the board.
+
+        :type issue_number: int
+        :param issue_number: The number of the Issue you want to return
+
+        :return: The Issue with that number or ``None`` if not found
+        :rtype: :class:`zenhub.Issue` or ``None``
+
+        """
+        if self._data is None and self._snapshot is not None:
+            found = self._snapshot.lookup(issue_number)
+            if found:
+                return Issue.from_data(found[1], issue_number, self.repo, shared=False)
+            return None
+        pipeline = self._pipeline_of(issue_number)
+        if pipeline is None:
+            return None
+        _, issue_data = self._issue_in(pipeline, issue_number)
+        return Issue.from_board(issue_data, pipeline, self.repo, self)
+
+    def query(self, order_by=None, limit=None, epics=(), **conditions):
+        """ Returns the Issues on this Board that match the conditions
+
+        For example ``board.query(pipeline='In Progress', estimate_gte=3)``.
+        See :mod:`zenhub.query` for the conditions. The indexes are kept until
+        the board changes, so repeated queries are fast.
+
+        :type order_by: string
+        :param order_by: A field to sort by, prefixed with ``-`` for descending order
+        :type limit: int
+        :param limit: The maximum number of issues to return
+        :type epics: list
+        :param epics: The Epics used to answer ``epic`` conditions
+
+        :return: The matching Issues
+        :rtype: list
+        """
+        epics = list(epics)
+        if self._query is None or (epics and epics != self._query.epics):
+            # zenhub.query is only imported when a board is first queried
+            from .query import Query
+            self._query = Query([self], epics=epics)
+        return self._query.issues(order_by=order_by, limit=limit, **conditions)
+
+    @profiled
+    def issue_details(self, workers=8):
+        """ Fetches the full data of every Issue on this Board in parallel
+
+        Under a deadline (see :meth:`ZenHub.deadline <zenhub.ZenHub.deadline>`)
+        the issues that were not fetched in time are left out.
+
+        :type workers: int
+        :param workers: The number of requests to send at once
+
+        :calls: `GET /p1/repositories/:repo_id/issues/:issue_number <https://github.com/ZenHubIO/API#get-issue-data>`_
+                for every issue
+
+        :return: The Issues in board order
+        :rtype: list
+        """
+        numbers = [issue_data['issue_number']
+                   for pipeline in self.data['pipelines'] for issue_data in pipeline['issues']]
+        issues = self.repo.zenhub.map(self.repo.issue, numbers, workers=workers)
+        return [issue for issue in issues if issue is not None]
+
+    def move_issue(self, issue_number, to_pipeline, position=None, from_pipeline=None,
+                   from_position=None):
+        """ Moves an issue on the local copy of this Board
+
+        This only updates the data held in memory (e.g., when a webhook reports
+        that an issue was moved). Use :meth:`Issue.move_to <zenhub.Issue.move_to>`
+        to move an issue in ZenHub.
+
+        :type issue_number: int
+        :param issue_number: The number of the issue
+        :type to_pipeline: string
+        :param to_pipeline: The name or id of the destination pipeline
+        :type position: int
+        :param position: The new position, or ``None`` for the top
+        :type from_pipeline: string
+        :param from_pipeline: The name or id of the pipeline the issue is expected in
+        :type from_position: int
+        :param from_position: The position the issue is expected at
+
+        :return: ``False`` if the board does not match what was expected
+                 (unknown issue or pipeline, or another position) and nothing
+                 was changed
+        :rtype: bool
+        """
+        source = self._pipeline_of(issue_number)
+        destination = self._pipeline_named(to_pipeline)
+        if source is None or destination is None:
+            return False
+        if from_pipeline is not None and from_pipeline not in (source.get('name'), source.get('id')):
+            return False
+        index, _ = self._issue_in(source, issue_number)
+        if from_position is not None and index != from_position:
+            return False
+        self._own()
+        source = self._pipeline_of(issue_number)
+        destination = self._pipeline_named(to_pipeline)
+        issue_data = source['issues'].pop(index)
+        position = 0 if position is None else max(0, min(position, len(destination['issues'])))
+        destination['issues'].insert(position, issue_data)
+        self._locations[issue_number] = destination
+        for pipeline in {id(source): source, id(destination): destination}.values():
+            for index, entry in enumerate(pipeline['issues']):
+                if 'position' in entry:
+                    entry['position'] = index
+        self._query = None
+        self._refresh_issue(issue_number, issue_data, destination)
+        return True
+
+    def set_estimate(self, issue_number, value):
+        """ Sets the estimate of an issue on the local copy of this Board
+
+        :type issue_number: int
+        :param issue_number: The number of the issue
+        :type value: int
+        :param value: The estimate in story points or ``None`` to clear it
+
+        :return: ``False`` if the issue is not on this board
+        :rtype: bool
+        """
+        if self._pipeline_of(issue_number) is None:
+            return False
+        self._own()
+        pipeline = self._pipeline_of(issue_number)
+        _, issue_data = self._issue_in(pipeline, issue_number)
+        if value is None:
+            issue_data.pop('estimate', None)
+        else:
+            issue_data['estimate'] = {'value': value}
+        self._query = None
+        self._refresh_issue(issue_number, issue_data, pipeline)
+        return True
+
+    def _refresh_issue(self, issue_number, issue_data, pipeline):
+        """ Refreshes the shared Issue object, if there is one, after a local change """
+        issue = self.repo.zenhub.identity.get(('issue', self.repo.id, issue_number))
+        if issue is None or not self.shares_issues:
+            return
+        issue.refresh(board_issue(issue_data, pipeline, self.workspace_id), BOARD_FIELDS)
+
+    def save(self, path):
+        """ Saves this Board to a binary snapshot file
+
+        :type path: string
+        :param path: The file name of the snapshot
+
+        """
+        data = self.data
+        meta = {key: value for key, value in data.items() if key != 'pipelines'}
+        groups = [
+            ({key: value for key, value in pipeline.items() if key != 'issues'}, pipeline['issues'])
+            for pipeline in data['pipelines']
+        ]
+        from . import snapshot
+        snapshot.write(path, snapshot.KIND_BOARD, meta, groups, self.repo.id)
+
+    @staticmethod
+    def load(path, repo):
+        """ Loads a Board from a binary snapshot file
+
+        The file is memory mapped and only read as the data is needed. The
+        Issues of the board are not the shared ones of the client, which
+        keep their current data.
+
+        :type path: string
+        :param path: The file name of the snapshot
+        :type repo: :class:`zenhub.Repository`
+        :param repo: The repository of the board
+
+        :return: The Board that was saved
+        :rtype: :class:`zenhub.Board`
+
+        :raise zenhub.snapshot.SnapshotError: the file is not a board snapshot
+        """
+        board = Board(None, repo)
+        from . import snapshot
+        board._snapshot = snapshot.load(path, snapshot.KIND_BOARD)
+        board.loaded = True
+        return board
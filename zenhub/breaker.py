@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2019 John J. Rofrano <rofrano@gmail.com>
+# All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Circuit Breaker
+
+A :class:`CircuitBreaker` wraps a transport and stops sending requests for
+a while when the ZenHub API is failing, so callers fail fast instead of
+piling up behind requests that will time out::
+
+    zen = ZenHub('access_token', transport=CircuitBreaker(RequestsTransport()),
+                 serve_stale=3600)
+
+The breaker is ``closed`` while requests succeed. It trips ``open`` when, in
+the last ``window`` seconds, at least ``minimum_requests`` requests were
+sent and the share that failed or were slower than ``slow_call`` seconds
+reached ``failure_ratio``. While open every request raises
+:class:`CircuitOpenError`. After ``reset_timeout`` seconds the breaker is
+``half-open`` and lets one trial request through: the breaker closes when
+it succeeds and opens again when it fails.
+
+With ``serve_stale`` a :class:`ZenHub <zenhub.ZenHub>` client answers a GET
+that failed with the last good response for the same path, for up to
+``serve_stale`` seconds after it was received. The data is returned as
+:class:`StaleData <zenhub.cache.StaleData>` (see :func:`is_stale <zenhub.cache.is_stale>`) and the path is fetched again in
+the background.
+"""
+
+import time
+import threading
+from collections import deque
+from .transport import Transport
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+# responses with these status codes count as failures
+_FAILURE_STATUS = 500
+
+
+class CircuitOpenError(Exception):
+    """ A request was not sent because the circuit breaker is open """
+
+
+class CircuitBreaker(Transport):
+    """ Stops sending requests through a transport while they are failing
+
+    :type transport: :class:`Transport <zenhub.transport.Transport>`
+    :param transport: The transport that really sends the requests
+    :type failure_ratio: float
+    :param failure_ratio: The share of failed or slow requests that trips the breaker
+    :type minimum_requests: int
+    :param minimum_requests: The number of requests in the window needed to trip
+    :type window: float
+    :param window: The seconds of recent requests the ratio is computed over
+    :type slow_call: float
+    :param slow_call: Requests slower than this many seconds count as failures
+    :type reset_timeout: float
+    :param reset_timeout: The seconds the breaker stays open before a trial request
+    """
+
+    def __init__(self, transport, failure_ratio=0.5, minimum_requests=10, window=30.0,
+                 slow_call=10.0, reset_timeout=30.0, clock=time.monotonic):
+        self.transport = transport
+        self.failure_ratio = failure_ratio
+        self.minimum_requests = minimum_requests
+        self.window = window
+        self.slow_call = slow_call
+        self.reset_timeout = reset_timeout
+        self.trips = 0
+        self.rejected = 0
+        self._clock = clock
+        self._state = CLOSED
+        self._opened = 0.0
+        self._trial = False
+        self._outcomes = deque()
+        self._failures = 0
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return '<%s %r>' % (type(self).__name__, self.state)
+
+    @property
+    def state(self):
+        """ ``'closed'``, ``'open'`` or ``'half-open'`` """
+        with self._lock:
+            return self._current_state(self._clock())
+
+    def _current_state(self, now):
+        """ Returns the state, moving from open to half-open after the reset timeout """
+        if self._state == OPEN and now - self._opened >= self.reset_timeout:
+            self._state = HALF_OPEN
+            self._trial = False
+        return self._state
+
+    def _allow(self):
+        """ Returns ``True`` if a request may be sent now """
+        with self._lock:
+            state = self._current_state(self._clock())
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and not self._trial:
+                self._trial = True
+                return True
+            self.rejected += 1
+            return False
+
+    def _record(self, failed):
+        """ Records the outcome of a request and trips or closes the breaker """
+        with self._lock:
+            now = self._clock()
+            if self._state == HALF_OPEN:
+                if failed:
+                    self._open(now)
+                else:
+                    self._state = CLOSED
+                    self._outcomes.clear()
+                    self._failures = 0
+                return
+            self._outcomes.append((now, failed))
+            self._failures += failed
+            while self._outcomes and self._outcomes[0][0] < now - self.window:
+                self._failures -= self._outcomes.popleft()[1]
+            if (self._state == CLOSED and len(self._outcomes) >= self.minimum_requests
+                    and self._failures >= self.failure_ratio * len(self._outcomes)):
+                self._open(now)
+
+    def _open(self, now):
+        """ Opens the breaker (call with the lock held) """
+        self._state = OPEN
+        self._opened = now
+        self._outcomes.clear()
+        self._failures = 0
+        self.trips += 1
+
+    def request(self, method, url, headers, data=None, timeout=None):
+        if not self._allow():
+            raise CircuitOpenError(f'circuit breaker is open, {method} {url} was not sent')
+        started = self._clock()
+        try:
+            response = self.transport.request(method, url, headers, data, timeout=timeout)
+        except Exception:
+            self._record(True)
+            raise
+        failed = (response.status_code >= _FAILURE_STATUS
+                  or self._clock() - started > self.slow_call)
+        self._record(failed)
+        return response
+
+    def stats(self):
+        """ Returns the state of the breaker and its counters
+
+        :rtype: dict
+        """
+        with self._lock:
+            return {
+                'state': self._current_state(self._clock()),
+                'trips': self.trips,
+                'rejected': self.rejected,
+                'requests': len(self._outcomes),
+                'failures': self._failures,
+            }
+
+    def close(self):
+        self.transport.close()
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2019 John J. Rofrano <rofrano@gmail.com>
+# All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Response Cache
+
+A small in-memory cache for the decoded responses of http GET requests.
+Entries expire after ``ttl`` seconds and the least recently used entries are
+evicted once ``maxsize`` entries are stored. The cache is safe to share
+between threads.
+
+Example::
+
+    zen = ZenHub('access_token', cache=ResponseCache(ttl=300))
+
+"""
+
+import time
+import threading
+from collections import OrderedDict
+
+
+class StaleData(dict):
+    """ A last known good response served while the API was failing
+
+    See :class:`ZenHub <zenhub.ZenHub>` ``serve_stale``.
+    """
+
+    stale = True
+
+
+def is_stale(data):
+    """ Returns ``True`` if data is a stale response (see :class:`StaleData`) """
+    return getattr(data, 'stale', False)
+
+
+class ResponseCache:
+    """ Caches decoded GET responses by path
+
+    :type ttl: float
+    :param ttl: The number of seconds an entry stays fresh
+    :type maxsize: int
+    :param maxsize: The maximum number of entries to keep
+    """
+
+    def __init__(self, ttl=60.0, maxsize=4096):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, path):
+        return self.get(path, count=False) is not None
+
+    def get(self, path, count=True):
+        """ Returns the cached data for a path or ``None`` if missing or expired
+
+        :type path: string
+        :param path: The path after the api endpoint
+
+        :return: The cached data or ``None``
+        :rtype: dict or None
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] <= now:
+                del self._entries[path]
+                entry = None
+            if entry is None:
+                if count:
+                    self.misses += 1
+                return None
+            self._entries.move_to_end(path)
+            if count:
+                self.hits += 1
+            return entry[1]
+
+    def set(self, path, data, ttl=None):
+        """ Stores the data for a path
+
+        :type path: string
+        :param path: The path after the api endpoint
+        :type data: dict
+        :param data: The decoded response
+        :type ttl: float
+        :param ttl: Overrides the default time to live for this entry
+        """
+        expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[path] = (expires, data)
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, path=None, containing=None):
+        """ Removes cached entries
+
+        :type path: string
+        :param path: Removes this path only
+        :type containing: string
+        :param containing: Removes every path that contains this string
+
+        Every entry is removed when neither argument is given.
+        """
+        with self._lock:
+            if path is not None:
+                self._entries.pop(path, None)
+            elif containing is not None:
+                for key in [key for key in self._entries if containing in key]:
+                    del self._entries[key]
+            else:
+                self._entries.clear()
@@ -0,0 +1,304 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2019 John J. Rofrano <rofrano@gmail.com>
+# All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+ZenHub Command Line
+
+Dumps boards, issues, epics and workspaces of many repositories as
+newline delimited JSON (one JSON object per line) so that large exports can
+be piped straight into tools like ``jq``::
+
+    export ZENHUB_TOKEN=...
+    zenhub board 1234567 7654321 | jq 'select(.estimate.value > 3)'
+    zenhub issues --workers 16 - < repo_ids.txt > issues.ndjson
+
+The repositories are fetched in parallel over a shared connection pool and
+every line is written as soon as its result arrives. The response cache only
+holds a few entries per worker (enough for repository ids that are repeated
+close together), so the memory used does not grow with the size of the export.
+A repository that fails to load, or a word on stdin that is not a repository
+id, is logged and skipped, and the command exits with status 1.
+
+Commands:
+
+    board       one line per issue on the board of each repository
+    issues      one line per issue with the full ZenHub issue data
+    epics       one line per epic in each repository
+    workspaces  one line per workspace that contains each repository
+
+"""
+
+import os
+import sys
+import logging
+import argparse
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+COMMANDS = ('board', 'issues', 'epics', 'workspaces')
+
+# responses cached per worker, repeated ids are usually close together
+CACHE_PER_WORKER = 4
+
+logger = logging.getLogger(__name__)
+
+
+def imap_unordered(executor, func, items, window):
+    """ Maps ``func`` over ``items`` on ``executor`` and yields results as they finish
+
+    At most ``window`` calls are in flight at any time so that a long list of
+    items is never submitted all at once.
+
+    :type executor: :class:`concurrent.futures.Executor`
+    :param executor: The executor to run the calls on
+    :type func: callable
+    :param func: The function to call with each item
+    :type items: iterable
+    :param items: The items to map (may be a generator)
+    :type window: int
+    :param window: The maximum number of calls in flight
+    """
+    items = iter(items)
+    pending = {executor.submit(func, item) for item in islice(items, window)}
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            yield future.result()
+        for item in islice(items, len(done)):
+            pending.add(executor.submit(func, item))
+
+
+def _board_records(zen, repo_id):
+    """ Returns one record per issue on the board of a repository """
+    board = zen.repository(repo_id).board()
+    if board is None:
+        return []
+    return [
+        dict(issue_data, repo_id=repo_id, pipeline_id=pipeline['id'], pipeline_name=pipeline['name'])
+        for pipeline in board.data['pipelines']
+        for issue_data in pipeline['issues']
+    ]
+
+
+def _board_issues(zen, repo_id):
+    """ Returns (repo_id, issue_number) for every issue on the board of a repository """
+    board = zen.repository(repo_id).board()
+    if board is None:
+        return []
+    return [
+        (repo_id, issue_data['issue_number'])
+        for pipeline in board.data['pipelines']
+        for issue_data in pipeline['issues']
+    ]
+
+
+def _issue_records(zen, key):
+    """ Returns the full issue data of a single issue """
+    repo_id, issue_number = key
+    issue = zen.repository(repo_id).issue(issue_number)
+    if issue is None:
+        return []
+    return [dict(issue.data, repo_id=repo_id, issue_number=issue_number)]
+
+
+def _epic_records(zen, repo_id):
+    """ Returns one record per epic in a repository """
+    return [dict(epic.data, repo_id=repo_id) for epic in zen.repository(repo_id).epics()]
+
+
+def _workspace_records(zen, repo_id):
+    """ Returns one record per workspace that contains a repository """
+    return [dict(workspace.data, repo_id=repo_id)
+            for workspace in zen.repository(repo_id).workspaces()]
+
+
+def _guarded(func, zen, errors):
+    """ Wraps ``func`` so that a failing item is logged and skipped """
+    def call(item):
+        try:
+            return func(zen, item)
+        except Exception as error:  # pylint: disable=broad-except
+            logger.error('%s failed: %s', item, error)
+            errors.append(item)
+            return []
+    return call
+
+
+def export(zen, command, repo_ids, workers=8, errors=None):
+    """ Yields the records of an export as they become available
+
+    A repository or issue that fails to load is logged and skipped so that
+    one bad repository does not abort a large export.
+
+    :type zen: :class:`zenhub.ZenHub`
+    :param zen: The client to fetch with
+    :type command: string
+    :param command: One of ``board``, ``issues``, ``epics`` or ``workspaces``
+    :type repo_ids: iterable
+    :param repo_ids: The ids of the repositories to export
+    :type workers: int
+    :param workers: The number of requests to run in parallel
+    :type errors: list
+    :param errors: A list that the items that failed are appended to
+
+    :return: a generator of dicts
+    """
+    errors = [] if errors is None else errors
+    window = workers * 2
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        if command == 'issues':
+            with ThreadPoolExecutor(max_workers=max(1, workers // 4)) as board_executor:
+                boards = imap_unordered(board_executor, _guarded(_board_issues, zen, errors),
+                                        repo_ids, window)
+                keys = (key for keys in boards for key in keys)
+                for records in imap_unordered(executor, _guarded(_issue_records, zen, errors),
+                                              keys, window):
+                    yield from records
+            return
+        func = {
+            'board': _board_records,
+            'epics': _epic_records,
+            'workspaces': _workspace_records,
+        }[command]
+        for records in imap_unordered(executor, _guarded(func, zen, errors), repo_ids, window):
+            yield from records
+
+
+def _repo_ids(values, stdin, errors):
+    """ Yields the repository ids from the arguments, ``-`` reads them from stdin
+
+    A word on stdin that is not a repository id is logged, appended to
+    ``errors`` and skipped.
+    """
+    for value in values:
+        if value != '-':
+            yield value
+            continue
+        for line in stdin:
+            for word in line.split():
+                try:
+                    yield int(word)
+                except ValueError:
+                    logger.error('%r is not a repository id', word)
+                    errors.append(word)
+
+
+def _repo_id(value):
+    """ Parses a repository id argument, ``-`` is kept as it is """
+    if value == '-':
+        return value
+    try:
+        return int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'{value!r} is not a repository id') from None
+
+
+def _positive_int(value):
+    """ Parses an argument that must be a whole number of at least 1 """
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise argparse.ArgumentTypeError(f'{value!r} is not a number of at least 1')
+    return number
+
+
+def _parser():
+    parser = argparse.ArgumentParser(
+        prog='zenhub',
+        description='Export ZenHub data as newline delimited JSON.')
+    parser.add_argument('command', choices=COMMANDS, help='what to export')
+    parser.add_argument('repo_ids', nargs='+', metavar='REPO_ID', type=_repo_id,
+                        help='GitHub repository ids, or - to read them from stdin')
+    parser.add_argument('--token', default=os.environ.get('ZENHUB_TOKEN'),
+                        help='ZenHub API token (default: $ZENHUB_TOKEN)')
+    parser.add_argument('--endpoint', default=os.environ.get('ZENHUB_API_ENDPOINT'),
+                        help='API endpoint for ZenHub Enterprise')
+    parser.add_argument('--workspace', default=os.environ.get('ZENHUB_WORKSPACE'),
+                        help='Workspace id to fetch the boards from (default: $ZENHUB_WORKSPACE)')
+    parser.add_argument('--workers', type=_positive_int, default=8,
+                        help='number of requests to run in parallel (default: 8)')
+    parser.add_argument('--cache-ttl', type=float, default=300.0,
+                        help='seconds to cache GET responses (default: 300)')
+    parser.add_argument('--cache-size', type=int, default=None,
+                        help='GET responses to cache (default: 4 per worker)')
+    parser.add_argument('--codec', default=None,
+                        help='JSON codec: orjson, ujson or json (default: fastest installed)')
+    parser.add_argument('--timeout', type=float, default=30.0,
+                        help='seconds to wait for each response (default: 30)')
+    parser.add_argument('--stats', action='store_true',
+                        help='print the bytes received for every endpoint to stderr')
+    return parser
+
+
+def _print_stats(stats, output):
+    """ Prints the bytes received for every endpoint """
+    for name, counts in sorted(stats.endpoints().items()):
+        output.write('%s: %d requests, %d bytes received, %d bytes decoded\n'
+                     % (name, counts['requests'], counts['wire_bytes'], counts['body_bytes']))
+    totals = stats.totals()
+    output.write('total: %d requests, %d bytes received, %d bytes decoded (%.0f%% saved)\n'
+                 % (totals['requests'], totals['wire_bytes'], totals['body_bytes'],
+                    totals['savings'] * 100))
+
+
+def main(argv=None, stdin=None, stdout=None):
+    """ Entry point of the ``zenhub`` command """
+    from .zenhub import ZenHub
+    from .cache import ResponseCache
+    from .transport import RequestsTransport
+
+    stdin = stdin or sys.stdin
+    stdout = stdout or sys.stdout
+    parser = _parser()
+    args = parser.parse_args(argv)
+    if not args.token:
+        parser.error('a token is required, use --token or set ZENHUB_TOKEN')
+
+    zen = ZenHub(args.token,
+                 api_endpoint=args.endpoint or ZenHub.DEFAULT_API_ENDPOINT,
+                 transport=RequestsTransport.pooled(),
+                 cache=ResponseCache(ttl=args.cache_ttl,
+                                     maxsize=args.cache_size or args.workers * CACHE_PER_WORKER),
+                 codec=args.codec,
+                 default_workspace=args.workspace,
+                 timeout=(min(ZenHub.DEFAULT_TIMEOUT[0], args.timeout), args.timeout))
+    errors = []
+    records = export(zen, args.command, _repo_ids(args.repo_ids, stdin, errors),
+                     args.workers, errors)
+    try:
+        for record in records:
+            stdout.write(zen.codec.dumps(record))
+            stdout.write('\n')
+        stdout.flush()
+    except BrokenPipeError:
+        # the reader went away (e.g., ``| head``), point stdout at devnull so
+        # that flushing it at exit does not fail again
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    except KeyboardInterrupt:
+        return 130
+    finally:
+        zen.transport.close()
+        if args.stats:
+            _print_stats(zen.transport.stats, sys.stderr)
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
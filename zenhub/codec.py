@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2019 John J. Rofrano <rofrano@gmail.com>
+# All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+JSON Codecs
+
+A codec decodes the JSON responses of the ZenHub API and encodes request
+bodies and the output of ``str()``. The fastest codec that is installed is
+used unless one is chosen explicitly:
+
+    - ``orjson``  (``pip install orjson``)
+    - ``ujson``   (``pip install ujson``)
+    - ``json``    the Python standard library (always available)
+
+Example::
+
+    zen = ZenHub('access_token')                 # fastest available
+    zen = ZenHub('access_token', codec='json')   # always the standard library
+
+"""
+
+import json
+from importlib import import_module
+
+
+class JSONCodec:
+    """ JSON codec that uses the Python standard library """
+
+    name = 'json'
+
+    def __repr__(self):
+        return '<%s %r>' % (type(self).__name__, self.name)
+
+    def loads(self, data):
+        """ Decodes a JSON document
+
+        :type data: bytes or str
+        :param data: The JSON document
+
+        :return: The decoded value
+        """
+        return json.loads(data)
+
+    def dumps(self, value, indent=False):
+        """ Encodes a value as a JSON string
+
+        :param value: The value to encode
+        :type indent: bool
+        :param indent: Pretty print the output
+
+        :rtype: str
+        """
+        if indent:
+            return json.dumps(value, indent=4)
+        return json.dumps(value, separators=(',', ':'))
+
+    def encode(self, value):
+        """ Encodes a value as a compact JSON request body
+
+        :rtype: bytes
+        """
+        return self.dumps(value).encode('utf-8')
+
+    def decode_response(self, response):
+        """ Decodes the body of an http response
+
+        :type response: :class:`requests.Response`
+        :param response: The response to decode
+        """
+        return response.json()
+
+
+class OrjsonCodec(JSONCodec):
+    """ JSON codec that uses `orjson <https://github.com/ijl/orjson>`_ """
+
+    name = 'orjson'
+
+    def __init__(self):
+        self._orjson = import_module('orjson')
+
+    def loads(self, data):
+        return self._orjson.loads(data)
+
+    def dumps(self, value, indent=False):
+        return self.encode(value, indent).decode('utf-8')
+
+    def encode(self, value, indent=False):
+        option = self._orjson.OPT_INDENT_2 if indent else 0
+        return self._orjson.dumps(value, option=option)
+
+    def decode_response(self, response):
+        return self.loads(response.content)
+
+
+class UjsonCodec(JSONCodec):
+    """ JSON codec that uses `ujson <https://github.com/ultrajson/ultrajson>`_ """
+
+    name = 'ujson'
+
+    def __init__(self):
+        self._ujson = import_module('ujson')
+
+    def loads(self, data):
+        return self._ujson.loads(data)
+
+    def dumps(self, value, indent=False):
+        if indent:
+            return self._ujson.dumps(value, indent=4, escape_forward_slashes=False)
+        return self._ujson.dumps(value, escape_forward_slashes=False)
+
+    def decode_response(self, response):
+        return self.loads(response.content)
+
+
+# in order of preference
+CODECS = {
+    OrjsonCodec.name: OrjsonCodec,
+    UjsonCodec.name: UjsonCodec,
+    JSONCodec.name: JSONCodec,
+}
+
+
+def available():
+    """ Returns the names of the codecs that are installed, fastest first
+
+    :rtype: list
+    """
+    names = []
+    for name, codec_class in CODECS.items():
+        try:
+            codec_class()
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+
+def get_codec(codec=None):
+    """ Returns a codec
+
+    :type codec: string or codec
+    :param codec: The name of a codec, a codec instance, or ``None`` for the
+                  fastest one that is installed
+
+    :raise ValueError: the codec name is unknown
+    :raise ImportError: the library of the codec is not installed
+    """
+    if codec is None:
+        return CODECS[available()[0]]()
+    if not isinstance(codec, str):
+        return codec
+    try:
+        return CODECS[codec]()
+    except KeyError:
+        raise ValueError(f'unknown codec {codec!r}, choose from {", ".join(CODECS)}') from None
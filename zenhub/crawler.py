@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2019 John J. Rofrano <rofrano@gmail.com>
+# All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Sharded Crawler
+
+Exports the boards, epics and issue details of many repositories using a
+pool of processes. Each process parses the JSON of its own repositories, so
+large organization-wide exports are not limited by a single CPU. All of the
+processes share one requests per minute budget through a
+:class:`SharedRateLimiter <zenhub.ratelimit.SharedRateLimiter>`.
+
+Results are yielded to the parent as soon as a repository is done. When a
+``checkpoint`` file is given, the id of every repository that was yielded is
+appended to it and a crawl that is started again with the same file skips
+those repositories, so an interrupted crawl can be resumed.
+
+Example::
+
+    crawler = Crawler('access_token', processes=8, checkpoint='crawl.checkpoint')
+    with open('export.ndjson', 'a') as output:
+        for result in crawler.crawl(repo_ids):
+            output.write(json.dumps(result) + '\\n')
+
+"""
+
+import os
+import json
+import logging
+import multiprocessing
+from .zenhub import ZenHub
+from .ratelimit import SharedRateLimiter
+from .transport import RequestsTransport
+
+logger = logging.getLogger(__name__)
+
+# the client of a worker process (set by _init_worker)
+_worker_zenhub = None
+
+
+def _init_worker(api_token, api_endpoint, rate_limiter, transport_factory, workspace_id=None):
+    """ Creates the client of a worker process """
+    global _worker_zenhub
+    transport = transport_factory() if transport_factory else RequestsTransport()
+    _worker_zenhub = ZenHub(api_token, api_endpoint=api_endpoint, transport=transport,
+                            rate_limiter=rate_limiter, default_workspace=workspace_id)
+
+
+def crawl_repository(zen, repo_id, issues=True, epics=True):
+    """ Fetches the board, issue details and epics of a repository
+
+    The board is found like :meth:`Repository.board <zenhub.Repository.board>`
+    does, in the Workspace the client resolves for the repository.
+
+    :type zen: :class:`ZenHub <zenhub.ZenHub>`
+    :param zen: The client to use
+    :type repo_id: int
+    :param repo_id: The repository to crawl
+    :type issues: bool
+    :param issues: Fetch the details of every issue on the board
+    :type epics: bool
+    :param epics: Fetch the details of every epic
+
+    :return: ``{'repo_id': ..., 'board': ..., 'issues': [...], 'epics': [...]}``
+    :rtype: dict
+    """
+    repo = zen.repository(repo_id)
+    board = repo.board()
+    board_data = board.data if board is not None else {'pipelines': []}
+    result = {'repo_id': repo_id, 'board': board_data, 'issues': [], 'epics': []}
+    if issues:
+        for pipeline in board_data['pipelines']:
+            for issue_data in pipeline['issues']:
+                number = issue_data['issue_number']
+                issue = repo.issue(number)
+                if issue is not None:
+                    result['issues'].append(dict(issue.data, issue_number=number))
+    if epics:
+        for summary in repo.epics():
+            epic = repo.epic(summary.id)
+            if epic is not None:
+                result['epics'].append(dict(epic.data, issue_number=epic.id))
+    return result
+
+
+def _crawl(task):
+    """ Crawls one repository in a worker process """
+    repo_id, issues, epics = task
+    try:
+        return crawl_repository(_worker_zenhub, repo_id, issues=issues, epics=epics)
+    except Exception as error:  # pylint: disable=broad-except
+        return {'repo_id': repo_id, 'error': f'{type(error).__name__}: {error}'}
+
+
+class Crawler:
+    """ Crawls many repositories with a pool of processes
+
+    :type api_token: str
+    :param api_token: The ZenHub API token
+    :type processes: int
+    :param processes: The number of worker processes (defaults to the number of CPUs)
+    :type requests_per_minute: float
+    :param requests_per_minute: The budget shared by all of the processes
+    :type checkpoint: str
+    :param checkpoint: A file that records the repositories already crawled
+    :type transport_factory: callable
+    :param transport_factory: Returns the transport of each worker process
+                              (must be picklable, defaults to :class:`RequestsTransport`)
+    :type workspace_id: str
+    :param workspace_id: The Workspace to fetch the boards from (see
+                         :meth:`ZenHub.workspace_of <zenhub.ZenHub.workspace_of>`)
+    :type context: :mod:`multiprocessing` context
+    :param context: The context used to start the processes
+    """
+
+    def __init__(self, api_token, api_endpoint=ZenHub.DEFAULT_API_ENDPOINT, processes=None,
+                 requests_per_minute=100, checkpoint=None, transport_factory=None, context=None,
+                 workspace_id=None):
+        self.api_token = api_token
+        self.api_endpoint = api_endpoint
+        self.processes = processes or os.cpu_count() or 1
+        self.checkpoint = checkpoint
+        self.transport_factory = transport_factory
+        self.workspace_id = workspace_id
+        self.context = context or multiprocessing.get_context()
+        self.rate_limiter = SharedRateLimiter(requests_per_minute, context=self.context)
+        self.stats = {'crawled': 0, 'failed': 0, 'skipped': 0}
+
+    def __repr__(self):
+        return '<%s %r>' % (type(self).__name__, self.processes)
+
+    def completed(self):
+        """ Returns the ids of the repositories recorded in the checkpoint file
+
+        :rtype: set
+        """
+        done = set()
+        if self.checkpoint and os.path.exists(self.checkpoint):
+            with open(self.checkpoint) as checkpoint:
+                for line in checkpoint:
+                    try:
+                        done.add(json.loads(line)['repo_id'])
+                    except (ValueError, KeyError):
+                        # a line cut short by a crash
+                        continue
+        return done
+
+    def crawl(self, repo_ids, issues=True, epics=True):
+        """ Crawls repositories and yields the result of each as soon as it is ready
+
+        A repository is recorded in the checkpoint file once its result has
+        been consumed. A repository that failed is yielded as
+        ``{'repo_id': ..., 'error': ...}`` and is not recorded, so it is
+        crawled again when the crawl is resumed.
+
+        :type repo_ids: iterable
+        :param repo_ids: The ids of the repositories to crawl
+        :type issues: bool
+        :param issues: Fetch the details of every issue on the boards
+        :type epics: bool
+        :param epics: Fetch the details of every epic
+
+        :return: a generator of results as returned by :func:`crawl_repository`
+        """
+        done = self.completed()
+        tasks = []
+        for repo_id in repo_ids:
+            if repo_id in done:
+                self.stats['skipped'] += 1
+            else:
+                tasks.append((repo_id, issues, epics))
+        if not tasks:
+            return
+        checkpoint = open(self.checkpoint, 'a') if self.checkpoint else None
+        initargs = (self.api_token, self.api_endpoint, self.rate_limiter, self.transport_factory,
+                    self.workspace_id)
+        try:
+            with self.context.Pool(min(self.processes, len(tasks)), _init_worker, initargs) as pool:
+                for result in pool.imap_unordered(_crawl, tasks):
+                    if 'error' in result:
+                        self.stats['failed'] += 1
+                        logger.warning('Repository %s failed: %s', result['repo_id'], result['error'])
+                        yield result
+                        continue
+                    self.stats['crawled'] += 1
+                    yield result
+                    if checkpoint:
+                        checkpoint.write(json.dumps({'repo_id': result['repo_id']}) + '\n')
+                        checkpoint.flush()
+        finally:
+            if checkpoint:
+                checkpoint.close()
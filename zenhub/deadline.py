@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2019 John J. Rofrano <rofrano@gmail.com>
+# All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Deadlines
+
+A deadline bounds the total time of an operation that sends many requests,
+such as loading a board and then the details of every issue on it::
+
+    with zen.deadline(5.0):
+        board = repo.board()
+        issues = board.issue_details()
+
+The deadline is kept in a :mod:`contextvars` variable, so it applies to every
+request sent by the code inside the ``with`` block, including the requests
+that :meth:`ZenHub.map <zenhub.ZenHub.map>` sends from other threads. The
+timeouts of each request are shortened to the time that is left, and a
+request that would start after the deadline raises :class:`DeadlineExceeded`.
+Nested deadlines can only shorten the time that is left.
+"""
+
+import time
+import contextvars
+from contextlib import contextmanager
+
+_current = contextvars.ContextVar('zenhub_deadline', default=None)
+
+
+class DeadlineExceeded(Exception):
+    """ The deadline of an operation expired before it was done """
+
+
+def expires():
+    """ Returns the :func:`time.monotonic` time the current deadline expires or ``None`` """
+    return _current.get()
+
+
+def remaining():
+    """ Returns the seconds left before the current deadline or ``None`` if there is none
+
+    :rtype: float or None
+    """
+    expires_at = _current.get()
+    if expires_at is None:
+        return None
+    return max(0.0, expires_at - time.monotonic())
+
+
+def check():
+    """ Raises :class:`DeadlineExceeded` if the current deadline has expired
+
+    :raise DeadlineExceeded: the deadline has expired
+    """
+    if remaining() == 0.0:
+        raise DeadlineExceeded('deadline exceeded')
+
+
+def bound(timeout):
+    """ Shortens a ``(connect, read)`` timeout to the time left before the deadline
+
+    :type timeout: tuple
+    :param timeout: The ``(connect, read)`` timeouts in seconds or ``None``
+
+    :return: the shortened timeout
+    :rtype: tuple or None
+    """
+    left = remaining()
+    if left is None:
+        return timeout
+    if timeout is None:
+        return (left, left)
+    return tuple(left if value is None else min(value, left) for value in timeout)
+
+
+@contextmanager
+def deadline(seconds):
+    """ Runs the body of a ``with`` statement under a deadline
+
+    :type seconds: float
+    :param seconds: The seconds the body may take
+    """
+    expires_at = time.monotonic() + seconds
+    outer = _current.get()
+    if outer is not None:
+        expires_at = min(expires_at, outer)
+    token = _current.set(expires_at)
+    try:
+        yield
+    finally:
+        _current.reset(token)
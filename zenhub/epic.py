@@ -36,8 +36,11 @@ This class implements the following ZenHub REST calls:
 Based on ZenHub API @ https://github.com/ZenHubIO/API
 
 """
-import json
-from .issue import Issue
+import threading
+from .profiling import profiled
+from .cache import is_stale
+from .issue import Issue, EPIC_FIELDS
+from .projection import issue_fields, project_epic
 
 class Epic:
     """
@@ -45,16 +48,100 @@ class Epic:
     larger than a single User Story
     """
 
+    # makes refresh() atomic when the same Epic is updated from several threads
+    _refresh_lock = threading.Lock()
+
     def __init__(self, epic_data, epic_id, repo):
         self.repo = repo
         self.id = epic_id
-        self.data = epic_data
+        self._data = epic_data
+        self._snapshot = None
+        # the fields the issues were projected to, see zenhub.projection
+        self.fields = None
+        # True when the data is a last good response served while the API failed
+        self.stale = False
+        # True for an Epic loaded from a snapshot, its issues are not shared
+        self.loaded = False
+
+    def refresh(self, epic_data):
+        """ Updates this Epic with newer data
+
+        The fields in ``epic_data`` replace the ones this Epic already has
+        and every other field is kept.
+
+        :type epic_data: dict
+        :param epic_data: The newer epic data
+        """
+        with Epic._refresh_lock:
+            self._data = dict(self.data or {}, **epic_data)
+
+    @staticmethod
+    def from_data(epic_data, epic_id, repo, fields=None):
+        """ Returns the one Epic object for an epic in a repository
+
+        If the client already holds an Epic for this repository and id it is
+        refreshed with ``epic_data`` and returned, otherwise a new Epic is
+        created.
+
+        :type epic_data: dict
+        :param epic_data: The epic data
+        :type epic_id: int
+        :param epic_id: The ID (issue number) of the Epic
+        :type repo: :class:`zenhub.Repository`
+        :param repo: The repository the Epic is in
+        :type fields: list
+        :param fields: The fields the issues were projected to, an Epic with
+                       projected issues is not shared (see :meth:`Issue.from_data
+                       <zenhub.Issue.from_data>`)
+
+        :rtype: :class:`zenhub.Epic`
+        """
+        if fields is not None:
+            epic = Epic(epic_data, epic_id, repo)
+            epic.fields = fields
+            return epic
+        return repo.zenhub.identity.intern(
+            ('epic', repo.id, epic_id),
+            lambda: Epic(epic_data, epic_id, repo),
+            lambda epic: epic.refresh(epic_data)
+        )
 
     def __repr__(self):
         return '<%s %r>' % (type(self).__name__, self.id)
 
     def __str__(self):
-        return '<%s %r>\n' % (type(self).__name__, self.id) + json.dumps(self.data, indent=4)
+        return ('<%s %r>\n' % (type(self).__name__, self.id)
+                + self.repo.zenhub.codec.dumps(self.data, indent=True))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """ Unmaps the snapshot file this Epic was loaded from, if any
+
+        The data that was read before stays available, the rest is not.
+        """
+        if self._snapshot is not None:
+            self._snapshot.close()
+            self._snapshot = None
+
+    @property
+    def data(self):
+        """ The epic data as returned by the ZenHub API
+
+        An epic loaded from a snapshot reads all of its issues the first
+        time this is accessed.
+        """
+        if self._data is None and self._snapshot is not None:
+            self._data = dict(self._snapshot.meta['data'], issues=self._snapshot.group(0)['issues'])
+        return self._data
+
+    @data.setter
+    def data(self, value):
+        self._data = value
 
     @property
     def estimate(self):
@@ -98,13 +185,16 @@ class Epic:
 
 
     @staticmethod
-    def find(epic_id, repo):
+    @profiled
+    def find(epic_id, repo, fields=None):
         """ Finds an Epic given it's ID
 
         :type epic_id: int
         :param epic_id: The ID of the Epic you want to retrieve
         :type repo: :class:`zenhub.Repository`
         :param repo: The repository the Epic is in
+        :type fields: list
+        :param fields: Only keep these fields of the Epic's issues (keeps all if ``None``)
 
         :calls: `GET /p1/repositories/:repo_id/epics/:epic_id <https://github.com/ZenHubIO/API#get-epic-data>`_
 
@@ -114,9 +204,79 @@ class Epic:
         """
         data = repo.zenhub.get(f'/p1/repositories/{repo.id}/epics/{epic_id}')
         if data:
-            return Epic(data, epic_id, repo)
+            epic = Epic.from_data(project_epic(data, issue_fields(fields)), epic_id, repo, fields)
+            epic.stale = is_stale(data)
+            return epic
         return None
 
+    def issue(self, issue_number, repo_id=None):
+        """ Returns a single Issue in this Epic or ``None`` if not found
+
+        An epic loaded from a snapshot finds the issue without reading the
+        rest of the epic.
+
+        :type issue_number: int
+        :param issue_number: The number of the Issue you want to return
+        :type repo_id: int
+        :param repo_id: The repository of the Issue (the first match if ``None``)
+
+        :return: The Issue or ``None`` if not found
+        :rtype: :class:`zenhub.Issue` or ``None``
+
+        """
+        if self._data is None and self._snapshot is not None:
+            found = self._snapshot.lookup(issue_number, repo_id)
+            issue_data = found[1] if found else None
+        else:
+            issue_data = next((
+                issue_data for issue_data in self.issues
+                if issue_data['issue_number'] == issue_number
+                and (repo_id is None or issue_data.get('repo_id') == repo_id)
+            ), None)
+        if issue_data is None:
+            return None
+        repo = self.repo
+        if issue_data.get('repo_id', repo.id) != repo.id:
+            repo = repo.zenhub.repository(issue_data['repo_id'])
+        return Issue.from_data(issue_data, issue_number, repo,
+                               shared=self.fields is None and not self.loaded, owns=EPIC_FIELDS)
+
+    def save(self, path):
+        """ Saves this Epic to a binary snapshot file
+
+        :type path: string
+        :param path: The file name of the snapshot
+
+        """
+        data = {key: value for key, value in self.data.items() if key != 'issues'}
+        from . import snapshot
+        snapshot.write(path, snapshot.KIND_EPIC, {'epic_id': self.id, 'data': data},
+                       [({}, self.issues)], self.repo.id)
+
+    @staticmethod
+    def load(path, repo):
+        """ Loads an Epic from a binary snapshot file
+
+        The file is memory mapped and only read as the data is needed. The
+        Issues of the epic are not the shared ones of the client.
+
+        :type path: string
+        :param path: The file name of the snapshot
+        :type repo: :class:`zenhub.Repository`
+        :param repo: The repository the Epic is in
+
+        :return: The Epic that was saved
+        :rtype: :class:`zenhub.Epic`
+
+        :raise zenhub.snapshot.SnapshotError: the file is not an epic snapshot
+        """
+        from . import snapshot
+        epic_snapshot = snapshot.load(path, snapshot.KIND_EPIC)
+        epic = Epic(None, epic_snapshot.meta['epic_id'], repo)
+        epic._snapshot = epic_snapshot
+        epic.loaded = True
+        return epic
+
 
     # def issues(self):
     #     return [
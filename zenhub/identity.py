@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2019 John J. Rofrano <rofrano@gmail.com>
+# All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Identity Map
+
+Every :class:`ZenHub <zenhub.ZenHub>` client keeps an identity map so that a
+repository, issue or epic is represented by one shared object no matter how
+it was retrieved. When the same issue is returned again (from a board, an
+epic or ``Issue.find``) the existing object is refreshed with the new data
+instead of creating a copy that could drift apart. Each source replaces the
+fields it owns, so a board that no longer lists an estimate clears it.
+
+Only weak references are kept, so objects that are no longer used anywhere
+else are garbage collected as usual.
+"""
+
+import threading
+import weakref
+
+
+class IdentityMap:
+    """ Maps keys such as ``('issue', repo_id, number)`` to live objects """
+
+    def __init__(self):
+        self._objects = weakref.WeakValueDictionary()
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._objects)
+
+    def __contains__(self, key):
+        return key in self._objects
+
+    def keys(self):
+        """ Returns the keys of the live objects """
+        with self._lock:
+            return list(self._objects.keys())
+
+    def get(self, key):
+        """ Returns the object for a key or ``None`` if there is none """
+        return self._objects.get(key)
+
+    def intern(self, key, create, refresh=None):
+        """ Returns the canonical object for a key
+
+        :type key: tuple
+        :param key: The identity of the object
+        :type create: callable
+        :param create: Called without arguments to create the object when
+                       there is none for this key yet
+        :type refresh: callable
+        :param refresh: Called with the existing object to update it with new data
+
+        :return: the canonical object
+        """
+        with self._lock:
+            existing = self._objects.get(key)
+            if existing is None:
+                existing = create()
+                self._objects[key] = existing
+            elif refresh is not None:
+                refresh(existing)
+            return existing
+
+    def remove(self, key):
+        """ Forgets the object for a key """
+        with self._lock:
+            self._objects.pop(key, None)
+
+    def clear(self):
+        """ Forgets every object """
+        with self._lock:
+            self._objects.clear()
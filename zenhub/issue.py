@@ -19,7 +19,37 @@ ZebHub Issue Module
 
 Part of the PyZenHub package
 """
-import json
+import threading
+from .profiling import profiled
+from .projection import issue_fields, project_issue
+
+# The fields each source of issue data owns. Newer data from a source replaces
+# all of its fields, so one that is left out (e.g. an estimate that was
+# cleared) is removed, while the fields only other sources have are kept.
+ISSUE_FIELDS = ('estimate', 'plus_ones', 'pipeline', 'pipelines', 'is_epic')
+BOARD_FIELDS = ('estimate', 'position', 'is_epic', 'pipeline')
+EPIC_FIELDS = ('estimate', 'pipeline', 'pipelines', 'is_epic')
+
+
+def board_issue(issue_data, pipeline, workspace_id=None):
+    """ Returns the data of an issue listed on a board, with its pipeline
+
+    Board data tells the pipeline of an issue only by where it is listed.
+
+    :type issue_data: dict
+    :param issue_data: The issue as listed in the board data
+    :type pipeline: dict
+    :param pipeline: The data of the pipeline that lists the issue
+    :type workspace_id: string
+    :param workspace_id: The Workspace of the board, if known
+
+    :rtype: dict
+    """
+    listed_in = {'name': pipeline.get('name'), 'pipeline_id': pipeline.get('id')}
+    if workspace_id:
+        listed_in['workspace_id'] = workspace_id
+    return dict(issue_data, pipeline=listed_in)
+
 
 class Issue:
     """ Issue holds additional attributes that ZenHub adds to Github Issues
@@ -44,29 +74,118 @@ class Issue:
 
     """
 
+    # makes refresh() atomic when the same Issue is updated from several threads
+    _refresh_lock = threading.Lock()
+
     def __init__(self, issue_data, issue_number, repo):
-        self.data = issue_data
         self._number = issue_number
         self.repo = repo
+        self._set_data(issue_data)
+
+    def _set_data(self, issue_data):
+        """ Sets the data and the attributes that are derived from it """
+        self.data = issue_data
         self._estimate = issue_data.get('estimate')
         self.pipeline = issue_data.get('pipeline')
         self.is_epic = issue_data['is_epic']
         self.position = issue_data.get('position')
 
+    def refresh(self, issue_data, owns=()):
+        """ Updates this Issue with newer data
+
+        The fields in ``issue_data`` replace the ones this Issue already has,
+        the fields in ``owns`` that ``issue_data`` leaves out are removed and
+        every other field is kept. The dict that was passed in is not
+        modified or kept.
+
+        :type issue_data: dict
+        :param issue_data: The newer issue data
+        :type owns: tuple
+        :param owns: The fields of the source of the data, e.g. :data:`BOARD_FIELDS`
+        """
+        with Issue._refresh_lock:
+            data = {key: value for key, value in self.data.items() if key not in owns}
+            data.update(issue_data)
+            self._set_data(data)
+
+    @staticmethod
+    def from_data(issue_data, issue_number, repo, shared=True, owns=()):
+        """ Returns the one Issue object for an issue number in a repository
+
+        If the client already holds an Issue for this repository and number it
+        is refreshed with ``issue_data`` and returned, otherwise a new Issue
+        is created.
+
+        Projected data (see :mod:`zenhub.projection`) is not shared, since
+        merging it would mix fields from different responses: pass
+        ``shared=False`` to get an Issue of its own that leaves the shared
+        one alone.
+
+        :type issue_data: dict
+        :param issue_data: The issue data
+        :type issue_number: int
+        :param issue_number: The number of the Issue
+        :type repo: :class:`zenhub.Repository`
+        :param repo: The repository containing the Issue
+        :type shared: bool
+        :param shared: Use the Issue held by the client
+        :type owns: tuple
+        :param owns: The fields of the source of the data (see :meth:`refresh`)
+
+        :rtype: :class:`zenhub.Issue`
+        """
+        if not shared:
+            return Issue(issue_data, issue_number, repo)
+        return repo.zenhub.identity.intern(
+            ('issue', repo.id, issue_number),
+            lambda: Issue(issue_data, issue_number, repo),
+            lambda issue: issue.refresh(issue_data, owns)
+        )
+
+    @staticmethod
+    def from_board(issue_data, pipeline, repo, board=None):
+        """ Returns the Issue for an issue listed in the data of a board
+
+        The shared Issue takes the estimate, position and pipeline from the
+        board. The Issues of a projected board or of a board loaded from a
+        snapshot are not shared.
+
+        :type issue_data: dict
+        :param issue_data: The issue as listed in the board data
+        :type pipeline: dict
+        :param pipeline: The data of the pipeline that lists the issue
+        :type repo: :class:`zenhub.Repository`
+        :param repo: The repository containing the Issue
+        :type board: :class:`zenhub.Board`
+        :param board: The Board the data is from, if any
+
+        :rtype: :class:`zenhub.Issue`
+        """
+        issue_number = issue_data['issue_number']
+        if board is not None and not board.shares_issues:
+            return Issue(issue_data, issue_number, repo)
+        workspace_id = board.workspace_id if board is not None else None
+        return Issue.from_data(board_issue(issue_data, pipeline, workspace_id), issue_number,
+                               repo, owns=BOARD_FIELDS)
+
     def __repr__(self):
         return '<%s %r>' % (type(self).__name__, self.number)
 
     def __str__(self):
-        return '<%s %r>\n' % (type(self).__name__, self.number) + json.dumps(self.data, indent=4)
+        return ('<%s %r>\n' % (type(self).__name__, self.number)
+                + self.repo.zenhub.codec.dumps(self.data, indent=True))
 
     @staticmethod
-    def find(issue_number, repo):
+    @profiled
+    def find(issue_number, repo, fields=None):
         """ Get Issue Data
 
         :type issue_number: int
         :param issue_number: The number of the Issue you want to retrieve
         :type repo: :class:`zenhub.Repository`
         :param repo: The repository containing the Issue
+        :type fields: list
+        :param fields: Only keep these fields of the Issue (keeps all if ``None``)
 
         :calls: `GET /p1/repositories/:repo_id/issues/:issue_number <https://github.com/ZenHubIO/API#get-issue-data>`_
 
@@ -76,7 +195,8 @@ class Issue:
         """
         data = repo.zenhub.get(f"/p1/repositories/{repo.id}/issues/{issue_number}")
         if data:
-            return Issue(data, issue_number, repo)
+            return Issue.from_data(project_issue(data, issue_fields(fields)), issue_number, repo,
+                                   shared=fields is None, owns=ISSUE_FIELDS)
         return None
 
     @property
@@ -123,8 +243,9 @@ class Issue:
             f'/p1/repositories/{self.repo.id}/issues/{self.number}/estimate',
             {"estimate": value}
         )
-        self._estimate = {'value': value}
+        self.refresh({'estimate': {'value': value}})
 
+    @profiled
     def events(self):
         """ Returns issue events, sorted by creation time, most recent first.
 
@@ -136,21 +257,42 @@ class Issue:
         """
         return self.repo.zenhub.get(f'/p1/repositories/{self.repo.id}/issues/{self.number}/events')
 
-    def move_to(self, pipeline_id, position='top'):
-        """ Move an Issue Between Pipelines in the oldest Workspace
+    @profiled
+    def move_to(self, pipeline_id, position='top', workspace_id=None):
+        """ Move an Issue Between Pipelines
+
+        The issue is moved in the Workspace the client resolves for the
+        repository (see :meth:`ZenHub.workspace_of <zenhub.ZenHub.workspace_of>`)
+        unless a ``workspace_id`` is given, or else in the oldest Workspace.
 
         :type pipeline_id: int
         :param pipeline_id: The ID of the pipeline you want to move the Issue to
         :type position: str
         :param position: The position as an int (0, 1, 2) or 'top' or 'bottom'
+        :type workspace_id: string
+        :param workspace_id: The Workspace to move the Issue in
 
-        :calls: `POST /p1/repositories/:repo_id/issues/:issue_number/moves <https://github.com/ZenHubIO/API#move-an-issue-between-pipelines-in-the-oldest-workspace>`_
+        :calls: `POST /p2/workspaces/:workspace_id/repositories/:repo_id/issues/:issue_number/moves <https://github.com/ZenHubIO/API#move-an-issue-between-pipelines>`_
+                or `POST /p1/repositories/:repo_id/issues/:issue_number/moves <https://github.com/ZenHubIO/API#move-an-issue-between-pipelines-in-the-oldest-workspace>`_
+                when the Workspace is not known
 
         """
-        return self.repo.zenhub.post(
-            f'/p1/repositories/{self.repo.id}/issues/{self.number}/moves',
+        workspace_id = workspace_id or self.repo.zenhub.workspace_of(self.repo.id)
+        path = f'/p1/repositories/{self.repo.id}/issues/{self.number}/moves'
+        if workspace_id:
+            path = f'/p2/workspaces/{workspace_id}' + path[len('/p1'):]
+        result = self.repo.zenhub.post(
+            path,
             {
                 "pipeline_id": pipeline_id,
                 "position": position
             }
         )
+        pipeline = dict(self.pipeline or {}, pipeline_id=pipeline_id)
+        if self.pipeline and self.pipeline.get('pipeline_id') != pipeline_id:
+            pipeline.pop('name', None)
+        self.refresh({
+            'pipeline': pipeline,
+            'position': position if isinstance(position, int) else None,
+        })
+        return result
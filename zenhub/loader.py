@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2019 John J. Rofrano <rofrano@gmail.com>
+# All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Board Loader
+
+A board only lists the ``issue_number``, ``is_epic`` and ``position`` of
+its issues, so the estimates and pipelines of the issues take one request
+per issue. A :class:`BoardLoader` fetches and decodes the whole board
+first, then fetches the details of its issues, pipeline by pipeline, and
+hands out each hydrated Issue as soon as its details arrive. At most
+``window`` requests are queued at once and ``workers`` run at a time.
+
+The total time is about the same as :meth:`Board.issue_details
+<zenhub.Board.issue_details>`, both are bound by the issue requests; what
+the loader shortens is the time until the first Issue can be used.
+
+Example::
+
+    loader = BoardLoader(repo, workers=16)
+    for issue in loader.issues():
+        print(issue.number, issue.estimate)     # as soon as each one arrives
+    board = loader.board                        # every issue has its details
+
+    board = repo.board(details=True)            # the same, all at once
+
+"""
+
+import time
+import contextvars
+from . import deadline as deadlines
+from .deadline import DeadlineExceeded
+from .board import Board
+from .issue import Issue, BOARD_FIELDS, ISSUE_FIELDS
+from .profiling import profiled
+from .projection import issue_fields, project_issue
+
+
+class BoardLoader:
+    """ Loads a Board with the details of all of its issues
+
+    :type repo: :class:`zenhub.Repository`
+    :param repo: The repository of the board
+    :type fields: list
+    :param fields: Only keep these fields of each issue (keeps all if ``None``)
+    :type workspace_id: string
+    :param workspace_id: The Workspace of the board (see :meth:`Board.find <zenhub.Board.find>`)
+    :type workers: int
+    :param workers: The number of requests to send at once
+    :type window: int
+    :param window: The maximum number of requests queued at once (twice ``workers`` by default)
+    """
+
+    def __init__(self, repo, fields=None, workspace_id=None, workers=8, window=None):
+        self.repo = repo
+        self.fields = fields
+        self.workspace_id = workspace_id
+        self.workers = workers
+        self.window = window or workers * 2
+        self.board = None
+        self.hydrated = 0
+        # seconds from the start of the load to the first issue and to the end
+        self.first_issue = None
+        self.elapsed = None
+
+    def __repr__(self):
+        return '<%s %r>' % (type(self).__name__, self.repo.id)
+
+    def _fetch(self, issue_number):
+        """ Returns the projected details of an issue or ``None`` if not found """
+        data = self.repo.zenhub.get(f'/p1/repositories/{self.repo.id}/issues/{issue_number}')
+        return project_issue(data, issue_fields(self.fields)) if data else None
+
+    def issues(self):
+        """ Fetches the board and yields its Issues as their details arrive
+
+        The details are merged into the issue data of :attr:`board`, which
+        is copied first so the cached responses are left alone. Issues
+        that are not found keep the data of the board and are not yielded.
+        Under a deadline (see :meth:`ZenHub.deadline <zenhub.ZenHub.deadline>`)
+        the loading stops when the deadline expires.
+
+        :calls: `GET /p1/repositories/:repo_id/issues/:issue_number <https://github.com/ZenHubIO/API#get-issue-data>`_
+                for every issue
+
+        :return: a generator of hydrated :class:`Issues <zenhub.Issue>`
+        """
+        from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+        started = time.perf_counter()
+        self.board = Board.find(self.repo, fields=self.fields, workspace_id=self.workspace_id)
+        if self.board is None:
+            self.elapsed = time.perf_counter() - started
+            return
+        # the board data may be shared with the response cache
+        self.board._own()  # pylint: disable=protected-access
+        entries = (issue_data for pipeline in self.board.data['pipelines']
+                   for issue_data in pipeline['issues'])
+        executor = ThreadPoolExecutor(max_workers=self.workers)
+        pending = {}
+
+        def submit(count):
+            for issue_data in entries:
+                future = executor.submit(contextvars.copy_context().run, self._fetch,
+                                         issue_data['issue_number'])
+                pending[future] = issue_data
+                count -= 1
+                if not count:
+                    return
+
+        try:
+            submit(self.window)
+            while pending:
+                done, _ = wait(pending, timeout=deadlines.remaining(),
+                               return_when=FIRST_COMPLETED)
+                if not done:
+                    return
+                for future in done:
+                    issue_data = pending.pop(future)
+                    try:
+                        details = future.result()
+                    except DeadlineExceeded:
+                        return
+                    if details is None:
+                        continue
+                    issue_data.update(details)
+                    self.hydrated += 1
+                    if self.first_issue is None:
+                        self.first_issue = time.perf_counter() - started
+                    yield Issue.from_data(issue_data, issue_data['issue_number'], self.repo,
+                                          shared=self.board.shares_issues,
+                                          owns=BOARD_FIELDS + ISSUE_FIELDS)
+                submit(len(done))
+        finally:
+            # requests that are still running are bounded by the deadline
+            executor.shutdown(wait=False, cancel_futures=True)
+            # the details changed the issue data, drop the indexes of the board
+            self.board._reindex()  # pylint: disable=protected-access
+            self.elapsed = time.perf_counter() - started
+
+    @profiled
+    def load(self):
+        """ Returns the Board with the details of all of its issues
+
+        :return: The hydrated Board or ``None`` if the board was not found
+        :rtype: :class:`zenhub.Board`
+        """
+        for _ in self.issues():
+            pass
+        return self.board
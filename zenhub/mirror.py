@@ -0,0 +1,399 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2019 John J. Rofrano <rofrano@gmail.com>
+# All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+SQLite Mirror
+
+Keeps a local SQLite database in step with the boards and epics of a set of
+repositories so that reports can run SQL instead of crawling the API again.
+The database holds:
+
+    ``repositories``
+        ``repo_id``, ``workspace_id``, ``synced_at``, ``content_hash``
+    ``pipelines``
+        ``repo_id``, ``pipeline_id``, ``name``, ``position``
+    ``issues``
+        ``repo_id``, ``issue_number``, ``pipeline_id``, ``position``,
+        ``estimate``, ``is_epic``
+    ``epics``
+        ``repo_id``, ``issue_number``, ``estimate``, ``total_epic_estimates``
+    ``epic_issues``
+        ``epic_repo_id``, ``epic_number``, ``repo_id``, ``issue_number``,
+        ``estimate``
+
+:meth:`Mirror.sync` fetches the repositories in parallel and compares the
+new rows of each repository with the stored ones, so only the rows that
+changed are written, in one transaction per sync. A repository whose rows
+hash to the same ``content_hash`` as last time is not compared at all. The
+mirror can be
+queried with SQL through :meth:`Mirror.execute` or through the read-only
+models returned by :meth:`Mirror.pipelines`, :meth:`Mirror.issues` and
+:meth:`Mirror.epics`.
+
+Example::
+
+    mirror = Mirror('zenhub.db', zen)
+    mirror.sync(repo_ids)
+    for issue in mirror.issues(pipeline='In Progress'):
+        print(issue.repo_id, issue.issue_number, issue.estimate)
+    mirror.execute('SELECT pipeline_id, SUM(estimate) FROM issues GROUP BY pipeline_id')
+
+"""
+
+import time
+import hashlib
+import sqlite3
+from collections import namedtuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS repositories (
+    repo_id INTEGER PRIMARY KEY,
+    workspace_id TEXT,
+    synced_at REAL,
+    content_hash TEXT
+);
+CREATE TABLE IF NOT EXISTS pipelines (
+    repo_id INTEGER NOT NULL,
+    pipeline_id TEXT NOT NULL,
+    name TEXT,
+    position INTEGER,
+    PRIMARY KEY (repo_id, pipeline_id)
+);
+CREATE TABLE IF NOT EXISTS issues (
+    repo_id INTEGER NOT NULL,
+    issue_number INTEGER NOT NULL,
+    pipeline_id TEXT,
+    position INTEGER,
+    estimate REAL,
+    is_epic INTEGER,
+    PRIMARY KEY (repo_id, issue_number)
+);
+CREATE INDEX IF NOT EXISTS issues_pipeline ON issues (repo_id, pipeline_id, position);
+CREATE TABLE IF NOT EXISTS epics (
+    repo_id INTEGER NOT NULL,
+    issue_number INTEGER NOT NULL,
+    estimate REAL,
+    total_epic_estimates REAL,
+    PRIMARY KEY (repo_id, issue_number)
+);
+CREATE TABLE IF NOT EXISTS epic_issues (
+    epic_repo_id INTEGER NOT NULL,
+    epic_number INTEGER NOT NULL,
+    repo_id INTEGER NOT NULL,
+    issue_number INTEGER NOT NULL,
+    estimate REAL,
+    PRIMARY KEY (epic_repo_id, epic_number, repo_id, issue_number)
+);
+CREATE INDEX IF NOT EXISTS epic_issues_issue ON epic_issues (repo_id, issue_number);
+"""
+
+# the columns of each mirrored table, the key columns first, and the number of key columns
+TABLES = {
+    'pipelines': (('repo_id', 'pipeline_id', 'name', 'position'), 2),
+    'issues': (('repo_id', 'issue_number', 'pipeline_id', 'position', 'estimate', 'is_epic'), 2),
+    'epics': (('repo_id', 'issue_number', 'estimate', 'total_epic_estimates'), 2),
+    'epic_issues': (('epic_repo_id', 'epic_number', 'repo_id', 'issue_number', 'estimate'), 4),
+}
+
+MirroredPipeline = namedtuple('MirroredPipeline', 'repo_id pipeline_id name position')
+MirroredIssue = namedtuple('MirroredIssue',
+                           'repo_id issue_number pipeline_id pipeline position estimate is_epic')
+MirroredEpic = namedtuple('MirroredEpic',
+                          'repo_id issue_number estimate total_epic_estimates issues')
+
+
+def _estimate(data):
+    """ Returns the value of the estimate in issue data or ``None`` """
+    estimate = data.get('estimate')
+    return estimate['value'] if estimate else None
+
+
+def board_rows(repo_id, data):
+    """ Returns the ``pipelines`` and ``issues`` rows of a board
+
+    :type repo_id: int
+    :param repo_id: The GitHub ID of the repository
+    :type data: dict
+    :param data: The board data as returned by the ZenHub API
+
+    :return: a dict of table name to list of rows
+    :rtype: dict
+    """
+    pipelines, issues = [], []
+    for position, pipeline in enumerate(data['pipelines']):
+        pipelines.append((repo_id, pipeline['id'], pipeline.get('name'), position))
+        for index, issue_data in enumerate(pipeline['issues']):
+            issues.append((repo_id, issue_data['issue_number'], pipeline['id'],
+                           issue_data.get('position', index), _estimate(issue_data),
+                           int(bool(issue_data.get('is_epic')))))
+    return {'pipelines': pipelines, 'issues': issues}
+
+
+def epic_rows(repo_id, epics):
+    """ Returns the ``epics`` and ``epic_issues`` rows of the Epics of a repository
+
+    Epics that only have their summary (their details could not be fetched)
+    have no rows.
+
+    :type repo_id: int
+    :param repo_id: The GitHub ID of the repository
+    :type epics: list
+    :param epics: The :class:`Epics <zenhub.Epic>` of the repository
+
+    :return: a dict of table name to list of rows
+    :rtype: dict
+    """
+    epic_list, children = [], []
+    for epic in epics:
+        if not _detailed(epic):
+            continue
+        epic_list.append((repo_id, epic.id, _estimate(epic.data), epic.data.get(
+            'total_epic_estimates', {}).get('value')))
+        for issue_data in epic.issues:
+            children.append((repo_id, epic.id, issue_data.get('repo_id', repo_id),
+                             issue_data['issue_number'], _estimate(issue_data)))
+    return {'epics': epic_list, 'epic_issues': children}
+
+
+def _detailed(epic):
+    """ Returns ``True`` if the details of an Epic were fetched, not only its summary """
+    return 'issues' in epic.data
+
+
+def _content_hash(tables):
+    """ Returns a hash of the rows of a repository """
+    digest = hashlib.blake2b(digest_size=16)
+    for table in sorted(tables):
+        digest.update(repr((table, tables[table])).encode('utf-8'))
+    return digest.hexdigest()
+
+
+class Mirror:
+    """ A local SQLite copy of the boards and epics of repositories
+
+    :type path: string
+    :param path: The database file, ``':memory:'`` for a temporary database
+    :type zenhub: :class:`zenhub.ZenHub`
+    :param zenhub: The client used by :meth:`sync` (not needed to only query)
+    """
+
+    def __init__(self, path, zenhub=None):
+        self.path = path
+        self.zenhub = zenhub
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(SCHEMA)
+
+    def __repr__(self):
+        return '<%s %r>' % (type(self).__name__, self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """ Closes the database """
+        self.connection.close()
+
+    def _fetch(self, repo_id, epics, epic_workers):
+        """ Returns the board and epics of a repository """
+        repo = self.zenhub.repository(repo_id)
+        board = repo.board()
+        if not epics or board is None:
+            return repo_id, board, []
+        return repo_id, board, repo.epics(details=True, workers=epic_workers)
+
+    def sync(self, repo_ids, epics=True, workers=8, epic_workers=4):
+        """ Brings the mirror of the repositories up to date
+
+        The repositories are fetched in parallel, and the Epics of each
+        repository ``epic_workers`` at a time. A repository whose board is
+        not found is left as it is in the mirror, and so is an Epic whose
+        details could not be fetched. Under a deadline (see
+        :meth:`ZenHub.deadline <zenhub.ZenHub.deadline>`) the repositories
+        that were fetched in time are written.
+
+        :type repo_ids: iterable
+        :param repo_ids: The GitHub IDs of the repositories
+        :type epics: bool
+        :param epics: Also mirror the Epics of the repositories and their issues
+        :type workers: int
+        :param workers: The number of repositories to fetch at once
+        :type epic_workers: int
+        :param epic_workers: The number of Epics of a repository to fetch at once
+
+        :return: the number of ``repositories`` synced, of those ``skipped``
+                 because their content did not change, and of rows
+                 ``inserted``, ``updated``, ``deleted`` and ``unchanged``
+        :rtype: dict
+        """
+        fetched = self.zenhub.map(lambda repo_id: self._fetch(repo_id, epics, epic_workers),
+                                  list(repo_ids), workers=workers)
+        stats = {'repositories': 0, 'skipped': 0, 'inserted': 0, 'updated': 0, 'deleted': 0,
+                 'unchanged': 0}
+        now = time.time()
+        with self.connection:
+            for repo_id, board, epic_list in fetched:
+                if board is None:
+                    continue
+                tables = board_rows(repo_id, board.data)
+                # the stored rows of Epics with only a summary are kept
+                kept = set()
+                if epics:
+                    tables.update(epic_rows(repo_id, epic_list))
+                    kept = {epic.id for epic in epic_list if not _detailed(epic)}
+                # a partial sync is not hashed, the next one compares every row
+                content_hash = None if kept else _content_hash(tables)
+                stored_hash = self.connection.execute(
+                    'SELECT content_hash FROM repositories WHERE repo_id = ?', (repo_id,)).fetchone()
+                if content_hash is not None and stored_hash == (content_hash,):
+                    stats['skipped'] += 1
+                    stats['unchanged'] += sum(len(rows) for rows in tables.values())
+                else:
+                    for table, rows in tables.items():
+                        self._write(table, repo_id, rows, stats, kept)
+                self.connection.execute(
+                    'INSERT OR REPLACE INTO repositories VALUES (?, ?, ?, ?)',
+                    (repo_id, board.workspace_id, now, content_hash))
+                stats['repositories'] += 1
+        return stats
+
+    def _write(self, table, repo_id, rows, stats, kept=()):
+        """ Writes the rows of a repository that differ from the stored ones
+
+        Stored rows of the Epics in ``kept`` are not deleted.
+        """
+        columns, key_size = TABLES[table]
+        scope = columns[0]
+        stored = {row[:key_size]: row for row in self.connection.execute(
+            f'SELECT {", ".join(columns)} FROM {table} WHERE {scope} = ?', (repo_id,))}
+        if table in ('epics', 'epic_issues'):
+            stored = {key: row for key, row in stored.items() if key[1] not in kept}
+        changed = []
+        for row in rows:
+            old = stored.pop(row[:key_size], None)
+            if old is None:
+                stats['inserted'] += 1
+            elif old != row:
+                stats['updated'] += 1
+            else:
+                stats['unchanged'] += 1
+                continue
+            changed.append(row)
+        if changed:
+            self.connection.executemany(
+                f'INSERT OR REPLACE INTO {table} VALUES ({", ".join("?" * len(columns))})',
+                changed)
+        if stored:
+            keys = columns[:key_size]
+            self.connection.executemany(
+                f'DELETE FROM {table} WHERE {" AND ".join(f"{key} = ?" for key in keys)}',
+                list(stored))
+            stats['deleted'] += len(stored)
+
+    def execute(self, sql, parameters=()):
+        """ Runs an SQL statement against the mirror and returns all of its rows
+
+        :type sql: string
+        :param sql: The SQL statement
+        :type parameters: tuple or dict
+        :param parameters: The parameters of the statement
+
+        :rtype: list
+        """
+        return self.connection.execute(sql, parameters).fetchall()
+
+    def repositories(self):
+        """ Returns the ids of the mirrored repositories
+
+        :rtype: list
+        """
+        return [row[0] for row in self.execute('SELECT repo_id FROM repositories ORDER BY repo_id')]
+
+    def pipelines(self, repo_id):
+        """ Returns the Pipelines of a repository in board order
+
+        :type repo_id: int
+        :param repo_id: The GitHub ID of the repository
+
+        :return: a list of :class:`MirroredPipeline`
+        :rtype: list
+        """
+        return [MirroredPipeline(*row) for row in self.execute(
+            'SELECT repo_id, pipeline_id, name, position FROM pipelines'
+            ' WHERE repo_id = ? ORDER BY position', (repo_id,))]
+
+    def issues(self, repo_id=None, pipeline=None, epic=None):
+        """ Returns the issues on the mirrored boards in board order
+
+        :type repo_id: int
+        :param repo_id: Only the issues of this repository
+        :type pipeline: string
+        :param pipeline: Only the issues in the pipeline with this name or id
+        :type epic: int
+        :param epic: Only the issues of the Epic with this number (in
+                     ``repo_id`` if given)
+
+        :return: a list of :class:`MirroredIssue`
+        :rtype: list
+        """
+        sql = ('SELECT i.repo_id, i.issue_number, i.pipeline_id, p.name, i.position, i.estimate,'
+               ' i.is_epic FROM issues i LEFT JOIN pipelines p'
+               ' ON p.repo_id = i.repo_id AND p.pipeline_id = i.pipeline_id')
+        where, parameters = [], []
+        if epic is not None:
+            sql += (' JOIN epic_issues e'
+                    ' ON e.repo_id = i.repo_id AND e.issue_number = i.issue_number')
+            where.append('e.epic_number = ?')
+            parameters.append(epic)
+            if repo_id is not None:
+                where.append('e.epic_repo_id = ?')
+                parameters.append(repo_id)
+        elif repo_id is not None:
+            where.append('i.repo_id = ?')
+            parameters.append(repo_id)
+        if pipeline is not None:
+            where.append('(p.name = ? OR i.pipeline_id = ?)')
+            parameters.extend((pipeline, pipeline))
+        if where:
+            sql += ' WHERE ' + ' AND '.join(where)
+        sql += ' ORDER BY i.repo_id, p.position, i.position'
+        return [MirroredIssue(*row[:6], bool(row[6])) for row in self.execute(sql, parameters)]
+
+    def epics(self, repo_id=None):
+        """ Returns the mirrored Epics with the ``(repo_id, issue_number)`` of their issues
+
+        :type repo_id: int
+        :param repo_id: Only the Epics of this repository
+
+        :return: a list of :class:`MirroredEpic`
+        :rtype: list
+        """
+        sql = 'SELECT repo_id, issue_number, estimate, total_epic_estimates FROM epics'
+        parameters = ()
+        if repo_id is not None:
+            sql += ' WHERE repo_id = ?'
+            parameters = (repo_id,)
+        children = {}
+        for epic_repo_id, epic_number, child_repo_id, issue_number in self.execute(
+                'SELECT epic_repo_id, epic_number, repo_id, issue_number FROM epic_issues'
+                ' ORDER BY repo_id, issue_number'):
+            children.setdefault((epic_repo_id, epic_number), []).append(
+                (child_repo_id, issue_number))
+        return [MirroredEpic(*row, tuple(children.get(row[:2], ())))
+                for row in self.execute(sql + ' ORDER BY repo_id, issue_number', parameters)]
@@ -19,6 +19,10 @@ ZenHub Pipeline
 
 This class represents a single Pipeline on the ZenHub Kanban Board.
 
+A Pipeline can be put in a new order with :meth:`Pipeline.reorder`, which only
+moves the issues that are not already in the right order relative to each
+other (see :func:`minimal_moves`).
+
 """
 # Sample data:
 #     {
@@ -33,15 +37,75 @@ This class represents a single Pipeline on the ZenHub Kanban Board.
 #         ]
 #     }
 
-import json
+from bisect import bisect_left
 from .issue import Issue
 
+
+def minimal_moves(current, desired):
+    """ Returns the fewest moves that put the issues of a pipeline in a new order
+
+    The issues that form a longest increasing subsequence of the desired
+    order stay where they are and every other issue is moved once, right
+    after the issue that precedes it in the desired order. The moves are
+    returned in the order they must be sent, each with the position the
+    issue has in the pipeline after the move.
+
+    :type current: list
+    :param current: The issue numbers in their current order
+    :type desired: list
+    :param desired: The issue numbers in the new order, the issues that are
+                    left out keep their current order after the listed ones
+
+    :return: a list of ``(issue_number, position)`` tuples
+    :rtype: list
+
+    :raise ValueError: ``desired`` has an issue twice or one that is not in ``current``
+    """
+    if len(set(desired)) != len(desired):
+        raise ValueError('the desired order lists an issue more than once')
+    unknown = set(desired).difference(current)
+    if unknown:
+        raise ValueError(f'issues {sorted(unknown)} are not in the pipeline')
+    listed = set(desired)
+    target = list(desired) + [number for number in current if number not in listed]
+    rank = {number: index for index, number in enumerate(target)}
+
+    # longest increasing subsequence of the target ranks in the current order
+    tails, tail_numbers, previous = [], [], {}
+    for number in current:
+        index = bisect_left(tails, rank[number])
+        previous[number] = tail_numbers[index - 1] if index else None
+        if index == len(tails):
+            tails.append(rank[number])
+            tail_numbers.append(number)
+        else:
+            tails[index] = rank[number]
+            tail_numbers[index] = number
+    keep = set()
+    number = tail_numbers[-1] if tail_numbers else None
+    while number is not None:
+        keep.add(number)
+        number = previous[number]
+
+    order = list(current)
+    moves = []
+    for index, number in enumerate(target):
+        if number in keep:
+            continue
+        order.remove(number)
+        position = order.index(target[index - 1]) + 1 if index else 0
+        order.insert(position, number)
+        moves.append((number, position))
+    return moves
+
+
 class Pipeline:
     """ Represents a Pipeline in a ZenHub Board """
 
-    def __init__(self, data, repo):
+    def __init__(self, data, repo, board=None):
         self.data = data
         self.repo = repo
+        self.board = board
         self.id = data['id']
         self.name = data['name']
         self._issues = data['issues']
@@ -50,7 +114,8 @@ class Pipeline:
         return '<%s %r>' % (type(self).__name__, self.id)
 
     def __str__(self):
-        return '<%s %r>\n' % (type(self).__name__, self.id) + json.dumps(self.data, indent=4)
+        return ('<%s %r>\n' % (type(self).__name__, self.id)
+                + self.repo.zenhub.codec.dumps(self.data, indent=True))
 
     @property
     def issues(self):
@@ -62,7 +127,54 @@ class Pipeline:
         issue_list = []
         if self._issues:
             issue_list = [
-                Issue(issue_data, issue_data['issue_number'], self.repo)
+                Issue.from_board(issue_data, self.data, self.repo, self.board)
                 for issue_data in self._issues
             ]
         return issue_list
+
+    def reorder(self, desired_issue_numbers):
+        """ Moves the issues of this Pipeline into a new order with as few requests as possible
+
+        Only the moves computed by :func:`minimal_moves` are sent, one at a
+        time and in order, and the local data (and the Board, if the Pipeline
+        came from one) are updated after each move. If a move fails the
+        moves before it have been applied.
+
+        :type desired_issue_numbers: list
+        :param desired_issue_numbers: The issue numbers in the new order, the
+                                      issues that are left out keep their
+                                      current order after the listed ones
+
+        :calls: `POST /p2/workspaces/:workspace_id/repositories/:repo_id/issues/:issue_number/moves <https://github.com/ZenHubIO/API#move-an-issue-between-pipelines>`_
+                for every issue that is moved
+
+        :return: the issue numbers that were ``moved``, the number of ``requests``
+                 sent and the number of requests ``saved`` compared to moving
+                 every issue
+        :rtype: dict
+
+        :raise ValueError: an issue is listed twice or is not in this Pipeline
+        """
+        current = [issue_data['issue_number'] for issue_data in self._issues]
+        moves = minimal_moves(current, desired_issue_numbers)
+        workspace_id = self.board.workspace_id if self.board is not None else None
+        moved = []
+        for number, position in moves:
+            issue_data = next(issue_data for issue_data in self._issues
+                              if issue_data['issue_number'] == number)
+            issue = Issue.from_board(issue_data, self.data, self.repo, self.board)
+            issue.move_to(self.id, position, workspace_id=workspace_id)
+            if self.board is not None:
+                self.board.move_issue(number, self.id, position)
+                # the Board copies its data before the first change
+                self.data = next(pipeline for pipeline in self.board.data['pipelines']
+                                 if pipeline['id'] == self.id)
+                self._issues = self.data['issues']
+            else:
+                self._issues.remove(issue_data)
+                self._issues.insert(position, issue_data)
+                for index, entry in enumerate(self._issues):
+                    if 'position' in entry:
+                        entry['position'] = index
+            moved.append(number)
+        return {'moved': moved, 'requests': len(moved), 'saved': len(current) - len(moved)}
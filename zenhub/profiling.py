@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2019 John J. Rofrano <rofrano@gmail.com>
+# All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Profiling
+
+Records which API requests a high-level call made, how long each took and
+how much time went into decoding JSON::
+
+    with zen.profile() as prof:
+        workspace.board()
+    print(prof.format())
+    prof.write_collapsed('board.folded')
+
+The result is a tree of calls such as ``Repository.board`` and
+``Issue.find`` with their HTTP requests (e.g.,
+``GET /p1/repositories/:id/board``) and ``parse`` steps as children. The
+time a call spends outside of its children is mostly spent building
+objects. :meth:`Profile.collapsed` exports the tree in the collapsed stack
+format read by ``flamegraph.pl`` and speedscope.
+
+The profile is kept in a :mod:`contextvars` variable, so calls made on other
+threads by :meth:`ZenHub.map <zenhub.ZenHub.map>` are recorded under the
+call that started them. Outside of a profile the only cost is one lookup of
+that variable per call.
+"""
+
+import time
+import threading
+import contextvars
+import functools
+from contextlib import contextmanager, nullcontext
+
+_current = contextvars.ContextVar('zenhub_profile', default=None)
+
+CALL = 'call'
+HTTP = 'http'
+PARSE = 'parse'
+
+
+class Node:
+    """ A call, request or parse step in a profile """
+
+    __slots__ = ('name', 'kind', 'wall', 'children')
+
+    def __init__(self, name, kind):
+        self.name = name
+        self.kind = kind
+        self.wall = 0.0
+        self.children = []
+
+    def __repr__(self):
+        return '<%s %r %.6fs>' % (type(self).__name__, self.name, self.wall)
+
+    @property
+    def self_time(self):
+        """ The time spent outside of the children (0 if they ran in parallel) """
+        return max(0.0, self.wall - sum(child.wall for child in self.children))
+
+    def walk(self, path=()):
+        """ Yields ``(path, node)`` for this node and every node below it """
+        path = path + (self.name,)
+        yield path, self
+        for child in list(self.children):
+            yield from child.walk(path)
+
+
+class Profile:
+    """ The calls recorded by :func:`profile`
+
+    :type cprofile: bool
+    :param cprofile: Also run :mod:`cProfile` on the calling thread, the
+                     result is in :attr:`stats`
+    """
+
+    def __init__(self, cprofile=False):
+        self.root = Node('profile', 'root')
+        self.cprofile = None
+        if cprofile:
+            import cProfile
+            self.cprofile = cProfile.Profile()
+        self.stats = None
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return '<%s %.6fs>' % (type(self).__name__, self.root.wall)
+
+    def _add(self, parent, name, kind):
+        """ Adds a child node (nodes may be added from several threads) """
+        node = Node(name, kind)
+        with self._lock:
+            parent.children.append(node)
+        return node
+
+    def summary(self):
+        """ Returns the number of calls and requests and the time they took
+
+        :rtype: dict
+        """
+        summary = {'wall': self.root.wall, 'calls': 0, 'requests': 0,
+                   'request_time': 0.0, 'parse_time': 0.0}
+        for _, node in self.root.walk():
+            if node.kind == CALL:
+                summary['calls'] += 1
+            elif node.kind == HTTP:
+                summary['requests'] += 1
+                summary['request_time'] += node.wall
+            elif node.kind == PARSE:
+                summary['parse_time'] += node.wall
+        return summary
+
+    def collapsed(self):
+        """ Returns the profile in the collapsed stack format of flame graphs
+
+        There is one line per distinct stack with the time spent in the last
+        frame of it in microseconds, e.g.
+        ``Repository.board;Board.find;GET /p1/repositories/:id/board 52311``.
+
+        :rtype: string
+        """
+        totals = {}
+        for path, node in self.root.walk():
+            if node is self.root:
+                continue
+            stack = ';'.join(path[1:])
+            totals[stack] = totals.get(stack, 0.0) + node.self_time
+        return ''.join(f'{stack} {round(seconds * 1e6)}\n' for stack, seconds in totals.items())
+
+    def write_collapsed(self, path):
+        """ Writes :meth:`collapsed` to a file
+
+        :type path: string
+        :param path: The file name to write
+        """
+        with open(path, 'w') as output:
+            output.write(self.collapsed())
+
+    def format(self):
+        """ Returns the tree of calls as indented text with times in milliseconds
+
+        :rtype: string
+        """
+        lines = []
+        for path, node in self.root.walk():
+            lines.append('%s%s %.3f ms' % ('  ' * (len(path) - 1), node.name, node.wall * 1000))
+        return '\n'.join(lines)
+
+
+@contextmanager
+def profile(cprofile=False):
+    """ Records the library calls made in the body of a ``with`` statement
+
+    :type cprofile: bool
+    :param cprofile: Also run :mod:`cProfile`, see :class:`Profile`
+
+    :return: the :class:`Profile`, complete when the block ends
+    """
+    prof = Profile(cprofile)
+    token = _current.set((prof, prof.root))
+    started = time.perf_counter()
+    if prof.cprofile:
+        prof.cprofile.enable()
+    try:
+        yield prof
+    finally:
+        if prof.cprofile:
+            prof.cprofile.disable()
+            import pstats
+            prof.stats = pstats.Stats(prof.cprofile)
+        prof.root.wall = time.perf_counter() - started
+        _current.reset(token)
+
+
+@contextmanager
+def _span(prof, parent, name, kind):
+    node = prof._add(parent, name, kind)
+    token = _current.set((prof, node))
+    started = time.perf_counter()
+    try:
+        yield node
+    finally:
+        node.wall = time.perf_counter() - started
+        _current.reset(token)
+
+
+def span(name, kind):
+    """ Returns a context manager that records a step under the current call
+
+    Does nothing when there is no profile.
+
+    :type name: string
+    :param name: The name of the step
+    :type kind: string
+    :param kind: ``HTTP``, ``PARSE`` or ``CALL``
+    """
+    current = _current.get()
+    if current is None:
+        return nullcontext()
+    return _span(current[0], current[1], name, kind)
+
+
+def profiled(func):
+    """ Decorates a library call so that it is recorded in a profile """
+    name = func.__qualname__
+
+    @functools.wraps(func)
+    def call(*args, **kwargs):
+        current = _current.get()
+        if current is None:
+            return func(*args, **kwargs)
+        with _span(current[0], current[1], name, CALL):
+            return func(*args, **kwargs)
+    return call
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2019 John J. Rofrano <rofrano@gmail.com>
+# All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Field Projection
+
+Strips the fields a job does not need from the issues of a response before
+any objects are built, so that large boards and epics only keep what was
+asked for in memory. ``issue_number`` and ``is_epic`` are always kept because
+every :class:`Issue <zenhub.Issue>` needs them.
+
+Projection runs after the whole response has been decoded, so it saves
+memory for as long as the objects are kept, not decoding time. Issues and
+Epics built from projected data are not the shared objects of the client's
+identity map, which always hold complete data.
+
+Example::
+
+    board = zen.repository(1234567).board(fields=['estimate'])
+
+"""
+
+REQUIRED_FIELDS = frozenset(('issue_number', 'is_epic'))
+
+
+def issue_fields(fields):
+    """ Returns the set of issue fields to keep or ``None`` to keep everything
+
+    :type fields: iterable
+    :param fields: The names of the issue fields that are needed
+    """
+    if fields is None:
+        return None
+    return REQUIRED_FIELDS.union(fields)
+
+
+def project_issue(data, fields):
+    """ Returns a copy of an issue dict with only the given fields
+
+    :type data: dict
+    :param data: The issue data
+    :type fields: frozenset
+    :param fields: The fields to keep as returned by :func:`issue_fields`
+    """
+    if fields is None:
+        return data
+    return {key: value for key, value in data.items() if key in fields}
+
+
+def project_issues(issues, fields):
+    """ Returns a list of issue dicts with only the given fields """
+    if fields is None:
+        return issues
+    return [project_issue(data, fields) for data in issues]
+
+
+def project_board(data, fields):
+    """ Returns a copy of board data whose issues only have the given fields
+
+    The pipeline ``id`` and ``name`` are always kept.
+    """
+    if fields is None:
+        return data
+    projected = {key: value for key, value in data.items() if key != 'pipelines'}
+    projected['pipelines'] = [
+        {'id': pipeline['id'], 'name': pipeline['name'],
+         'issues': project_issues(pipeline['issues'], fields)}
+        for pipeline in data['pipelines']
+    ]
+    return projected
+
+
+def project_epic(data, fields):
+    """ Returns a copy of epic data whose issues only have the given fields
+
+    The fields of the epic itself (estimates and pipelines) are kept.
+    """
+    if fields is None or 'issues' not in data:
+        return data
+    return dict(data, issues=project_issues(data['issues'], fields))
@@ -0,0 +1,290 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2019 John J. Rofrano <rofrano@gmail.com>
+# All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Issue Queries
+
+A :class:`Query` filters, sorts and limits the issues of one or more loaded
+boards without sending any requests::
+
+    query = Query([board, other_board], epics=repo.epics(details=True))
+    query.issues(pipeline='In Progress', estimate_gte=3, is_epic=False,
+                 order_by='-estimate', limit=10)
+
+Conditions are given as keyword arguments. A field name matches a value (or
+any value of a list), and the ``_gt``, ``_gte``, ``_lt`` and ``_lte`` suffixes
+match a range:
+
+    - ``pipeline``      the name or id of the pipeline
+    - ``repo_id``       the repository of the issue
+    - ``issue_number``  the number of the issue
+    - ``is_epic``       ``True`` for epics
+    - ``estimate``      the estimate value (``None`` for issues without one)
+    - ``position``      the position in the pipeline
+    - ``epic``          the number of an epic the issue belongs to (needs ``epics``)
+
+An index is built for a field the first time it is used in a condition, so
+later queries only look at the issues that match. The query does not see
+changes made to the boards after it was built; :meth:`Board.query
+<zenhub.Board.query>` builds a new one when its board changes.
+"""
+
+import heapq
+from bisect import bisect_left, bisect_right
+from itertools import chain, islice
+from .issue import Issue
+
+FIELDS = ('pipeline', 'repo_id', 'issue_number', 'is_epic', 'estimate', 'position', 'epic')
+RANGE_FIELDS = ('repo_id', 'issue_number', 'estimate', 'position')
+OPERATORS = ('gt', 'gte', 'lt', 'lte')
+
+
+class Query:
+    """ Secondary indexes over the issues of boards
+
+    :type sources: list
+    :param sources: The :class:`Boards <zenhub.Board>` (or :class:`Workspaces
+                    <zenhub.Workspace>`, whose boards are loaded) to query
+    :type epics: list
+    :param epics: :class:`Epics <zenhub.Epic>` used to answer ``epic`` conditions
+    """
+
+    def __init__(self, sources, epics=()):
+        self.epics = list(epics)
+        # one entry per issue: its repository, pipeline, issue data and board
+        self._repos = []
+        self._pipelines = []
+        self._issues = []
+        self._boards = []
+        self._columns = {}
+        self._indexes = {}
+        self._sets = {}
+        self._sorted = {}
+        for source in sources:
+            board = source.board() if hasattr(source, 'board') else source
+            if board is None:
+                continue
+            for pipeline in board.data['pipelines']:
+                issues = pipeline['issues']
+                self._repos.extend([board.repo] * len(issues))
+                self._pipelines.extend([pipeline] * len(issues))
+                self._issues.extend(issues)
+                self._boards.extend([board] * len(issues))
+
+    def __repr__(self):
+        return '<%s %r>' % (type(self).__name__, len(self._issues))
+
+    def __len__(self):
+        return len(self._issues)
+
+    def _column(self, field):
+        """ Returns the value of a field for every row, building it on first use """
+        column = self._columns.get(field)
+        if column is None:
+            if field == 'pipeline':
+                column = [pipeline.get('name') for pipeline in self._pipelines]
+            elif field == 'repo_id':
+                column = [repo.id for repo in self._repos]
+            elif field == 'estimate':
+                column = [(issue_data.get('estimate') or {}).get('value')
+                          for issue_data in self._issues]
+            else:
+                column = [issue_data.get(field) for issue_data in self._issues]
+            self._columns[field] = column
+        return column
+
+    def _index(self, field):
+        """ Returns ``{value: [row numbers]}`` for a field, building it on first use """
+        index = self._indexes.get(field)
+        if index is None:
+            index = {}
+            if field == 'epic':
+                numbers = {(repo.id, issue_data['issue_number']): number
+                           for number, (repo, issue_data)
+                           in enumerate(zip(self._repos, self._issues))}
+                for epic in self.epics:
+                    rows = index.setdefault(epic.id, [])
+                    for issue_data in epic.data.get('issues', ()):
+                        number = numbers.get((issue_data.get('repo_id', epic.repo.id),
+                                              issue_data['issue_number']))
+                        if number is not None:
+                            rows.append(number)
+                    rows.sort()
+            else:
+                for number, value in enumerate(self._column(field)):
+                    index.setdefault(value, []).append(number)
+                if field == 'pipeline':
+                    # pipelines can also be found by id
+                    for number, pipeline in enumerate(self._pipelines):
+                        index.setdefault(pipeline.get('id'), []).append(number)
+            self._indexes[field] = index
+        return index
+
+    def _set(self, field, value):
+        """ Returns the row numbers with a value as a set, building it on first use """
+        key = (field, value)
+        found = self._sets.get(key)
+        if found is None:
+            found = self._sets[key] = frozenset(self._index(field).get(value, ()))
+        return found
+
+    def _sorted_index(self, field):
+        """ Returns ``(values, row numbers)`` sorted by value, leaving out ``None`` """
+        found = self._sorted.get(field)
+        if found is None:
+            column = self._column(field)
+            numbers = sorted((number for number, value in enumerate(column) if value is not None),
+                             key=column.__getitem__)
+            found = self._sorted[field] = ([column[number] for number in numbers], numbers)
+        return found
+
+    def _condition(self, name, value):
+        """ Returns ``(size, rows, test)`` for a condition
+
+        ``rows()`` returns the numbers of the matching rows in board order and
+        ``test(number)`` checks a single row.
+        """
+        field, _, operator = name.rpartition('_')
+        if operator not in OPERATORS or field not in RANGE_FIELDS:
+            field, operator = name, None
+        if field not in FIELDS:
+            raise ValueError(f'unknown query condition {name!r}')
+        if operator is None:
+            if isinstance(value, (list, tuple, set, frozenset)):
+                matches = frozenset().union(*(self._set(field, item) for item in value))
+                return len(matches), lambda: sorted(matches), matches.__contains__
+            index = self._index(field)
+            matches = self._set(field, value)
+            return len(matches), lambda: index.get(value, []), matches.__contains__
+        values, numbers = self._sorted_index(field)
+        if operator == 'gt':
+            start, stop = bisect_right(values, value), len(values)
+        elif operator == 'gte':
+            start, stop = bisect_left(values, value), len(values)
+        elif operator == 'lt':
+            start, stop = 0, bisect_left(values, value)
+        else:
+            start, stop = 0, bisect_right(values, value)
+        column = self._column(field)
+        low = values[start] if start < stop else None
+        high = values[stop - 1] if start < stop else None
+
+        def test(number):
+            found = column[number]
+            return found is not None and low is not None and low <= found <= high
+        return stop - start, lambda: sorted(numbers[start:stop]), test
+
+    def _select(self, conditions):
+        """ Returns the conditions ordered from the most to the least selective """
+        return sorted((self._condition(name, value) for name, value in conditions.items()),
+                      key=lambda condition: condition[0])
+
+    @staticmethod
+    def _filter(rows, tests):
+        """ Lazily keeps the rows that pass every test """
+        for test in tests:
+            rows = filter(test, rows)
+        return rows
+
+    def _run(self, order_by, limit, conditions):
+        """ Returns the numbers of the matching rows, sorted and limited
+
+        The rows of the most selective condition are read from its index and
+        the other conditions are only checked on those rows. When a few rows
+        are wanted in the order of a field that has a sorted index, the index
+        is walked in order instead, which stops as soon as enough rows match.
+        """
+        selected = self._select(conditions)
+        size = selected[0][0] if selected else len(self._issues)
+        tests = [test for _, _, test in selected]
+        if order_by:
+            field = order_by.lstrip('-')
+            if field not in FIELDS or field == 'epic':
+                raise ValueError(f'cannot order by {order_by!r}')
+            descending = order_by.startswith('-')
+            column = self._column(field)
+            if (limit is not None and field in RANGE_FIELDS
+                    and limit * len(self._issues) < size * max(size, 1)):
+                numbers = self._sorted_index(field)[1]
+                if descending:
+                    # keep board order between equal values
+                    values = self._sorted_index(field)[0]
+                    numbers = _descending(values, numbers)
+                nones = (number for number in range(len(self._issues)) if column[number] is None)
+                return list(islice(self._filter(chain(numbers, nones), tests), limit))
+            rows = selected[0][1]() if selected else range(len(self._issues))
+            rows = list(self._filter(rows, tests[1:]))
+            if descending:
+                key = lambda number: (column[number] is not None, column[number])
+                if limit is not None:
+                    return heapq.nlargest(limit, rows, key=key)
+                return sorted(rows, key=key, reverse=True)
+            key = lambda number: (column[number] is None, column[number])
+            if limit is not None:
+                return heapq.nsmallest(limit, rows, key=key)
+            return sorted(rows, key=key)
+        rows = selected[0][1]() if selected else range(len(self._issues))
+        return list(islice(self._filter(rows, tests[1:]), limit))
+
+    def numbers(self, order_by=None, limit=None, **conditions):
+        """ Returns ``(repo_id, issue_number)`` of the matching issues
+
+        :type order_by: string
+        :param order_by: A field to sort by, prefixed with ``-`` for descending
+                         order (board order if ``None``)
+        :type limit: int
+        :param limit: The maximum number of issues to return
+
+        :rtype: list
+        """
+        repos, issues = self._repos, self._issues
+        return [(repos[number].id, issues[number]['issue_number'])
+                for number in self._run(order_by, limit, conditions)]
+
+    def issues(self, order_by=None, limit=None, **conditions):
+        """ Returns the matching issues
+
+        Takes the same arguments as :meth:`numbers`.
+
+        :return: The matching Issues
+        :rtype: list
+        """
+        repos, pipelines, issues, boards = self._repos, self._pipelines, self._issues, self._boards
+        return [Issue.from_board(issues[number], pipelines[number], repos[number], boards[number])
+                for number in self._run(order_by, limit, conditions)]
+
+    def count(self, **conditions):
+        """ Returns the number of matching issues
+
+        :rtype: int
+        """
+        selected = self._select(conditions)
+        if not selected:
+            return len(self._issues)
+        if len(selected) == 1:
+            return selected[0][0]
+        tests = [test for _, _, test in selected[1:]]
+        return sum(1 for _ in self._filter(selected[0][1](), tests))
+
+
+def _descending(values, numbers):
+    """ Yields row numbers sorted by value in descending order, equal values in board order """
+    stop = len(values)
+    while stop:
+        start = bisect_left(values, values[stop - 1], 0, stop)
+        yield from numbers[start:stop]
+        stop = start
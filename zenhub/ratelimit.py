@@ -0,0 +1,313 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2019 John J. Rofrano <rofrano@gmail.com>
+# All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Rate Limiting
+
+The ZenHub API allows a limited number of requests per minute for each
+token. A :class:`RateLimiter` is a token bucket that spreads requests over
+time so that a budget is never exceeded. It is safe to share between threads.
+
+Example::
+
+    zen = ZenHub('access_token', rate_limiter=RateLimiter(100))
+
+A :class:`SharedRateLimiter` keeps the bucket in shared memory so that one
+budget can be shared by several processes.
+
+A :class:`PriorityRateLimiter` hands the budget to waiting requests by
+priority class, so that interactive lookups are not queued behind a
+background crawl that uses the same client::
+
+    zen = ZenHub('access_token', rate_limiter=PriorityRateLimiter(100))
+    with zen.priority(BULK):
+        crawl(zen)          # in a background thread
+    with zen.priority(INTERACTIVE):
+        zen.repository(1234567).issue(42)
+"""
+
+import time
+import threading
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+
+INTERACTIVE = 'interactive'
+NORMAL = 'normal'
+BULK = 'bulk'
+
+# priority classes from the highest to the lowest
+PRIORITIES = (INTERACTIVE, NORMAL, BULK)
+
+_priority = contextvars.ContextVar('zenhub_priority', default=NORMAL)
+
+
+def priority(name):
+    """ Returns a context manager that sends the requests made inside it with a priority class
+
+    :type name: string
+    :param name: ``INTERACTIVE``, ``NORMAL`` (the default) or ``BULK``
+
+    :raise ValueError: the priority class is unknown
+    """
+    if name not in PRIORITIES:
+        raise ValueError(f'unknown priority {name!r}, expected one of {", ".join(PRIORITIES)}')
+    return _prioritized(name)
+
+
+@contextmanager
+def _prioritized(name):
+    token = _priority.set(name)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority():
+    """ Returns the priority class of the requests made by the caller """
+    return _priority.get()
+
+
+class RateLimiter:
+    """ A token bucket that allows ``requests_per_minute`` requests per minute
+
+    :type requests_per_minute: float
+    :param requests_per_minute: The sustained rate
+    :type burst: int
+    :param burst: The number of requests that may be sent at once after a
+                  quiet period (defaults to one second worth of requests, at least 1)
+    """
+
+    def __init__(self, requests_per_minute, burst=None, clock=time.monotonic, sleep=time.sleep):
+        self.requests_per_minute = requests_per_minute
+        self.burst = burst or max(1, int(requests_per_minute / 60))
+        self.granted = 0
+        self.waited = 0.0
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(self.burst)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return '<%s %r/min>' % (type(self).__name__, self.requests_per_minute)
+
+    def _refill(self, now):
+        """ Adds the tokens earned since the last update (call with the lock held) """
+        elapsed = max(0.0, now - self._updated)
+        self._tokens = min(self.burst, self._tokens + elapsed * self.requests_per_minute / 60.0)
+        self._updated = now
+
+    @property
+    def available(self):
+        """ The number of requests that can be sent right now """
+        with self._lock:
+            self._refill(self._clock())
+            return int(self._tokens)
+
+    def delay(self):
+        """ Returns the seconds until the next request is allowed """
+        with self._lock:
+            self._refill(self._clock())
+            if self._tokens >= 1:
+                return 0.0
+            return (1 - self._tokens) * 60.0 / self.requests_per_minute
+
+    def try_acquire(self):
+        """ Takes one request from the budget if one is available now
+
+        This never blocks and only holds a lock for a few arithmetic
+        operations, so many threads can share one limiter.
+
+        :return: ``True`` if the request may be sent
+        :rtype: bool
+        """
+        with self._lock:
+            self._refill(self._clock())
+            if self._tokens >= 1:
+                self._tokens -= 1
+                self.granted += 1
+                return True
+            return False
+
+    def acquire(self, timeout=None):
+        """ Waits until a request may be sent and takes it from the budget
+
+        :type timeout: float
+        :param timeout: The maximum number of seconds to wait (forever if ``None``)
+
+        :return: ``True`` if the request may be sent, ``False`` on timeout
+        :rtype: bool
+        """
+        started = self._clock()
+        while not self.try_acquire():
+            wait = self.delay()
+            if timeout is not None:
+                remaining = timeout - (self._clock() - started)
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            self._sleep(wait)
+            with self._lock:
+                self.waited += wait
+        return True
+
+
+class SharedRateLimiter(RateLimiter):
+    """ A :class:`RateLimiter` whose budget is shared between processes
+
+    The bucket is kept in shared memory and guarded by a process lock. Pass
+    the limiter to the processes when they are started (e.g., as an
+    ``initargs`` of a :class:`multiprocessing.pool.Pool`).
+
+    :type context: :mod:`multiprocessing` context
+    :param context: The context used to allocate the shared memory
+    """
+
+    def __init__(self, requests_per_minute, burst=None, context=None):
+        if context is None:
+            import multiprocessing
+            context = multiprocessing.get_context()
+        # tokens, last update, granted
+        self._shared = context.Array('d', 3)
+        super().__init__(requests_per_minute, burst)
+        self._lock = self._shared.get_lock()
+
+    @property
+    def _tokens(self):
+        return self._shared[0]
+
+    @_tokens.setter
+    def _tokens(self, value):
+        self._shared[0] = value
+
+    @property
+    def _updated(self):
+        return self._shared[1]
+
+    @_updated.setter
+    def _updated(self, value):
+        self._shared[1] = value
+
+    @property
+    def granted(self):
+        """ The number of requests granted in every process """
+        return int(self._shared[2])
+
+    @granted.setter
+    def granted(self, value):
+        self._shared[2] = value
+
+
+class PriorityRateLimiter(RateLimiter):
+    """ A :class:`RateLimiter` that serves waiting requests by priority class
+
+    A request may only take from the budget when no request of a higher
+    priority class is waiting. Requests of the same class are served in the
+    order they arrived. To prevent starvation a waiting request is promoted
+    one class for every ``aging`` seconds it has waited, so a bulk request
+    waits at most about ``2 * aging`` seconds longer than an interactive one.
+
+    The priority class of a request is set with :func:`priority`.
+
+    :type aging: float
+    :param aging: The seconds of waiting that promote a request by one class
+    :type history: int
+    :param history: The number of recent waits kept per class for :meth:`wait_stats`
+    """
+
+    # the longest a waiting request sleeps before it checks the queue again
+    POLL = 0.05
+
+    def __init__(self, requests_per_minute, burst=None, aging=10.0, history=1000,
+                 clock=time.monotonic, sleep=time.sleep):
+        super().__init__(requests_per_minute, burst, clock=clock, sleep=sleep)
+        self.aging = aging
+        self._waiting = []
+        self._sequence = 0
+        self._condition = threading.Condition()
+        self._waits = {name: deque(maxlen=history) for name in PRIORITIES}
+        self._counts = dict.fromkeys(PRIORITIES, 0)
+
+    def _rank(self, waiter, now):
+        """ Returns the sort key of a waiting request, lower is served first """
+        rank, enqueued, sequence = waiter
+        return (rank - (now - enqueued) / self.aging, sequence)
+
+    def _head(self):
+        """ Returns the waiting request that is served next (call with the condition held) """
+        now = self._clock()
+        return min(self._waiting, key=lambda waiter: self._rank(waiter, now))
+
+    def acquire(self, timeout=None):
+        name = current_priority()
+        started = self._clock()
+        with self._condition:
+            self._sequence += 1
+            waiter = (PRIORITIES.index(name), started, self._sequence)
+            self._waiting.append(waiter)
+            try:
+                while True:
+                    if self._head() is waiter and self.try_acquire():
+                        break
+                    wait = self.delay() or self.POLL
+                    if timeout is not None:
+                        remaining = timeout - (self._clock() - started)
+                        if remaining <= 0:
+                            return False
+                        wait = min(wait, remaining)
+                    self._condition.wait(min(wait, self.POLL) if self._head() is not waiter else wait)
+            finally:
+                self._waiting.remove(waiter)
+                self._condition.notify_all()
+            waited = self._clock() - started
+            self.waited += waited
+            self._counts[name] += 1
+            self._waits[name].append(waited)
+        return True
+
+    def queued(self):
+        """ Returns the number of requests waiting in each priority class
+
+        :rtype: dict
+        """
+        with self._condition:
+            counts = dict.fromkeys(PRIORITIES, 0)
+            for rank, _, _ in self._waiting:
+                counts[PRIORITIES[rank]] += 1
+            return counts
+
+    def wait_stats(self):
+        """ Returns the queue wait of each priority class
+
+        ``mean``, ``p95`` and ``max`` are in seconds and computed over the
+        most recent ``history`` requests of the class.
+
+        :rtype: dict
+        """
+        stats = {}
+        with self._condition:
+            for name in PRIORITIES:
+                waits = sorted(self._waits[name])
+                stats[name] = {
+                    'requests': self._counts[name],
+                    'mean': sum(waits) / len(waits) if waits else 0.0,
+                    'p95': waits[min(len(waits) - 1, int(len(waits) * 0.95))] if waits else 0.0,
+                    'max': waits[-1] if waits else 0.0,
+                }
+        return stats
@@ -27,10 +27,13 @@ You can retrieve the following items:
     - Epic {id}
 
 """
+from .profiling import profiled
 from .issue import Issue
 from .epic import Epic
 from .board import Board
 from .workspace import Workspace
+from .cache import is_stale
+from .projection import issue_fields, project_epic
 
 class Repository:
     """ Represents a GitHub repository with a ZenHub Kanban Board """
@@ -42,33 +45,70 @@ class Repository:
     def __repr__(self):
         return '<%s %r>' % (type(self).__name__, self.id)
 
-    def board(self):
+    @profiled
+    def board(self, fields=None, details=False, workers=8):
         """ Get the ZenHub Board associated with this repository
 
+        The board only has the number, position and epic flag of each issue
+        unless ``details`` is ``True``, then the details of every issue are
+        fetched, ``workers`` requests at a time, and merged into the board
+        (see :class:`BoardLoader <zenhub.loader.BoardLoader>`).
+
+        :type fields: list
+        :param fields: Only keep these fields of each issue (keeps all if ``None``)
+        :type details: bool
+        :param details: Fetch the details of every issue
+        :type workers: int
+        :param workers: The number of issues to fetch at once
+
         :return: :class:`Board <Board>` object
         :rtype: zenhub.Board
 
         """
-        return Board.find(self)
+        if details:
+            from .loader import BoardLoader
+            return BoardLoader(self, fields=fields, workers=workers).load()
+        return Board.find(self, fields=fields)
 
-    def issue(self, issue_id):
+    @profiled
+    def issue(self, issue_id, fields=None):
         """ Get a single Issue given it's ID
 
         :type issue_id: int
         :param issue_id: The ID of the Issue you want returned
+        :type fields: list
+        :param fields: Only keep these fields of the Issue (keeps all if ``None``)
 
         :return: :class:`Issue <Issue>` object
         :rtype: zenhub.Issue
 
         """
-        return Issue.find(issue_id, self)
+        return Issue.find(issue_id, self, fields=fields)
 
-    def epics(self):
+    @profiled
+    def epics(self, details=False, fields=None, workers=8):
         """ Get a list of Epics for this repository
 
         This will retrieve all of the Epics in the repository.
         If there are no Epics, it will return an empty list ``[]``
 
+        The list only has the summary of each Epic unless ``details`` is
+        ``True``, then the data of every Epic is fetched as well, ``workers``
+        requests at a time. The requests wait for the rate limiter of the
+        client and are cached by its cache. Under a deadline (see
+        :meth:`ZenHub.deadline <zenhub.ZenHub.deadline>`) the Epics that were
+        not fetched in time keep their summary.
+
+        :type details: bool
+        :param details: Fetch the data of every Epic
+        :type fields: list
+        :param fields: Only keep these fields of the Epics' issues (keeps all if ``None``)
+        :type workers: int
+        :param workers: The number of Epics to fetch at once
+
+        :calls: `GET /p1/repositories/:repo_id/epics/:epic_id <https://github.com/ZenHubIO/API#get-epic-data>`_
+                for every epic when ``details`` is ``True``
+
         :return: a collection of Epics in this repo or ``[]`` if none found
         :rtype: list
 
@@ -77,16 +117,31 @@ class Repository:
         data = self.zenhub.get(f"/p1/repositories/{self.id}/epics")
         if data:
             epics_list = [
-                Epic(epic_data, epic_data['issue_number'], self)
+                Epic.from_data(epic_data, epic_data['issue_number'], self)
                 for epic_data in data['epic_issues']
             ]
+        if details and epics_list:
+            # Epic.find refreshes the shared Epic objects in epics_list, projected
+            # Epics are not shared and take the place of their summary
+            found = self.zenhub.map(lambda epic: Epic.find(epic.id, self, fields=fields),
+                                    epics_list, workers=workers)
+            if fields is not None:
+                found = {epic.id: epic for epic in found if epic is not None}
+                for index, summary in enumerate(epics_list):
+                    epic = found.get(summary.id)
+                    if epic is not None:
+                        epic.data = dict(summary.data, **epic.data)
+                        epics_list[index] = epic
         return epics_list
 
-    def epic(self, epic_id):
+    @profiled
+    def epic(self, epic_id, fields=None):
         """ Get a single Epic given it's ID
 
         :type epic_id: int
         :param epic_id: The ID of the Epic you want returned
+        :type fields: list
+        :param fields: Only keep these fields of the Epic's issues (keeps all if ``None``)
 
         :return: :class:`Epic <Epic>` object
         :rtype: zenhub.Epic or None
@@ -94,21 +149,30 @@ class Repository:
         """
         data = self.zenhub.get(f"/p1/repositories/{self.id}/epics/{epic_id}")
         if data:
-            return Epic(data, epic_id=epic_id, repo=self)
+            return Epic.from_data(project_epic(data, issue_fields(fields)), epic_id, self, fields)
         return None
 
-    def workspaces(self):
+    @profiled
+    def workspaces(self, fresh=False):
         """
         Gets all Workspaces containing this repositories repo_id
 
+        The Workspaces are kept by the client for ``workspace_ttl`` seconds
+        (see :class:`ZenHub <zenhub.ZenHub>`) and used to fetch the board
+        and move the issues of this repository.
+
+        :type fresh: bool
+        :param fresh: Fetch the Workspaces even if they are known
+
         :calls: `GET /p2/repositories/:repo_id/workspaces <https://github.com/ZenHubIO/API#get-zenhub-workspaces-for-a-repository>`_
 
         :return: A list of Workspaces
         :rtype: list
 
         """
-        workspace_list = []
-        data = self.zenhub.get(f"/p1/repositories/{self.id}/workspaces")
-        if data:
-            workspace_list = [Workspace(workspace_data, self) for workspace_data in data]
-        return workspace_list
+        data = None if fresh else self.zenhub.workspace_cache.get(self.id, count=False)
+        if data is None:
+            data = self.zenhub.get(f"/p1/repositories/{self.id}/workspaces", fresh=fresh)
+            if data is not None and not is_stale(data):
+                self.zenhub.workspace_cache.set(self.id, data)
+        return [Workspace(workspace_data, self) for workspace_data in data or []]
@@ -0,0 +1,271 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2019 John J. Rofrano <rofrano@gmail.com>
+# All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Polling Scheduler
+
+Polls the boards of many repositories within a global requests per minute
+budget. Each repository has its own polling interval that adapts to how
+often its board changes:
+
+    - a board that changed is polled again after ``min_interval`` seconds
+    - a board that did not change waits ``backoff`` times longer each time,
+      up to ``max_interval`` seconds
+
+Repositories are polled in the order they are due, so when the budget is
+tight every repository is delayed a little instead of some being starved.
+Changes are found by comparing the placement and estimate of every issue
+with the previous poll. Polls are sent with the ``bulk`` priority class, so
+a client with a :class:`PriorityRateLimiter <zenhub.ratelimit.PriorityRateLimiter>`
+serves its interactive requests first.
+
+Example::
+
+    def changed(repo_id, board, diff):
+        print(repo_id, diff)
+
+    scheduler = PollingScheduler(zen, repo_ids, requests_per_minute=80, on_change=changed)
+    scheduler.run()
+
+"""
+
+import time
+import logging
+import threading
+from collections import deque
+from .board import Board
+from .ratelimit import RateLimiter, priority, BULK
+
+logger = logging.getLogger(__name__)
+
+
+def board_signature(data):
+    """ Returns ``{issue_number: (pipeline_id, position, estimate)}`` for board data """
+    signature = {}
+    for pipeline in data['pipelines']:
+        for index, issue_data in enumerate(pipeline['issues']):
+            estimate = issue_data.get('estimate')
+            signature[issue_data['issue_number']] = (
+                pipeline['id'],
+                issue_data.get('position', index),
+                estimate.get('value') if estimate else None,
+            )
+    return signature
+
+
+def diff_boards(old, new):
+    """ Compares two board signatures (see :func:`board_signature`)
+
+    :return: the issue numbers that were ``added``, ``removed``, ``moved``
+             to another pipeline, ``reordered`` within a pipeline, or
+             ``estimated`` differently. Only non-empty lists are included.
+    :rtype: dict
+    """
+    diff = {
+        'added': sorted(set(new) - set(old)),
+        'removed': sorted(set(old) - set(new)),
+        'moved': [],
+        'reordered': [],
+        'estimated': [],
+    }
+    for number in sorted(set(old) & set(new)):
+        (old_pipeline, old_position, old_estimate) = old[number]
+        (new_pipeline, new_position, new_estimate) = new[number]
+        if old_pipeline != new_pipeline:
+            diff['moved'].append(number)
+        elif old_position != new_position:
+            diff['reordered'].append(number)
+        if old_estimate != new_estimate:
+            diff['estimated'].append(number)
+    return {key: numbers for key, numbers in diff.items() if numbers}
+
+
+class RepoState:
+    """ The polling state of one repository """
+
+    def __init__(self, repo_id, interval, next_poll):
+        self.repo_id = repo_id
+        self.interval = interval
+        self.next_poll = next_poll
+        self.last_poll = None
+        self.last_change = None
+        self.signature = None
+        self.board = None
+        self.polls = 0
+        self.changes = 0
+        self.errors = 0
+
+    def __repr__(self):
+        return '<%s %r every %.0fs>' % (type(self).__name__, self.repo_id, self.interval)
+
+
+class PollingScheduler:
+    """ Polls many boards adaptively within a requests per minute budget
+
+    :type zenhub: :class:`zenhub.ZenHub`
+    :param zenhub: The client to poll with
+    :type repo_ids: iterable
+    :param repo_ids: The repositories to poll
+    :type requests_per_minute: float
+    :param requests_per_minute: The budget shared by all repositories
+    :type min_interval: float
+    :param min_interval: Seconds between polls of a board that just changed
+    :type max_interval: float
+    :param max_interval: The longest a quiet board waits between polls
+    :type backoff: float
+    :param backoff: How much longer a quiet board waits after each poll
+    :type on_change: callable
+    :param on_change: Called with ``(repo_id, board, diff)`` when a board changed
+    :type workspace_id: string
+    :param workspace_id: Poll the boards of this Workspace instead of the default ones
+    """
+
+    def __init__(self, zenhub, repo_ids, requests_per_minute=100, min_interval=30.0,
+                 max_interval=1800.0, backoff=2.0, on_change=None, workspace_id=None,
+                 clock=time.monotonic, sleep=time.sleep):
+        self.zenhub = zenhub
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.on_change = on_change
+        self.workspace_id = workspace_id
+        self.rate_limiter = RateLimiter(requests_per_minute, burst=1, clock=clock, sleep=sleep)
+        self.states = {}
+        self._clock = clock
+        self._recent = deque()
+        self._lock = threading.Lock()
+        for repo_id in repo_ids:
+            self.add(repo_id)
+
+    def add(self, repo_id):
+        """ Starts polling a repository, it is due right away """
+        with self._lock:
+            if repo_id not in self.states:
+                self.states[repo_id] = RepoState(repo_id, self.min_interval, self._clock())
+
+    def remove(self, repo_id):
+        """ Stops polling a repository """
+        with self._lock:
+            self.states.pop(repo_id, None)
+
+    def next_due(self):
+        """ Returns the state of the repository that is due first or ``None`` """
+        with self._lock:
+            return min(self.states.values(), key=lambda state: state.next_poll, default=None)
+
+    def poll(self, state):
+        """ Polls one repository now and adapts its interval
+
+        :return: the differences found, ``{}`` if the board did not change
+        :rtype: dict
+        """
+        now = self._clock()
+        self._prune(now)
+        self._recent.append(now)
+        state.polls += 1
+        try:
+            with priority(BULK):
+                if state.board is None:
+                    state.board = Board.find(self.zenhub.repository(state.repo_id),
+                                             workspace_id=self.workspace_id)
+                    found = state.board is not None
+                else:
+                    found = state.board.refresh()
+        except Exception as error:  # pylint: disable=broad-except
+            logger.warning('polling %s failed: %s', state.repo_id, error)
+            found = None
+            state.errors += 1
+        diff = {}
+        if found:
+            signature = board_signature(state.board.data)
+            if state.signature is not None:
+                diff = diff_boards(state.signature, signature)
+            state.signature = signature
+            state.last_poll = now
+        if diff:
+            state.changes += 1
+            state.last_change = now
+            state.interval = self.min_interval
+        else:
+            state.interval = min(self.max_interval, state.interval * self.backoff)
+        state.next_poll = now + state.interval
+        if diff and self.on_change is not None:
+            self.on_change(state.repo_id, state.board, diff)
+        return diff
+
+    def _prune(self, now):
+        """ Forgets the polls that are more than a minute old """
+        while self._recent and self._recent[0] <= now - 60:
+            self._recent.popleft()
+
+    def run_once(self):
+        """ Polls the repository that is due first if it is due and the budget allows
+
+        :return: the id of the repository that was polled or ``None``
+        """
+        state = self.next_due()
+        if state is None or state.next_poll > self._clock():
+            return None
+        if not self.rate_limiter.try_acquire():
+            return None
+        self.poll(state)
+        return state.repo_id
+
+    def run(self, stop=None):
+        """ Polls until ``stop`` (a :class:`threading.Event`) is set
+
+        :type stop: :class:`threading.Event`
+        :param stop: Set it from another thread to stop polling
+        """
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            if self.run_once() is not None:
+                continue
+            state = self.next_due()
+            wait = self.max_interval if state is None else max(0.0, state.next_poll - self._clock())
+            stop.wait(max(wait, self.rate_limiter.delay()))
+
+    def metrics(self):
+        """ Returns the budget use and the freshness of every repository
+
+        :rtype: dict
+        """
+        now = self._clock()
+        self._prune(now)
+        budget = self.rate_limiter.requests_per_minute
+        with self._lock:
+            states = list(self.states.values())
+        return {
+            'budget': {
+                'requests_per_minute': budget,
+                'used_last_minute': len(self._recent),
+                'utilization': len(self._recent) / budget if budget else 0.0,
+                'demand_per_minute': sum(60.0 / state.interval for state in states),
+            },
+            'repositories': {
+                state.repo_id: {
+                    'interval': state.interval,
+                    'age': None if state.last_poll is None else now - state.last_poll,
+                    'since_change': None if state.last_change is None else now - state.last_change,
+                    'due_in': state.next_poll - now,
+                    'polls': state.polls,
+                    'changes': state.changes,
+                    'errors': state.errors,
+                }
+                for state in states
+            },
+        }
@@ -0,0 +1,316 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2019 John J. Rofrano <rofrano@gmail.com>
+# All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Binary Snapshots
+
+Stores the data of a :class:`Board <zenhub.Board>`, :class:`Epic <zenhub.Epic>`
+or :class:`Workspace <zenhub.Workspace>` in a compact binary file that is
+memory mapped when it is loaded again. Opening a snapshot only reads the
+header, and looking up a single issue is a binary search over a sorted index,
+so even snapshots with hundreds of thousands of issues open instantly.
+
+File layout (all integers are little endian)::
+
+    header     magic, version, kind and the offsets of the sections below
+    groups     one 12 byte record per pipeline (pipeline data, first issue, count)
+    records    one 40 byte record per issue
+    index      one 24 byte record per issue sorted by (issue_number, repo_id)
+    strings    a table of string offsets followed by the utf-8 encoded strings
+
+Anything that does not fit a fixed-width field (e.g., the ``pipeline`` of an
+epic's issues) is kept as a JSON string in the string table.
+"""
+
+import os
+import json
+import mmap
+import struct
+from bisect import bisect_left
+
+MAGIC = b'ZHSN'
+VERSION = 1
+
+KIND_BOARD = 1
+KIND_EPIC = 2
+KIND_WORKSPACE = 3
+
+NONE = 0xFFFFFFFF
+
+# magic, version, kind, meta, group count, record count, string count,
+# groups offset, records offset, index offset, strings offset
+HEADER = struct.Struct('<4sHHIIII4xQQQQ')
+# pipeline data, first record, record count
+GROUP = struct.Struct('<III')
+# repo_id, issue_number, estimate, position, group, extra, flags
+RECORD = struct.Struct('<qqdiIIB3x')
+# issue_number, repo_id, record
+INDEX = struct.Struct('<qqI4x')
+OFFSET = struct.Struct('<Q')
+
+IS_EPIC = 0x01
+HAS_POSITION = 0x02
+HAS_ESTIMATE = 0x04
+HAS_REPO_ID = 0x08
+HAS_IS_EPIC = 0x10
+FLOAT_ESTIMATE = 0x20
+
+_RECORD_KEYS = ('issue_number', 'is_epic', 'position', 'estimate', 'repo_id')
+
+
+class SnapshotError(Exception):
+    """ Raised when a file is not a valid snapshot """
+
+
+class _StringTable:
+    """ Collects unique strings while a snapshot is written """
+
+    def __init__(self):
+        self.strings = []
+        self._ids = {}
+
+    def add(self, value):
+        """ Returns the index of a string, ``NONE`` for ``None`` """
+        if value is None:
+            return NONE
+        try:
+            return self._ids[value]
+        except KeyError:
+            self._ids[value] = len(self.strings)
+            self.strings.append(value)
+            return self._ids[value]
+
+    def add_json(self, value):
+        """ Returns the index of a value encoded as JSON """
+        if value is None:
+            return NONE
+        return self.add(json.dumps(value, separators=(',', ':'), sort_keys=True))
+
+
+def _pack_record(item, group, repo_id, strings):
+    """ Packs one issue dict into a fixed-width record """
+    flags = 0
+    extra = {key: value for key, value in item.items() if key not in _RECORD_KEYS}
+    if 'is_epic' in item:
+        flags |= HAS_IS_EPIC
+        if item['is_epic']:
+            flags |= IS_EPIC
+        if not isinstance(item['is_epic'], bool):
+            extra['is_epic'] = item['is_epic']
+    position = item.get('position')
+    if isinstance(position, int) and not isinstance(position, bool) and -2**31 <= position < 2**31:
+        flags |= HAS_POSITION
+    else:
+        position = 0
+        if 'position' in item:
+            extra['position'] = item['position']
+    estimate = item.get('estimate')
+    if (isinstance(estimate, dict) and list(estimate) == ['value']
+            and isinstance(estimate['value'], (int, float))
+            and not isinstance(estimate['value'], bool)):
+        flags |= HAS_ESTIMATE
+        if isinstance(estimate['value'], float):
+            flags |= FLOAT_ESTIMATE
+        estimate = float(estimate['value'])
+    else:
+        if 'estimate' in item:
+            extra['estimate'] = item['estimate']
+        estimate = 0.0
+    if 'repo_id' in item:
+        flags |= HAS_REPO_ID
+        repo_id = item['repo_id']
+    return RECORD.pack(repo_id or 0, item.get('issue_number', 0), estimate, position,
+                       group, strings.add_json(extra or None), flags)
+
+
+def write(path, kind, meta, groups, repo_id):
+    """ Writes a snapshot file
+
+    :type path: string
+    :param path: The file name of the snapshot
+    :type kind: int
+    :param kind: One of ``KIND_BOARD``, ``KIND_EPIC`` or ``KIND_WORKSPACE``
+    :type meta: dict
+    :param meta: The data that is not part of a group
+    :type groups: list
+    :param groups: A list of ``(data, issues)`` tuples, one per pipeline, where
+                   ``data`` is everything but the issues
+    :type repo_id: int
+    :param repo_id: The repository used to index issues without a ``repo_id``
+    """
+    strings = _StringTable()
+    meta_id = strings.add_json(meta)
+    group_bytes = bytearray()
+    record_bytes = bytearray()
+    index = []
+    count = 0
+    for number, (data, items) in enumerate(groups):
+        group_bytes += GROUP.pack(strings.add_json(data), count, len(items))
+        for item in items:
+            record_bytes += _pack_record(item, number, repo_id, strings)
+            index.append((item.get('issue_number', 0), item.get('repo_id', repo_id) or 0, count))
+            count += 1
+    index.sort()
+    index_bytes = b''.join(INDEX.pack(*entry) for entry in index)
+    encoded = [string.encode('utf-8') for string in strings.strings]
+    offsets = [0]
+    for value in encoded:
+        offsets.append(offsets[-1] + len(value))
+    string_bytes = b''.join(OFFSET.pack(offset) for offset in offsets) + b''.join(encoded)
+
+    groups_offset = HEADER.size
+    records_offset = groups_offset + len(group_bytes)
+    index_offset = records_offset + len(record_bytes)
+    strings_offset = index_offset + len(index_bytes)
+    header = HEADER.pack(MAGIC, VERSION, kind, meta_id, len(groups), count, len(encoded),
+                         groups_offset, records_offset, index_offset, strings_offset)
+    with open(path, 'wb') as snapshot:
+        snapshot.write(header)
+        snapshot.write(group_bytes)
+        snapshot.write(record_bytes)
+        snapshot.write(index_bytes)
+        snapshot.write(string_bytes)
+
+
+class Snapshot:
+    """ A memory mapped snapshot file
+
+    :type path: string
+    :param path: The file name of the snapshot
+
+    :raise SnapshotError: the file is not a snapshot
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as snapshot:
+            if os.fstat(snapshot.fileno()).st_size < HEADER.size:
+                raise SnapshotError(f'{path} is not a ZenHub snapshot')
+            self._mmap = mmap.mmap(snapshot.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            (magic, version, self.kind, meta_id, self.group_count, self.record_count,
+             self.string_count, self._groups, self._records, self._index,
+             self._strings) = HEADER.unpack_from(self._mmap, 0)
+            if magic != MAGIC:
+                raise SnapshotError(f'{path} is not a ZenHub snapshot')
+            if version != VERSION:
+                raise SnapshotError(f'{path} has unsupported version {version}')
+            self._string_data = self._strings + OFFSET.size * (self.string_count + 1)
+            self.meta = self._json(meta_id)
+        except Exception:
+            self._mmap.close()
+            raise
+
+    def __len__(self):
+        return self.record_count
+
+    def __repr__(self):
+        return '<%s %r>' % (type(self).__name__, self.path)
+
+    def close(self):
+        """ Unmaps the file """
+        self._mmap.close()
+
+    def _string(self, string_id):
+        """ Returns a string from the string table """
+        if string_id == NONE:
+            return None
+        start, end = struct.unpack_from('<QQ', self._mmap, self._strings + OFFSET.size * string_id)
+        return self._mmap[self._string_data + start:self._string_data + end].decode('utf-8')
+
+    def _json(self, string_id):
+        """ Returns a JSON value from the string table """
+        value = self._string(string_id)
+        return {} if value is None else json.loads(value)
+
+    def record(self, number):
+        """ Returns the issue dict of the record at ``number`` """
+        (repo_id, issue_number, estimate, position, _, extra_id,
+         flags) = RECORD.unpack_from(self._mmap, self._records + RECORD.size * number)
+        item = {'issue_number': issue_number}
+        if flags & HAS_IS_EPIC:
+            item['is_epic'] = bool(flags & IS_EPIC)
+        if flags & HAS_POSITION:
+            item['position'] = position
+        if flags & HAS_REPO_ID:
+            item['repo_id'] = repo_id
+        extra = self._json(extra_id)
+        if flags & HAS_ESTIMATE:
+            if not flags & FLOAT_ESTIMATE:
+                estimate = int(estimate)
+            item['estimate'] = {'value': estimate}
+        item.update(extra)
+        return item
+
+    def group(self, number):
+        """ Returns the pipeline dict of the group at ``number`` with all of its issues """
+        data_id, first, count = GROUP.unpack_from(self._mmap, self._groups + GROUP.size * number)
+        data = self._json(data_id)
+        data['issues'] = [self.record(index) for index in range(first, first + count)]
+        return data
+
+    def groups(self):
+        """ Returns every pipeline dict """
+        return [self.group(number) for number in range(self.group_count)]
+
+    def _index_entry(self, position):
+        return INDEX.unpack_from(self._mmap, self._index + INDEX.size * position)
+
+    def lookup(self, issue_number, repo_id=None):
+        """ Finds an issue without reading the rest of the snapshot
+
+        :type issue_number: int
+        :param issue_number: The number of the issue
+        :type repo_id: int
+        :param repo_id: The repository of the issue (the first match if ``None``)
+
+        :return: ``(group number, issue dict)`` or ``None`` if not found
+        :rtype: tuple or None
+        """
+        entries = _IndexView(self)
+        position = bisect_left(entries, (issue_number, -2**63 if repo_id is None else repo_id))
+        if position < self.record_count:
+            number, entry_repo_id, record = self._index_entry(position)
+            if number == issue_number and (repo_id is None or entry_repo_id == repo_id):
+                group = RECORD.unpack_from(self._mmap, self._records + RECORD.size * record)[4]
+                return group, self.record(record)
+        return None
+
+
+class _IndexView:
+    """ A read-only sequence of (issue_number, repo_id) keys for bisect """
+
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+
+    def __len__(self):
+        return self.snapshot.record_count
+
+    def __getitem__(self, position):
+        return self.snapshot._index_entry(position)[:2]
+
+
+def load(path, kind):
+    """ Opens a snapshot and checks that it holds the expected kind of data
+
+    :raise SnapshotError: the file is not a snapshot of this kind
+    """
+    snapshot = Snapshot(path)
+    if snapshot.kind != kind:
+        snapshot.close()
+        raise SnapshotError(f'{path} is not a snapshot of this type')
+    return snapshot
@@ -0,0 +1,278 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2019 John J. Rofrano <rofrano@gmail.com>
+# All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Token Pool
+
+The ZenHub API allows each token a limited number of requests per minute. A
+:class:`TokenPool` is a transport that sends every request with one of
+several tokens (e.g., of service accounts) so that a client can use the
+budget of all of them::
+
+    zen = ZenHub.with_tokens(['token-1', 'token-2', 'token-3'])
+
+The budget of each token is tracked locally and corrected with the
+``X-RateLimit-Limit``, ``X-RateLimit-Used`` and ``X-RateLimit-Reset``
+headers of its responses. Requests go to the token with the most budget
+left (``'least-loaded'``) or to the tokens in turn (``'round-robin'``).
+When every token is used up the request waits for the first one to be
+reset, within the current deadline (see :mod:`zenhub.deadline`).
+
+A token that gets a ``401`` or ``403`` response is cooled down for
+``cooldown`` seconds and a ``429`` response uses up its budget until the
+reset; the request is sent again with another token. :meth:`TokenPool.stats`
+has the counters of every token.
+"""
+
+import time
+import threading
+from . import deadline as deadlines
+from .deadline import DeadlineExceeded
+from .transport import Transport
+
+LEAST_LOADED = 'least-loaded'
+ROUND_ROBIN = 'round-robin'
+STRATEGIES = (LEAST_LOADED, ROUND_ROBIN)
+
+TOKEN_HEADER = 'X-Authentication-Token'
+
+# responses that cool a token down
+_AUTH_FAILURES = (401, 403)
+_TOO_MANY_REQUESTS = 429
+
+
+class NoTokenAvailable(Exception):
+    """ A request was not sent because every token is cooling down """
+
+
+def _header(headers, name):
+    """ Returns a response header as a float or ``None`` if it is missing or invalid """
+    value = headers.get(name)
+    if value is None:
+        value = headers.get(name.lower())
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class _Token:
+    """ The budget and counters of one token (guarded by the lock of the pool) """
+
+    def __init__(self, index, token, limit, now):
+        self.index = index
+        self.token = token
+        self.limit = limit
+        self.used = 0
+        self.reset_at = now + 60.0
+        self.cooled_until = 0.0
+        self.in_flight = 0
+        self.requests = 0
+        self.auth_failures = 0
+        self.throttled = 0
+
+    @property
+    def name(self):
+        """ The token masked for logs and metrics, with its place in the pool
+        so that tokens ending alike stay apart """
+        return '%d:...%s' % (self.index, self.token[-4:])
+
+    def roll(self, now):
+        """ Starts a new window once the reset time has passed """
+        if now >= self.reset_at:
+            self.used = 0
+            self.reset_at = now + 60.0
+
+    def remaining(self, now):
+        """ The requests this token may still send in this window """
+        if now < self.cooled_until:
+            return 0
+        self.roll(now)
+        return max(0, self.limit - self.used - self.in_flight)
+
+
+class TokenPool(Transport):
+    """ Sends the requests of a client with several tokens
+
+    :type transport: :class:`zenhub.transport.Transport`
+    :param transport: The transport that sends the requests
+    :type tokens: list
+    :param tokens: The ZenHub API tokens
+    :type requests_per_minute: int
+    :param requests_per_minute: The budget of a token until its responses tell otherwise
+    :type strategy: string
+    :param strategy: ``'least-loaded'`` or ``'round-robin'``
+    :type cooldown: float
+    :param cooldown: The seconds a token is not used after a ``401`` or ``403``
+
+    :raise ValueError: no tokens or an unknown strategy
+    """
+
+    def __init__(self, transport, tokens, requests_per_minute=100, strategy=LEAST_LOADED,
+                 cooldown=300.0, clock=time.monotonic, sleep=time.sleep, wall=time.time):
+        tokens = list(dict.fromkeys(tokens))
+        if not tokens:
+            raise ValueError('a token pool needs at least one token')
+        if strategy not in STRATEGIES:
+            raise ValueError(f'unknown strategy {strategy!r}, '
+                             f'expected one of {", ".join(STRATEGIES)}')
+        self.transport = transport
+        self.strategy = strategy
+        self.cooldown = cooldown
+        self.waited = 0.0
+        self._clock = clock
+        self._sleep = sleep
+        self._wall = wall
+        now = clock()
+        self._tokens = [_Token(index, token, requests_per_minute, now)
+                        for index, token in enumerate(tokens)]
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return '<%s %d tokens %s>' % (type(self).__name__, len(self._tokens), self.strategy)
+
+    def _select(self, now, exclude):
+        """ Takes a request from the budget of a token or returns ``None`` (hold the lock) """
+        count = len(self._tokens)
+        rotation = [self._tokens[(self._next + offset) % count] for offset in range(count)]
+        candidates = [state for state in rotation
+                      if state not in exclude and state.remaining(now) > 0]
+        if not candidates:
+            return None
+        if self.strategy == ROUND_ROBIN:
+            state = candidates[0]
+        else:
+            # the first of the tokens with the most budget, in turn
+            state = max(candidates, key=lambda candidate: candidate.remaining(now))
+        self._next = (self._tokens.index(state) + 1) % count
+        state.in_flight += 1
+        state.requests += 1
+        return state
+
+    def _acquire(self, exclude):
+        """ Waits until a token may send a request, within the current deadline
+
+        :return: the token or ``None`` if every token that was not tried is cooling down
+
+        :raise DeadlineExceeded: the deadline expires before a token has budget
+        """
+        while True:
+            with self._lock:
+                now = self._clock()
+                state = self._select(now, exclude)
+                if state is not None:
+                    return state
+                pending = [state for state in self._tokens
+                           if state not in exclude and now >= state.cooled_until]
+                if not pending:
+                    return None
+                wait = min(state.reset_at for state in pending) - now
+            remaining = deadlines.remaining()
+            if remaining is not None and remaining < wait:
+                raise DeadlineExceeded('deadline exceeded waiting for a token with budget')
+            wait = max(wait, 0.001)
+            self._sleep(wait)
+            with self._lock:
+                self.waited += wait
+
+    def _record(self, state, response):
+        """ Updates the budget of a token from a response """
+        with self._lock:
+            now = self._clock()
+            state.in_flight -= 1
+            if response is None:
+                return
+            limit = _header(response.headers, 'X-RateLimit-Limit')
+            used = _header(response.headers, 'X-RateLimit-Used')
+            reset = _header(response.headers, 'X-RateLimit-Reset')
+            state.roll(now)
+            if limit is not None:
+                state.limit = int(limit)
+            if reset is not None:
+                reset_at = now + max(0.0, reset - self._wall())
+                if reset_at > state.reset_at + 1.0:
+                    # the server started a new window, its count replaces ours
+                    state.used = 0
+                state.reset_at = reset_at
+            if used is not None:
+                state.used = max(state.used, int(used))
+            else:
+                state.used += 1
+            if response.status_code in _AUTH_FAILURES:
+                state.auth_failures += 1
+                state.cooled_until = now + self.cooldown
+            elif response.status_code == _TOO_MANY_REQUESTS:
+                # used up until the reset, which the headers may have moved
+                state.throttled += 1
+                state.used = max(state.used, state.limit)
+
+    def request(self, method, url, headers, data=None, timeout=None):
+        """ Sends the request with a token that has budget left
+
+        A request that gets a ``401``, ``403`` or ``429`` response is sent
+        again with another token, and the last response is returned once
+        every token was tried.
+
+        :raise NoTokenAvailable: every token is cooling down
+        :raise DeadlineExceeded: the deadline expires before a token has budget
+        """
+        tried = []
+        response = None
+        while True:
+            state = self._acquire(tried)
+            if state is None:
+                if response is None:
+                    raise NoTokenAvailable(f'every token is cooling down, '
+                                           f'{method} {url} was not sent')
+                return response
+            tried.append(state)
+            try:
+                response = self.transport.request(
+                    method, url, dict(headers, **{TOKEN_HEADER: state.token}), data,
+                    timeout=timeout)
+            except Exception:
+                self._record(state, None)
+                raise
+            self._record(state, response)
+            if response.status_code not in _AUTH_FAILURES + (_TOO_MANY_REQUESTS,):
+                return response
+
+    def stats(self):
+        """ Returns the counters of every token by its masked name (e.g. ``'0:...a1b2'``)
+
+        :return: ``requests``, ``remaining``, ``limit``, ``auth_failures``,
+                 ``throttled``, ``cooling`` and ``in_flight`` by token
+        :rtype: dict
+        """
+        with self._lock:
+            now = self._clock()
+            return {
+                state.name: {
+                    'requests': state.requests,
+                    'remaining': state.remaining(now),
+                    'limit': state.limit,
+                    'auth_failures': state.auth_failures,
+                    'throttled': state.throttled,
+                    'cooling': now < state.cooled_until,
+                    'in_flight': state.in_flight,
+                }
+                for state in self._tokens
+            }
+
+    def close(self):
+        self.transport.close()
@@ -0,0 +1,471 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2019 John J. Rofrano <rofrano@gmail.com>
+# All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+ZenHub Transports
+
+A Transport is the object that the :class:`ZenHub <zenhub.ZenHub>` client uses
+to actually send an http request and receive a response. Swapping the
+transport lets you capture real traffic and serve it again later without a
+network connection:
+
+    - RequestsTransport (the default) talks to the ZenHub API using ``requests``
+    - RecordingTransport wraps another transport and writes every request and
+      response to a cassette file
+    - ReplayTransport serves the responses stored in a cassette file with an
+      optional simulated latency
+
+Cassettes are gzip compressed files with one JSON document per line.
+
+:class:`RequestsTransport` asks for compressed responses (gzip and deflate,
+and brotli when ``brotli`` or ``brotlicffi`` is installed), reads bodies in
+chunks and counts the bytes received on the wire and after decompression for
+every endpoint in its :class:`TransferStats`::
+
+    zen.repository(1234567).board()
+    print(zen.transport.stats.endpoints())
+
+Example::
+
+    with RecordingTransport('workspace.cassette') as recorder:
+        zen = ZenHub('access_token', transport=recorder)
+        zen.repository(1234567).board()
+
+    zen = ZenHub('access_token', transport=ReplayTransport('workspace.cassette'))
+    board = zen.repository(1234567).board()
+
+"""
+
+import re
+import json
+import time
+import threading
+from collections import deque
+from collections.abc import MutableMapping
+from importlib.util import find_spec
+from urllib.parse import urlsplit
+
+# numeric ids, ObjectIds and whatever follows /workspaces (its ids are ObjectIds)
+_ID = re.compile(r'/(?:\d+|[0-9a-f]{24})(?=/|$)|(?<=/workspaces)/[^/]+')
+
+
+def accept_encoding():
+    """ Returns the content codings that responses can be decoded from """
+    codings = ['gzip', 'deflate']
+    if find_spec('brotli') or find_spec('brotlicffi'):
+        codings.append('br')
+    return ', '.join(codings)
+
+
+def endpoint(url):
+    """ Returns the path of a url with ids replaced
+
+    For example ``/p2/workspaces/:id/repositories/:id/board``, so that every
+    repository and workspace shares one endpoint.
+    """
+    return _ID.sub('/:id', urlsplit(url).path)
+
+
+class TransferStats:
+    """ Counts the bytes received for every endpoint
+
+    ``wire_bytes`` are the bytes received from the network (compressed) and
+    ``body_bytes`` the bytes of the decoded bodies. It is safe to share
+    between threads.
+    """
+
+    def __init__(self):
+        self._endpoints = {}
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        totals = self.totals()
+        return '<%s %d/%d bytes>' % (type(self).__name__, totals['wire_bytes'], totals['body_bytes'])
+
+    def record(self, url, wire_bytes, body_bytes):
+        """ Adds one response to the counts of its endpoint
+
+        :type url: string
+        :param url: The url of the request
+        :type wire_bytes: int
+        :param wire_bytes: The bytes received from the network
+        :type body_bytes: int
+        :param body_bytes: The bytes of the decoded body
+        """
+        key = endpoint(url)
+        with self._lock:
+            counts = self._endpoints.get(key)
+            if counts is None:
+                counts = self._endpoints[key] = {'requests': 0, 'wire_bytes': 0, 'body_bytes': 0}
+            counts['requests'] += 1
+            counts['wire_bytes'] += wire_bytes
+            counts['body_bytes'] += body_bytes
+
+    def endpoints(self):
+        """ Returns a copy of the counts of every endpoint
+
+        :rtype: dict
+        """
+        with self._lock:
+            return {key: dict(counts) for key, counts in self._endpoints.items()}
+
+    def totals(self):
+        """ Returns the counts of all of the endpoints added up
+
+        ``savings`` is the fraction of the decoded bytes that compression
+        kept off the network.
+
+        :rtype: dict
+        """
+        totals = {'requests': 0, 'wire_bytes': 0, 'body_bytes': 0}
+        for counts in self.endpoints().values():
+            for key in totals:
+                totals[key] += counts[key]
+        body = totals['body_bytes']
+        totals['savings'] = 1 - totals['wire_bytes'] / body if body else 0.0
+        return totals
+
+    def reset(self):
+        """ Sets all of the counts back to zero """
+        with self._lock:
+            self._endpoints = {}
+
+
+class Transport:
+    """ Base class for all transports
+
+    Subclasses must implement :meth:`request` and return an object that
+    behaves like a :class:`requests.Response` (``status_code``, ``headers``,
+    ``content``, ``json()`` and ``raise_for_status()``). :meth:`request` may be
+    called from many threads at once.
+    """
+
+    def request(self, method, url, headers, data=None, timeout=None):
+        """ Sends an http request
+
+        :type method: string
+        :param method: The http method (e.g., ``'GET'``)
+        :type url: string
+        :param url: The fully qualified url of the request
+        :type headers: dict
+        :param headers: The http headers to send
+        :type data: bytes
+        :param data: The encoded JSON body or ``None``
+        :type timeout: tuple
+        :param timeout: The ``(connect, read)`` timeouts in seconds or ``None`` to wait forever
+
+        :return: The http response
+        :rtype: :class:`requests.Response`
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """ Releases any resources held by this transport """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class RequestsTransport(Transport):
+    """ Sends requests to the ZenHub API using the ``requests`` library
+
+    :type session: :class:`requests.Session`
+    :param session: A session to reuse connections with. Without a session
+                    every request opens a new connection.
+    :type session_factory: callable
+    :param session_factory: Creates one session per thread instead of sharing
+                            ``session`` (``requests.Session`` is not guaranteed
+                            to be thread-safe)
+    :type chunk_size: int
+    :param chunk_size: The number of bytes to read from a response body at a time
+
+    The bytes received are counted in :attr:`stats`.
+    """
+
+    def __init__(self, session=None, session_factory=None, chunk_size=64 * 1024):
+        self.session = session
+        self.session_factory = session_factory
+        self.chunk_size = chunk_size
+        self.stats = TransferStats()
+        self._accept_encoding = None
+        self._local = threading.local()
+        self._sessions = []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def pooled(cls, pool_size=10):
+        """ Returns a transport that keeps connections alive in every thread
+
+        Every thread gets its own session with a pool of up to ``pool_size``
+        connections, so threads never contend for a shared session.
+
+        :type pool_size: int
+        :param pool_size: The maximum number of connections to keep open per
+                          host in each thread
+
+        :rtype: :class:`RequestsTransport`
+        """
+        def session_factory():
+            import requests
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size,
+                                                    pool_maxsize=pool_size)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            return session
+        return cls(session_factory=session_factory)
+
+    def _session(self):
+        """ Returns the session of the calling thread or ``None`` """
+        if self.session_factory is None:
+            return self.session
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = self.session_factory()
+            with self._lock:
+                self._sessions.append(session)
+        return session
+
+    def request(self, method, url, headers, data=None, timeout=None):
+        session = self._session()
+        if session is not None:
+            send = getattr(session, method.lower())
+        else:
+            import requests
+            send = getattr(requests, method.lower())
+        if self._accept_encoding is None:
+            self._accept_encoding = accept_encoding()
+        headers = dict(headers, **{'Accept-Encoding': self._accept_encoding})
+        if data is None:
+            response = send(url, headers=headers, timeout=timeout, stream=True)
+        else:
+            response = send(url, data=data, headers=headers, timeout=timeout, stream=True)
+        return self._read(response, url)
+
+    def _read(self, response, url):
+        """ Reads a streamed response body in chunks and counts its bytes """
+        raw = getattr(response, 'raw', None)
+        if raw is None or getattr(response, '_content', None) is not False:
+            # not a streamed requests.Response, there is nothing to read
+            return response
+        body = bytearray()
+        for chunk in response.iter_content(self.chunk_size):
+            body += chunk
+        response._content = bytes(body)
+        wire_bytes = raw.tell() if hasattr(raw, 'tell') else len(body)
+        self.stats.record(url, wire_bytes, len(body))
+        return response
+
+    def close(self):
+        with self._lock:
+            sessions, self._sessions = self._sessions, []
+        self._local = threading.local()
+        if self.session is not None:
+            sessions.append(self.session)
+        for session in sessions:
+            session.close()
+
+
+class _Headers(MutableMapping):
+    """ Response headers that are looked up without regard to case, like the
+    headers of a :class:`requests.Response` (which are not imported for this) """
+
+    def __init__(self, headers=()):
+        self._headers = {}
+        self.update(headers)
+
+    def __getitem__(self, name):
+        return self._headers[name.lower()][1]
+
+    def __setitem__(self, name, value):
+        self._headers[name.lower()] = (name, value)
+
+    def __delitem__(self, name):
+        del self._headers[name.lower()]
+
+    def __iter__(self):
+        return (name for name, _ in self._headers.values())
+
+    def __len__(self):
+        return len(self._headers)
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+
+class CassetteResponse:
+    """ A response that was read back from a cassette
+
+    The headers are looked up without regard to case.
+    """
+
+    def __init__(self, status_code, headers, content, url=None):
+        self.status_code = status_code
+        self.headers = _Headers(headers or {})
+        self.content = content
+        self.url = url
+
+    def __repr__(self):
+        return '<%s [%d]>' % (type(self).__name__, self.status_code)
+
+    @property
+    def text(self):
+        """ The content of the response as a string """
+        return self.content.decode('utf-8')
+
+    def json(self):
+        """ Returns the json decoded content of the response """
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        """ Raises :class:`requests.exceptions.HTTPError` for error status codes """
+        if self.status_code >= 400:
+            from requests.exceptions import HTTPError
+            raise HTTPError(f'{self.status_code} Error for url: {self.url}', response=self)
+
+
+def _interaction_key(method, url, body):
+    """ Returns the key used to match a request against a cassette
+
+    The body is normalized so that it matches no matter which codec encoded it.
+    """
+    if isinstance(body, (bytes, str)):
+        body = json.loads(body)
+    if body is not None:
+        body = json.dumps(body, sort_keys=True, separators=(',', ':'))
+    return (method.upper(), url, body)
+
+
+class RecordingTransport(Transport):
+    """ Records every request and response to a cassette file
+
+    :type path: string
+    :param path: The file name of the cassette to write
+    :type transport: :class:`Transport`
+    :param transport: The transport that really sends the requests
+                      (defaults to :class:`RequestsTransport`)
+
+    Call :meth:`close` (or use the transport as a context manager) to make
+    sure the cassette is completely written to disk.
+    """
+
+    def __init__(self, path, transport=None):
+        self.path = path
+        self.transport = transport or RequestsTransport()
+        import gzip
+        self._file = gzip.open(path, 'wt', encoding='utf-8')
+        self._lock = threading.Lock()
+
+    def request(self, method, url, headers, data=None, timeout=None):
+        started = time.perf_counter()
+        response = self.transport.request(method, url, headers, data, timeout=timeout)
+        elapsed = time.perf_counter() - started
+        # the content is recorded decoded, so the headers must describe it as it is
+        recorded_headers = _Headers(response.headers or {})
+        for name in ('Content-Encoding', 'Transfer-Encoding'):
+            recorded_headers.pop(name, None)
+        recorded_headers['Content-Length'] = str(len(response.content))
+        interaction = {
+            'method': method.upper(),
+            'url': url,
+            'body': None if data is None else json.loads(data),
+            'status': response.status_code,
+            'headers': dict(recorded_headers),
+            'content': response.content.decode('utf-8'),
+            'elapsed': round(elapsed, 6),
+        }
+        line = json.dumps(interaction, separators=(',', ':')) + '\n'
+        with self._lock:
+            self._file.write(line)
+        return response
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+        self.transport.close()
+
+
+class ReplayTransport(Transport):
+    """ Serves responses that were recorded in a cassette file
+
+    Requests are matched by method, url and body. When the same request was
+    recorded more than once the responses are served in the order they were
+    recorded and the last one is repeated after that.
+
+    :type path: string
+    :param path: The file name of the cassette to read
+    :type latency: float or string
+    :param latency: ``None`` for no delay, a number of seconds to sleep before
+                    every response, or ``'recorded'`` to replay the latency that
+                    was measured when the cassette was recorded
+    :type speed: float
+    :param speed: Divides the recorded latency (e.g., ``2.0`` replays twice as fast)
+
+    :raise KeyError: a request was made that is not in the cassette
+    """
+
+    RECORDED = 'recorded'
+
+    def __init__(self, path, latency=None, speed=1.0):
+        self.path = path
+        self.latency = latency
+        self.speed = speed
+        self._interactions = {}
+        self._lock = threading.Lock()
+        import gzip
+        with gzip.open(path, 'rt', encoding='utf-8') as cassette:
+            for line in cassette:
+                if not line.strip():
+                    continue
+                interaction = json.loads(line)
+                key = _interaction_key(interaction['method'], interaction['url'],
+                                       interaction['body'])
+                self._interactions.setdefault(key, deque()).append(interaction)
+
+    def __len__(self):
+        return sum(len(interactions) for interactions in self._interactions.values())
+
+    def request(self, method, url, headers, data=None, timeout=None):
+        key = _interaction_key(method, url, data)
+        try:
+            interactions = self._interactions[key]
+        except KeyError:
+            raise KeyError(f'{method.upper()} {url} was not recorded in {self.path}') from None
+        with self._lock:
+            interaction = interactions.popleft() if len(interactions) > 1 else interactions[0]
+        self._sleep(interaction)
+        return CassetteResponse(
+            interaction['status'],
+            interaction['headers'],
+            interaction['content'].encode('utf-8'),
+            url=url
+        )
+
+    def _sleep(self, interaction):
+        """ Simulates the network latency """
+        if self.latency is None:
+            return
+        if self.latency == self.RECORDED:
+            delay = interaction.get('elapsed', 0.0) / self.speed
+        else:
+            delay = self.latency
+        if delay > 0:
+            time.sleep(delay)
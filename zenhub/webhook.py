@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2019 John J. Rofrano <rofrano@gmail.com>
+# All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Webhook Receiver
+
+Keeps cached :class:`Board <zenhub.Board>` objects up to date from ZenHub
+webhooks (a "Custom" integration in ZenHub) instead of polling
+``GET /p1/repositories/:repo_id/board``. Every event is applied to the board
+in place. A board is only fetched again when an event does not match it
+(e.g., an issue is not in the pipeline it is said to move from), which means
+the local copy has drifted. The fetch runs outside the receiver's lock, and
+when it fails the event is answered with ``502`` so ZenHub can send it again.
+
+The receiver is a WSGI application, so it can be mounted in any WSGI server,
+or served on its own with the standard library::
+
+    receiver = WebhookReceiver()
+    receiver.watch(repo.board(), 'ZenHubIO/support')
+    server = receiver.make_server('0.0.0.0', 8080)
+    server.serve_forever()
+
+Handled events:
+
+    ``issue_transfer``       an issue moved to another pipeline
+    ``issue_reprioritized``  an issue moved within a pipeline
+    ``estimate_set``         an issue was estimated
+    ``estimate_cleared``     an issue estimate was removed
+
+"""
+
+import json
+import logging
+import threading
+from urllib.parse import parse_qsl
+from wsgiref.simple_server import make_server, WSGIRequestHandler
+
+logger = logging.getLogger(__name__)
+
+APPLIED = 'applied'
+REFETCHED = 'refetched'
+IGNORED = 'ignored'
+FAILED = 'failed'
+
+
+class WebhookError(Exception):
+    """ Raised when a webhook payload cannot be parsed """
+
+
+def _int(value):
+    """ Webhook fields are strings, returns them as a number or ``None`` """
+    if value in (None, ''):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            raise WebhookError(f'{value!r} is not a number') from None
+
+
+class WebhookReceiver:
+    """ Applies ZenHub webhook events to cached Boards
+
+    :type refetch: bool
+    :param refetch: Fetch a board again when an event shows it has drifted
+    """
+
+    def __init__(self, refetch=True):
+        self.refetch = refetch
+        self.boards = {}
+        self.stats = {APPLIED: 0, REFETCHED: 0, IGNORED: 0, FAILED: 0}
+        self._lock = threading.Lock()
+
+    def watch(self, board, full_name):
+        """ Keeps a Board up to date
+
+        :type board: :class:`zenhub.Board`
+        :param board: The board to update
+        :type full_name: string
+        :param full_name: The GitHub ``owner/name`` of the board's repository
+        """
+        with self._lock:
+            self.boards[full_name.lower()] = board
+
+    def unwatch(self, full_name):
+        """ Stops updating the Board of a repository """
+        with self._lock:
+            self.boards.pop(full_name.lower(), None)
+
+    def board(self, full_name):
+        """ Returns the watched Board of a repository or ``None`` """
+        return self.boards.get(full_name.lower())
+
+    def handle(self, payload):
+        """ Applies one webhook event
+
+        :type payload: dict
+        :param payload: The webhook payload
+
+        :return: ``'applied'``, ``'refetched'``, ``'ignored'`` or ``'failed'``
+                 when the board drifted and could not be fetched again
+        :rtype: str
+
+        :raise WebhookError: the payload is missing required fields
+        """
+        try:
+            event = payload['type']
+            full_name = f"{payload['organization']}/{payload['repo']}"
+            issue_number = _int(payload['issue_number'])
+        except KeyError as error:
+            raise WebhookError(f'missing field {error}') from None
+
+        drifted = None
+        with self._lock:
+            board = self.board(full_name)
+            if board is None:
+                result = IGNORED
+            else:
+                applied = self._apply(board, event, issue_number, payload)
+                if applied is None:
+                    result = IGNORED
+                elif applied:
+                    result = APPLIED
+                elif self.refetch:
+                    drifted = board
+                else:
+                    result = IGNORED
+            if drifted is None:
+                self.stats[result] += 1
+                return result
+
+        # the fetch may take seconds, other events are applied meanwhile
+        logger.info('%s drifted on %s #%s, fetching it again', full_name, event, issue_number)
+        try:
+            result = REFETCHED if drifted.refresh() else FAILED
+        except Exception as error:  # pylint: disable=broad-except
+            logger.warning('fetching %s again failed: %s', full_name, error)
+            result = FAILED
+        with self._lock:
+            self.stats[result] += 1
+        return result
+
+    @staticmethod
+    def _apply(board, event, issue_number, payload):
+        """ Applies an event to a board, ``None`` for unknown events """
+        if event == 'issue_transfer':
+            return board.move_issue(issue_number, payload.get('to_pipeline_name'),
+                                    from_pipeline=payload.get('from_pipeline_name'))
+        if event == 'issue_reprioritized':
+            pipeline = payload.get('to_pipeline_name')
+            return board.move_issue(issue_number, pipeline, _int(payload.get('to_position')),
+                                    from_pipeline=pipeline,
+                                    from_position=_int(payload.get('from_position')))
+        if event == 'estimate_set':
+            return board.set_estimate(issue_number, _int(payload.get('estimate')))
+        if event == 'estimate_cleared':
+            return board.set_estimate(issue_number, None)
+        return None
+
+    @staticmethod
+    def parse(body, content_type):
+        """ Parses a webhook request body
+
+        ZenHub sends form encoded payloads, JSON is accepted as well.
+
+        :type body: bytes
+        :param body: The request body
+        :type content_type: string
+        :param content_type: The ``Content-Type`` header of the request
+
+        :rtype: dict
+        :raise WebhookError: the body cannot be parsed
+        """
+        try:
+            if 'json' in (content_type or ''):
+                payload = json.loads(body)
+            else:
+                payload = dict(parse_qsl(body.decode('utf-8'), keep_blank_values=True))
+        except ValueError as error:
+            raise WebhookError(str(error)) from None
+        if not isinstance(payload, dict):
+            raise WebhookError('the payload is not an object')
+        return payload
+
+    def __call__(self, environ, start_response):
+        """ The WSGI application """
+        if environ.get('REQUEST_METHOD') != 'POST':
+            return self._respond(start_response, '405 Method Not Allowed', {'error': 'POST only'})
+        try:
+            length = int(environ.get('CONTENT_LENGTH') or 0)
+            payload = self.parse(environ['wsgi.input'].read(length), environ.get('CONTENT_TYPE'))
+            result = self.handle(payload)
+        except WebhookError as error:
+            return self._respond(start_response, '400 Bad Request', {'error': str(error)})
+        if result == FAILED:
+            return self._respond(start_response, '502 Bad Gateway', {'result': result})
+        return self._respond(start_response, '200 OK', {'result': result})
+
+    @staticmethod
+    def _respond(start_response, status, body):
+        content = json.dumps(body).encode('utf-8')
+        start_response(status, [('Content-Type', 'application/json'),
+                                ('Content-Length', str(len(content)))])
+        return [content]
+
+    def make_server(self, host='127.0.0.1', port=8080):
+        """ Returns a standard library WSGI server for this receiver
+
+        Call ``serve_forever()`` on it (in a thread if needed) and
+        ``shutdown()`` to stop it. Use port ``0`` to pick a free port.
+
+        :rtype: :class:`wsgiref.simple_server.WSGIServer`
+        """
+        return make_server(host, port, self, handler_class=_QuietHandler)
+
+
+class _QuietHandler(WSGIRequestHandler):
+    """ Logs requests through :mod:`logging` instead of stderr """
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        logger.debug(format, *args)
@@ -21,7 +21,7 @@ ZenHub Workspace
 Based on ZenHub API @ https://github.com/ZenHubIO/API
 """
 
-import json
+from .profiling import profiled
 from .board import Board
 
 class Workspace:
@@ -49,7 +49,8 @@ class Workspace:
         return '<%s %r>' % (type(self).__name__, self.repo.id)
 
     def __str__(self):
-        return '<%s %r>\n' % (type(self).__name__, self.repo.id) + json.dumps(self.data, indent=4)
+        return ('<%s %r>\n' % (type(self).__name__, self.repo.id)
+                + self.repo.zenhub.codec.dumps(self.data, indent=True))
 
     @property
     def name(self):
@@ -91,10 +92,14 @@ class Workspace:
         except KeyError:
             return []
 
-    def board(self):
+    @profiled
+    def board(self, fields=None):
         """
         Get ZenHub Board data for a repository (repo_id) within the Workspace (workspace_id)
 
+        :type fields: list
+        :param fields: Only keep these fields of each issue (keeps all if ``None``)
+
         :calls: `GET /p2/workspaces/:workspace_id/repositories/:repo_id/board
                 <https://github.com/ZenHubIO/API#get-a-zenhub-board-for-a-repository>`_
 
@@ -102,7 +107,35 @@ class Workspace:
         :rtype: :class:`zenhub.Board`
 
         """
-        data = self.repo.zenhub.get(f'/p2/workspaces/{self.id}/repositories/{self.repo.id}/board')
-        if data:
-            return Board(data, self.repo)
-        return None
+        return Board.find(self.repo, fields=fields, workspace_id=self.id)
+
+    def save(self, path):
+        """ Saves this Workspace to a binary snapshot file
+
+        :type path: string
+        :param path: The file name of the snapshot
+
+        """
+        from . import snapshot
+        snapshot.write(path, snapshot.KIND_WORKSPACE, {'data': self.data}, [], self.repo.id)
+
+    @staticmethod
+    def load(path, repo):
+        """ Loads a Workspace from a binary snapshot file
+
+        :type path: string
+        :param path: The file name of the snapshot
+        :type repo: :class:`zenhub.Repository`
+        :param repo: The repository the Workspace was retrieved for
+
+        :return: The Workspace that was saved
+        :rtype: :class:`zenhub.Workspace`
+
+        :raise zenhub.snapshot.SnapshotError: the file is not a workspace snapshot
+        """
+        from . import snapshot
+        workspace_snapshot = snapshot.load(path, snapshot.KIND_WORKSPACE)
+        try:
+            return Workspace(workspace_snapshot.meta['data'], repo)
+        finally:
+            workspace_snapshot.close()
@@ -17,9 +17,23 @@
 """
 ZenHub Module
 """
-import requests
+import re
+import logging
+import threading
+import contextvars
 from urllib.parse import urljoin
+from . import deadline as deadlines
+from . import profiling
+from .deadline import DeadlineExceeded
 from .repository import Repository
+from .cache import ResponseCache, StaleData
+from .codec import get_codec
+from .identity import IdentityMap
+from .transport import RequestsTransport, endpoint
+
+_REPOSITORY_PATH = re.compile(r'/repositories/\d+/')
+
+logger = logging.getLogger(__name__)
 
 class ZenHub:
     """
@@ -28,14 +42,136 @@ class ZenHub:
     This base class provides the API endpoint and convinience methods
     to perform HTTP GET, POST, PUT, PATCH that other classes in this library
     will use to communicate to the ZenHub API.
+
+    The http requests are sent by a :class:`Transport <zenhub.transport.Transport>`
+    which defaults to :class:`RequestsTransport <zenhub.transport.RequestsTransport>`.
+    Pass a :class:`RecordingTransport <zenhub.transport.RecordingTransport>` or
+    :class:`ReplayTransport <zenhub.transport.ReplayTransport>` to capture and
+    replay real traffic.
+
+    Responses are decoded and request bodies encoded with a JSON codec
+    (see :mod:`zenhub.codec`). The fastest codec that is installed is used
+    unless a ``codec`` is given by name (e.g., ``'json'``) or as an instance.
+
+    Repositories, Issues and Epics are kept in an identity map (see
+    :mod:`zenhub.identity`) so that each one is a single shared object.
+
+    Requests wait for a :class:`RateLimiter <zenhub.ratelimit.RateLimiter>`
+    when one is passed as ``rate_limiter``. With a :class:`PriorityRateLimiter
+    <zenhub.ratelimit.PriorityRateLimiter>` the requests made inside a
+    :meth:`priority` block are served by priority class.
+
+    GET responses are cached when a :class:`ResponseCache <zenhub.cache.ResponseCache>`
+    is passed as ``cache``. Writes to a repository remove the cached
+    responses of that repository.
+
+    A ZenHub client is thread-safe and meant to be shared, e.g. by all the
+    workers of a :class:`concurrent.futures.ThreadPoolExecutor`. The cache,
+    rate limiter, identity map and transports all guard their state with
+    locks, and :meth:`RequestsTransport.pooled
+    <zenhub.transport.RequestsTransport.pooled>` gives every thread its own
+    keep-alive session::
+
+        zen = ZenHub('access_token', transport=RequestsTransport.pooled())
+
+    Every request gives up after the ``(connect, read)`` seconds of
+    ``timeout``. A :meth:`deadline` bounds the total time of the requests
+    sent inside a ``with`` block (see :mod:`zenhub.deadline`)::
+
+        with zen.deadline(5.0):
+            issues = repo.board().issue_details()
+
+    :meth:`profile` records the requests made by each call of the library.
+
+    A client made by :meth:`with_tokens` spreads its requests over several
+    API tokens, each with its own rate budget.
+
+    With ``serve_stale`` a GET that fails (e.g., because a
+    :class:`CircuitBreaker <zenhub.breaker.CircuitBreaker>` is open) returns
+    the last good response for the path if it is at most ``serve_stale``
+    seconds old, marked as :class:`StaleData <zenhub.cache.StaleData>`,
+    and fetches the path again in the background. ``stale_served`` counts
+    these responses.
+
+    Boards are fetched and issues moved in the Workspace of their repository
+    (the ``/p2/workspaces`` endpoints) when it is known. The Workspaces of a
+    repository are kept for ``workspace_ttl`` seconds once
+    :meth:`Repository.workspaces <zenhub.Repository.workspaces>` or
+    :meth:`prefetch_workspaces` fetched them, and ``default_workspace`` is
+    used for the repositories that were not looked up. Without either the
+    legacy endpoints of the oldest Workspace are used::
+
+        zen = ZenHub('access_token', default_workspace='5d0a7a9741fd098f6b7f58ac')
     """
 
     DEFAULT_API_ENDPOINT = 'https://api.zenhub.io'
 
-    def __init__(self, api_token, api_endpoint=DEFAULT_API_ENDPOINT):
+    # http status codes (``requests`` is only imported when the first request is sent)
+    HTTP_OK = 200
+    HTTP_NOT_FOUND = 404
+
+    # seconds to wait for a connection and for each read of the response
+    DEFAULT_TIMEOUT = (3.05, 30)
+
+    # the number of last good responses kept for ``serve_stale``
+    STALE_MAXSIZE = 4096
+
+    # seconds to keep the Workspaces of a repository
+    WORKSPACE_TTL = 300.0
+
+    def __init__(self, api_token, api_endpoint=DEFAULT_API_ENDPOINT, transport=None,
+                 cache=None, codec=None, rate_limiter=None, timeout=DEFAULT_TIMEOUT,
+                 serve_stale=None, default_workspace=None, workspace_ttl=WORKSPACE_TTL):
         self.api_token = api_token
         self.api_endpoint = api_endpoint
         self.headers = {'X-Authentication-Token': self.api_token}
+        self.transport = transport or RequestsTransport()
+        self.cache = cache
+        self.codec = get_codec(codec)
+        self.identity = IdentityMap()
+        self.rate_limiter = rate_limiter
+        self.timeout = timeout
+        self.last_good = None
+        if serve_stale:
+            self.last_good = ResponseCache(ttl=serve_stale, maxsize=self.STALE_MAXSIZE)
+        self.stale_served = 0
+        self._revalidating = set()
+        self._stale_lock = threading.Lock()
+        self.default_workspace = default_workspace
+        self.workspace_cache = ResponseCache(ttl=workspace_ttl)
+
+    @classmethod
+    def with_tokens(cls, tokens, transport=None, strategy='least-loaded',
+                    requests_per_minute=100, cooldown=300.0, **kwargs):
+        """ Returns a client that spreads its requests over several API tokens
+
+        The requests are sent by a :class:`TokenPool <zenhub.tokens.TokenPool>`
+        which keeps the rate budget of every token; see :mod:`zenhub.tokens`.
+
+        :type tokens: list
+        :param tokens: The ZenHub API tokens
+        :type transport: :class:`zenhub.transport.Transport`
+        :param transport: The transport that sends the requests
+        :type strategy: string
+        :param strategy: ``'least-loaded'`` or ``'round-robin'``
+        :type requests_per_minute: int
+        :param requests_per_minute: The budget of a token until its responses tell otherwise
+        :type cooldown: float
+        :param cooldown: The seconds a token is not used after a ``401`` or ``403``
+
+        The other keyword arguments are passed to :class:`ZenHub`.
+
+        :return: the client, its ``transport`` is the token pool
+        :rtype: :class:`zenhub.ZenHub`
+
+        :raise ValueError: no tokens or an unknown strategy
+        """
+        from .tokens import TokenPool
+        tokens = list(tokens)
+        pool = TokenPool(transport or RequestsTransport(), tokens,
+                         requests_per_minute=requests_per_minute, strategy=strategy,
+                         cooldown=cooldown)
+        return cls(tokens[0], transport=pool, **kwargs)
 
     def repository(self, repo_id):
         """ Returns a repository given it's ID
@@ -43,10 +179,192 @@ class ZenHub:
         :type repo_id: int
         :param repo_id: The GitHub ID of the repository
 
+        The same Repository object is returned for the same ID as long as it
+        is in use.
+
         :return: a repository object
-        :rtype: :class:`github.Repo`
+        :rtype: :class:`zenhub.Repository`
+        """
+        return self.identity.intern(('repository', repo_id), lambda: Repository(repo_id, self))
+
+    def workspace_of(self, repo_id):
+        """ Returns the id of the Workspace used for a repository without sending a request
+
+        The ``default_workspace`` is used if it contains the repository or the
+        Workspaces of the repository are not known, otherwise the first
+        Workspace of the repository.
+
+        :type repo_id: int
+        :param repo_id: The GitHub ID of the repository
+
+        :return: the Workspace id or ``None`` to use the oldest Workspace
+        :rtype: string or None
         """
-        return Repository(repo_id, self)
+        workspaces = self.workspace_cache.get(repo_id, count=False)
+        if workspaces is None:
+            return self.default_workspace
+        ids = [workspace.get('id') for workspace in workspaces]
+        if self.default_workspace in ids:
+            return self.default_workspace
+        return ids[0] if ids else None
+
+    def prefetch_workspaces(self, repo_ids=None, workers=8):
+        """ Fetches the Workspaces of many repositories in parallel
+
+        Repositories whose Workspaces are already known are skipped.
+
+        :type repo_ids: iterable
+        :param repo_ids: The GitHub IDs of the repositories, every repository
+                         the client has handed out if ``None``
+        :type workers: int
+        :param workers: The number of requests to send at once
+
+        :calls: `GET /p1/repositories/:repo_id/workspaces <https://github.com/ZenHubIO/API#get-zenhub-workspaces-for-a-repository>`_
+                for every repository
+
+        :return: the Workspace id used for each repository
+        :rtype: dict
+        """
+        if repo_ids is None:
+            repo_ids = [key[1] for key in self.identity.keys() if key[0] == 'repository']
+        repo_ids = list(dict.fromkeys(repo_ids))
+        missing = [repo_id for repo_id in repo_ids if repo_id not in self.workspace_cache]
+        self.map(lambda repo_id: self.repository(repo_id).workspaces(), missing, workers=workers)
+        return {repo_id: self.workspace_of(repo_id) for repo_id in repo_ids}
+
+    @staticmethod
+    def deadline(seconds):
+        """ Returns a context manager that bounds the time of the requests sent inside it
+
+        :type seconds: float
+        :param seconds: The seconds the requests may take in total
+
+        :raise DeadlineExceeded: (inside the block) a request is sent after the deadline
+        """
+        return deadlines.deadline(seconds)
+
+    @staticmethod
+    def priority(name):
+        """ Returns a context manager that sends the requests made inside it with a priority
+
+        The priority class only matters when the client has a
+        :class:`PriorityRateLimiter <zenhub.ratelimit.PriorityRateLimiter>`,
+        which serves interactive requests before normal and bulk ones::
+
+            with zen.priority('interactive'):
+                issue = repo.issue(42)
+
+        :type name: string
+        :param name: ``'interactive'``, ``'normal'`` (the default) or ``'bulk'``
+
+        :raise ValueError: the priority class is unknown
+        """
+        from . import ratelimit
+        return ratelimit.priority(name)
+
+    @staticmethod
+    def profile(cprofile=False):
+        """ Returns a context manager that records the calls made inside it
+
+        See :mod:`zenhub.profiling`::
+
+            with zen.profile() as prof:
+                repo.board()
+            print(prof.format())
+
+        :type cprofile: bool
+        :param cprofile: Also run :mod:`cProfile` on the calling thread
+
+        :return: a context manager that returns a :class:`Profile <zenhub.profiling.Profile>`
+        """
+        return profiling.profile(cprofile)
+
+    def map(self, func, items, workers=8):
+        """ Calls ``func`` with each item in parallel and returns the results in order
+
+        The calls run under the deadline of the caller. When the deadline
+        expires the calls that have not started are cancelled and the results
+        of the calls that finished are returned, so the list may be shorter
+        than ``items``.
+
+        :type func: callable
+        :param func: The function to call with each item
+        :type items: iterable
+        :param items: The items to call ``func`` with
+        :type workers: int
+        :param workers: The number of calls to run at once
+
+        :return: the results of the calls that finished in time
+        :rtype: list
+        """
+        from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FutureTimeout
+        results = {}
+        executor = ThreadPoolExecutor(max_workers=workers)
+        try:
+            futures = {
+                executor.submit(contextvars.copy_context().run, func, item): index
+                for index, item in enumerate(items)
+            }
+            try:
+                for future in as_completed(futures, timeout=deadlines.remaining()):
+                    try:
+                        results[futures[future]] = future.result()
+                    except DeadlineExceeded:
+                        break
+            except FutureTimeout:
+                pass
+        finally:
+            # calls that are still running are bounded by the deadline
+            executor.shutdown(wait=False, cancel_futures=True)
+        return [results[index] for index in sorted(results)]
+
+    def _request(self, method, path, body=None):
+        """ Private method that sends a request through the transport
+
+        :type method: string
+        :param method: The http method (e.g., ``'GET'``)
+        :type path: string
+        :param path: The path after the api endpoint (e.g., ``'/p1/repositories'``)
+        :type body: dict
+        :param body: A Python `dict` to send as the json body or ``None``
+
+        :return: the http response
+        :rtype: :class:`requests.Response`
+
+        :raise DeadlineExceeded: the current deadline expired
+        """
+        url = urljoin(self.api_endpoint, path)
+        deadlines.check()
+        if self.rate_limiter is not None:
+            if not self.rate_limiter.acquire(timeout=deadlines.remaining()):
+                raise DeadlineExceeded(f'deadline exceeded waiting to {method} {path}')
+        headers = self.headers
+        data = None
+        if body is not None:
+            headers = dict(self.headers)
+            headers['Content-Type'] = 'application/json'
+            data = self.codec.encode(body)
+        try:
+            with profiling.span(f'{method} {endpoint(url)}', profiling.HTTP):
+                response = self.transport.request(method, url, headers, data,
+                                                  timeout=deadlines.bound(self.timeout))
+        except Exception as error:
+            if deadlines.remaining() == 0.0:
+                raise DeadlineExceeded(f'deadline exceeded during {method} {path}') from error
+            raise
+        if method != 'GET':
+            self._invalidate(path)
+        return response
+
+    def _invalidate(self, path):
+        """ Private method that removes cached responses made stale by a write to path """
+        if self.cache is None:
+            return
+        match = _REPOSITORY_PATH.search(path)
+        if match:
+            self.cache.invalidate(containing=match.group(0))
+        else:
+            self.cache.invalidate()
 
     def _check_response(self, response):
         """ Private method that checks the response for valid return codes
@@ -59,36 +377,85 @@ class ZenHub:
 
         :raise HTTPError: received something other then ``200`` or ``404``
         """
-        if response.status_code == requests.codes.ok:
+        if response.status_code == self.HTTP_OK:
             # Since the ZenHub REST API does not send back 204 when there is
             # no content, we have to check the Content-Length for 0 :(
             if int(response.headers['Content-Length']):
-                return response.json()
-        elif response.status_code == requests.codes.not_found:
+                with profiling.span('parse', profiling.PARSE):
+                    return self.codec.decode_response(response)
+        elif response.status_code == self.HTTP_NOT_FOUND:
             return None
         else:
             return response.raise_for_status()
 
-    def get(self, path):
+    def get(self, path, fresh=False):
         """ Performs an http GET for the given path
 
         :type path: string
         :param path: The path after the api endpoint (e.g., ``'/p1/repositories'``)
+        :type fresh: bool
+        :param fresh: Skip the cache and always send the request
 
         :return: the response as json dictionary if content was found or None if it was not
         :rtype: dict or None
 
         :raise requests.exceptions.HTTPError: received something other then ``200`` or ``404``
         """
-        url = urljoin(self.api_endpoint, path)
-        response = requests.get(url, headers=self.headers)
-        if response.status_code == requests.codes.ok:
-            return response.json()
-        elif response.status_code == requests.codes.not_found:
+        if self.cache is not None and not fresh:
+            data = self.cache.get(path)
+            if data is not None:
+                return data
+        if self.last_good is None:
+            return self._fetch(path)
+        try:
+            return self._fetch(path)
+        except Exception as error:
+            status = getattr(getattr(error, 'response', None), 'status_code', None)
+            data = None
+            if status is None or status >= 500:
+                data = self.last_good.get(path, count=False)
+            if data is None:
+                raise
+            logger.warning('serving a stale response for %s: %s', path, error)
+            with self._stale_lock:
+                self.stale_served += 1
+            self._revalidate(path)
+            return StaleData(data)
+
+    def _fetch(self, path):
+        """ Private method that sends a GET and decodes and caches the response """
+        response = self._request('GET', path)
+        if response.status_code == self.HTTP_OK:
+            with profiling.span('parse', profiling.PARSE):
+                data = self.codec.decode_response(response)
+            if self.cache is not None and data:
+                self.cache.set(path, data)
+            if self.last_good is not None and data:
+                self.last_good.set(path, data)
+            return data
+        elif response.status_code == self.HTTP_NOT_FOUND:
             return None
         else:
             response.raise_for_status()
 
+    def _revalidate(self, path):
+        """ Private method that fetches a path again in a background thread """
+        with self._stale_lock:
+            if path in self._revalidating:
+                return
+            self._revalidating.add(path)
+
+        def revalidate():
+            try:
+                self._fetch(path)
+            except Exception as error:  # pylint: disable=broad-except
+                logger.info('revalidating %s failed: %s', path, error)
+            finally:
+                with self._stale_lock:
+                    self._revalidating.discard(path)
+        # a fresh context: the deadline and profile of the caller do not apply
+        threading.Thread(target=revalidate, name='zenhub-revalidate', daemon=True).start()
+
     def post(self, path, body):
         """ Performs an http POST for the given path
 
@@ -102,8 +469,7 @@ class ZenHub:
 
         :raise requests.exceptions.HTTPError: received something other then ``200`` or ``404``
         """
-        url = urljoin(self.api_endpoint, path)
-        response = requests.post(url, json=body, headers=self.headers)
+        response = self._request('POST', path, body)
         return self._check_response(response)
 
     def put(self, path, body):
@@ -119,8 +485,7 @@ class ZenHub:
 
         :raise requests.exceptions.HTTPError: received something other then ``200`` or ``404``
         """
-        url = urljoin(self.api_endpoint, path)
-        response = requests.put(url, json=body, headers=self.headers)
+        response = self._request('PUT', path, body)
         return self._check_response(response)
 
     def patch(self, path, body):
@@ -136,6 +501,5 @@ class ZenHub:
 
         :raise requests.exceptions.HTTPError: received something other then ``200`` or ``404``
         """
-        url = urljoin(self.api_endpoint, path)
-        response = requests.patch(url, json=body, headers=self.headers)
+        response = self._request('PATCH', path, body)
         return self._check_response(response)